@@ -1,76 +1,134 @@
+import hashlib
+import json
 import logging
 import os
 import shutil
+import threading
 
 from comfy_api.latest import ComfyExtension, io
 
 # Instructs ComfyUI to serve the './web' directory to the frontend
 WEB_DIRECTORY = "./web"
 
+_THUMBNAIL_EXTENSIONS = {".jpeg", ".jpg", ".png", ".webp"}
+_THUMBNAIL_MANIFEST = ".sync_manifest.json"
+
+
+def _link_or_copy(src_path: str, dst_path: str) -> None:
+    """Hardlink src to dst, falling back to a byte copy across filesystems."""
+    if os.path.lexists(dst_path):
+        os.remove(dst_path)
+    try:
+        os.link(src_path, dst_path)
+    except OSError:
+        shutil.copy2(src_path, dst_path)
+
+
 def _sync_image_styler_thumbnails() -> None:
-    """Copy style thumbnail images into web/image_styler for frontend access."""
+    """
+    Mirror style thumbnail images into web/image_styler for frontend access.
+
+    The source listing (name, size, mtime) is reduced to one digest that is
+    stored in a manifest next to the mirrored files; when it matches, the sync
+    costs a single directory scan. Otherwise only changed files are refreshed,
+    as hardlinks where possible, and files removed from the source are dropped.
+    """
     extension_root = os.path.dirname(__file__)
     source_dir = os.path.join(extension_root, "assets", "image_styler")
     target_dir = os.path.join(extension_root, "web", "image_styler")
+    manifest_path = os.path.join(target_dir, _THUMBNAIL_MANIFEST)
 
     if not os.path.isdir(source_dir):
         return
 
-    os.makedirs(target_dir, exist_ok=True)
-    allowed_ext = {".jpeg", ".jpg", ".png", ".webp"}
+    files: dict[str, list[int]] = {}
+    with os.scandir(source_dir) as entries:
+        for entry in entries:
+            if os.path.splitext(entry.name)[1].lower() in _THUMBNAIL_EXTENSIONS and entry.is_file():
+                st = entry.stat()
+                files[entry.name] = [st.st_size, st.st_mtime_ns]
+    digest = hashlib.sha256(json.dumps(files, sort_keys=True).encode("utf-8")).hexdigest()
 
-    for filename in os.listdir(source_dir):
-        _, ext = os.path.splitext(filename)
-        if ext.lower() not in allowed_ext:
-            continue
+    previous: dict[str, list[int]] = {}
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("digest") == digest:
+            return
+        previous = manifest.get("files") or {}
+    except (OSError, ValueError, AttributeError):
+        pass
 
-        src_path = os.path.join(source_dir, filename)
+    os.makedirs(target_dir, exist_ok=True)
+    synced: dict[str, list[int]] = {}
+    for filename, signature in files.items():
         dst_path = os.path.join(target_dir, filename)
-
         try:
-            src_stat = os.stat(src_path)
-            should_copy = True
-            if os.path.exists(dst_path):
-                dst_stat = os.stat(dst_path)
-                should_copy = (
-                    src_stat.st_size != dst_stat.st_size
-                    or src_stat.st_mtime_ns != dst_stat.st_mtime_ns
-                )
-
-            if should_copy:
-                shutil.copy2(src_path, dst_path)
+            if previous.get(filename) != signature or not os.path.exists(dst_path):
+                _link_or_copy(os.path.join(source_dir, filename), dst_path)
+            synced[filename] = signature
         except Exception as exc:
             logging.warning("[ Duffy_Nodes ] Failed to sync Image Styler asset '%s': %s", filename, exc)
 
+    for filename in previous.keys() - files.keys():
+        try:
+            os.remove(os.path.join(target_dir, filename))
+        except OSError:
+            pass
+
+    if synced != files:
+        # Leave the manifest stale so the failed files are retried next start
+        return
+    tmp_path = manifest_path + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"digest": digest, "files": files}, f)
+        os.replace(tmp_path, manifest_path)
+    except OSError as exc:
+        logging.warning("[ Duffy_Nodes ] Failed to write Image Styler manifest: %s", exc)
+
 
 class DuffyNodesExtension(ComfyExtension):
     """
     Formal extension registration container for Duffy_Nodes.
     Inherits from ComfyExtension to interface with the ComfyUI backend loader.
     """
+    def __init__(self, node_list: list[type[io.ComfyNode]]):
+        self._node_list = node_list
+
     async def get_node_list(self) -> list[type[io.ComfyNode]]:
         """
         Returns the list of active V3 schema nodes to the application registry.
         """
-        # Import here to avoid relative import issues at module load time
-        from .nodes import NODE_LIST
-        return NODE_LIST
+        return self._node_list
 
 async def comfy_entrypoint() -> DuffyNodesExtension:
     """
     The initialization hook probed by the ComfyUI backend loader.
     Must return an object inheriting from ComfyExtension.
     """
-    from .nodes import NODE_LIST
+    # Import here to avoid relative import issues at module load time
+    from .nodes import IMPORT_ERRORS, IMPORT_TIMINGS, NODE_LIST
     node_count = len(NODE_LIST)
 
-    _sync_image_styler_thumbnails()
-    
+    # Thumbnails are only requested once the frontend opens a styler node
+    threading.Thread(
+        target=_sync_image_styler_thumbnails, name="duffy-thumbnail-sync", daemon=True
+    ).start()
+
     logging.info("=" * 60)
     logging.info("[ Duffy_Nodes ] Extension Detected")
     logging.info(f" -> Initializing Duffy_Nodes extension (Nodes 2.0 V3 Schema)")
     logging.info(f" -> Successfully registered {node_count} utility nodes")
+    logging.info(f" -> Node modules imported in {sum(IMPORT_TIMINGS.values()) * 1000:.0f} ms")
+    slowest = sorted(IMPORT_TIMINGS.items(), key=lambda item: item[1], reverse=True)[:5]
+    for module_name, seconds in slowest:
+        logging.info(f"      {module_name:<36} {seconds * 1000:8.1f} ms")
+    for module_name, seconds in IMPORT_TIMINGS.items():
+        logging.debug(f"[ Duffy_Nodes ] import nodes.{module_name}: {seconds * 1000:.1f} ms")
+    for module_name, error in IMPORT_ERRORS.items():
+        logging.warning(f" -> Skipped nodes from '{module_name}': {error}")
     logging.info("=" * 60)
-    return DuffyNodesExtension()
+    return DuffyNodesExtension(NODE_LIST)
 
 __all__ = ["comfy_entrypoint", "WEB_DIRECTORY"]
@@ -0,0 +1,45 @@
+"""
+Empty-latent helpers shared by the latent nodes.
+
+A "Lazy" empty latent is a zero tensor of the requested shape backed by a
+single element and ``expand``-ed to full size: it carries shape, dtype and
+device like a dense latent but costs no memory. The first consumer that needs
+real storage calls ``materialize_latent`` (or ``.contiguous()``/``.clone()``)
+and only then is the full buffer allocated — on the latent's own device.
+"""
+
+import comfy.model_management
+import torch
+
+LATENT_MODES = ["Dense", "Lazy"]
+LATENT_DEVICES = ["cpu", "gpu"]
+
+
+def target_device(name: str) -> torch.device:
+    """Map a ``LATENT_DEVICES`` option to a torch device."""
+    if name == "gpu":
+        return comfy.model_management.get_torch_device()
+    return torch.device("cpu")
+
+
+def empty_latent(
+    shape: list[int],
+    mode: str = "Dense",
+    device: str = "cpu",
+    dtype: torch.dtype = torch.float32,
+) -> torch.Tensor:
+    """Create a zero latent of ``shape``, dense or as a lazy expanded view."""
+    target = target_device(device)
+    if mode == "Lazy":
+        return torch.zeros([1] * len(shape), dtype=dtype, device=target).expand(shape)
+    return torch.zeros(shape, dtype=dtype, device=target)
+
+
+def is_lazy_latent(samples: torch.Tensor) -> bool:
+    """True if ``samples`` is a broadcast view (some dimension has stride 0)."""
+    return any(stride == 0 and size > 1 for stride, size in zip(samples.stride(), samples.shape))
+
+
+def materialize_latent(samples: torch.Tensor) -> torch.Tensor:
+    """Return a writable dense tensor, allocating only if ``samples`` is lazy."""
+    return samples.contiguous() if is_lazy_latent(samples) else samples
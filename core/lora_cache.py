@@ -0,0 +1,120 @@
+"""
+Process-wide cache of parsed LoRA state dicts.
+
+Entries are keyed on (real path, mtime, size), so an edited or replaced file is
+re-read automatically, and evicted least-recently-used once the byte budget is
+exceeded. Budget and storage mode come from the environment:
+
+    DUFFY_LORA_CACHE_MB    byte budget in MiB (default 4096, 0 disables caching)
+    DUFFY_LORA_CACHE_MMAP  "1" (default) keeps safetensors weights memory-mapped,
+                           "0" copies them into process memory
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import comfy.utils
+import torch
+
+logger = logging.getLogger(__name__)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _state_dict_bytes(state_dict: dict) -> int:
+    return sum(t.numel() * t.element_size() for t in state_dict.values() if isinstance(t, torch.Tensor))
+
+
+class LoraStateCache:
+    """LRU cache of LoRA state dicts bounded by a total byte budget."""
+
+    def __init__(self, budget_bytes: int, keep_mmap: bool = True):
+        self.budget_bytes = budget_bytes
+        self.keep_mmap = keep_mmap
+        self._entries: OrderedDict[tuple[str, int, int], tuple[dict, int]] = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(path: str) -> tuple[str, int, int]:
+        real_path = os.path.realpath(path)
+        st = os.stat(real_path)
+        return real_path, st.st_mtime_ns, st.st_size
+
+    def _read(self, path: str) -> dict:
+        state_dict = comfy.utils.load_torch_file(path, safe_load=True)
+        if not self.keep_mmap:
+            # safetensors tensors are backed by the file mapping; detach them
+            state_dict = {k: v.clone() if isinstance(v, torch.Tensor) else v for k, v in state_dict.items()}
+        return state_dict
+
+    def _drop(self, key: tuple[str, int, int]) -> None:
+        _, size = self._entries.pop(key)
+        self._total_bytes -= size
+
+    def get(self, path: str) -> dict:
+        """Return the state dict for ``path``, loading it on a miss."""
+        if self.budget_bytes <= 0:
+            return comfy.utils.load_torch_file(path, safe_load=True)
+
+        key = self._key(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            # Forget older versions of the same file
+            for stale in [k for k in self._entries if k[0] == key[0]]:
+                self._drop(stale)
+
+        state_dict = self._read(path)
+        size = _state_dict_bytes(state_dict)
+
+        with self._lock:
+            self.misses += 1
+            if size > self.budget_bytes:
+                logger.info("LoRA %s (%.1f MB) exceeds the cache budget; not cached", key[0], size / 2**20)
+                return state_dict
+            if key not in self._entries:
+                self._entries[key] = (state_dict, size)
+                self._total_bytes += size
+            while self._total_bytes > self.budget_bytes:
+                self._drop(next(iter(self._entries)))
+        return state_dict
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "budget_bytes": self.budget_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "mmap": self.keep_mmap,
+            }
+
+
+lora_cache = LoraStateCache(
+    budget_bytes=_env_int("DUFFY_LORA_CACHE_MB", 4096) * 2**20,
+    keep_mmap=os.environ.get("DUFFY_LORA_CACHE_MMAP", "1") != "0",
+)
+
+
+def load_lora(path: str) -> dict:
+    """Load a LoRA state dict through the shared process-wide cache."""
+    return lora_cache.get(path)
@@ -0,0 +1,135 @@
+"""
+Trigger-word lookup from safetensors headers.
+
+Only the JSON header of a ``.safetensors`` file is read — the 8-byte length
+prefix plus the header itself — never the tensor payload. Extracted trigger
+words are stored in a persistent JSON index keyed by real path and validated
+against the file signature (mtime, size), so a library scan only touches files
+that are new or have changed since the last run.
+"""
+
+import json
+import logging
+import os
+import struct
+import threading
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "lora_trigger_index.json")
+MAX_HEADER_BYTES = 100 * 1024 * 1024
+MAX_TRIGGER_WORDS = 30
+
+# Header metadata keys that carry explicit trigger phrases (comma separated)
+_TRIGGER_KEYS = ("modelspec.trigger_phrase", "ss_trigger_words", "trigger_words", "activation_text")
+
+
+def read_safetensors_metadata(path: str) -> dict[str, str]:
+    """Return the ``__metadata__`` block of a safetensors file (empty if none)."""
+    with open(path, "rb") as f:
+        prefix = f.read(8)
+        if len(prefix) != 8:
+            raise ValueError(f"Not a safetensors file: {path}")
+        (header_len,) = struct.unpack("<Q", prefix)
+        if header_len > MAX_HEADER_BYTES:
+            raise ValueError(f"Safetensors header too large ({header_len} bytes): {path}")
+        header = json.loads(f.read(header_len))
+    if not isinstance(header, dict):
+        raise ValueError(f"Safetensors header is not a JSON object: {path}")
+    metadata = header.get("__metadata__") or {}
+    return metadata if isinstance(metadata, dict) else {}
+
+
+def extract_trigger_words(metadata: dict[str, str], limit: int = MAX_TRIGGER_WORDS) -> list[str]:
+    """
+    Collect trigger words from header metadata.
+
+    Explicit trigger-phrase fields come first; the most frequent training tags
+    from ``ss_tag_frequency`` fill the remainder up to ``limit``.
+    """
+    words: list[str] = []
+    for key in _TRIGGER_KEYS:
+        value = metadata.get(key)
+        if isinstance(value, str):
+            words.extend(w.strip() for w in value.split(",") if w.strip())
+
+    tag_frequency = metadata.get("ss_tag_frequency")
+    if isinstance(tag_frequency, str):
+        try:
+            datasets = json.loads(tag_frequency)
+        except json.JSONDecodeError:
+            datasets = {}
+        counts: Counter[str] = Counter()
+        if isinstance(datasets, dict):
+            for tags in datasets.values():
+                if isinstance(tags, dict):
+                    for tag, count in tags.items():
+                        if isinstance(count, (int, float)):
+                            counts[tag.strip()] += int(count)
+        words.extend(tag for tag, _ in counts.most_common() if tag)
+
+    return list(dict.fromkeys(words))[:limit]
+
+
+class TriggerIndex:
+    """Persistent trigger-word index keyed by real path and file signature."""
+
+    def __init__(self, index_file: str = INDEX_FILE):
+        self.index_file = index_file
+        self._entries: dict[str, dict] | None = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict[str, dict]:
+        if self._entries is None:
+            self._entries = {}
+            if os.path.isfile(self.index_file):
+                try:
+                    with open(self.index_file, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                    if isinstance(data, dict):
+                        self._entries = data
+                except (json.JSONDecodeError, OSError):
+                    logger.warning("LoRA trigger index unreadable, rebuilding: %s", self.index_file)
+        return self._entries
+
+    def lookup(self, path: str) -> list[str]:
+        """Return trigger words for ``path``, reading its header only on a miss."""
+        real_path = os.path.realpath(path)
+        st = os.stat(real_path)
+        signature = [st.st_mtime_ns, st.st_size]
+
+        with self._lock:
+            entry = self._load().get(real_path)
+            if entry is not None and entry.get("signature") == signature:
+                return entry["trigger_words"]
+
+        words: list[str] = []
+        if real_path.lower().endswith(".safetensors"):
+            try:
+                words = extract_trigger_words(read_safetensors_metadata(real_path))
+            except (ValueError, OSError) as e:
+                logger.warning("Could not read safetensors header of %s: %s", real_path, e)
+
+        with self._lock:
+            self._load()[real_path] = {"signature": signature, "trigger_words": words}
+            self._dirty = True
+        return words
+
+    def save(self) -> None:
+        """Write the index to disk if it changed (atomic replace)."""
+        with self._lock:
+            if not self._dirty or self._entries is None:
+                return
+            tmp_path = self.index_file + ".tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(self._entries, f)
+                os.replace(tmp_path, self.index_file)
+                self._dirty = False
+            except OSError as e:
+                logger.warning("Could not write LoRA trigger index %s: %s", self.index_file, e)
+
+
+trigger_index = TriggerIndex()
@@ -0,0 +1,201 @@
+"""
+Precomputed LoRA patch sets for multi-LoRA stacks.
+
+Converting a LoRA state dict into ModelPatcher patches (key mapping, format
+conversion) is independent of the strengths it is applied with. The patch set
+for a whole stack is therefore computed once per (model, clip, stack content)
+and reused; applying a stack costs one ModelPatcher clone per target plus a
+cheap ``add_patches`` call per LoRA, instead of a clone per LoRA.
+
+Patch sets are held weakly per model/CLIP object, so unloading a checkpoint
+drops its cached patches with it. The cache has its own byte budget, counted
+over each patch set's distinct tensors; the least recently used stacks across
+all models are evicted once it is exceeded:
+
+    DUFFY_LORA_PATCH_CACHE_MB  byte budget in MiB (default 2048, 0 disables caching)
+
+Most patch tensors are views of the state dicts held by ``lora_cache``, so the
+memory actually pinned by both caches is usually well below the sum of the two
+budgets; the sum is the upper bound.
+"""
+
+import hashlib
+import json
+import os
+import itertools
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Callable
+
+import comfy.lora
+import comfy.lora_convert
+import torch
+
+from .lora_cache import _env_int, load_lora
+
+MAX_STACKS_PER_MODEL = 8
+PATCH_CACHE_BUDGET_BYTES = _env_int("DUFFY_LORA_PATCH_CACHE_MB", 2048) * 2**20
+
+_patch_sets: "weakref.WeakKeyDictionary[object, weakref.WeakKeyDictionary]" = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+_tick = itertools.count()
+
+
+class _Missing:
+    """Weak-referenceable stand-in key when no model or CLIP is connected."""
+
+
+_MISSING = _Missing()
+
+
+def stack_hash(paths: list[str]) -> str | None:
+    """
+    Content hash of a LoRA stack: ordered real paths plus file signatures.
+
+    Returns ``None`` when a file cannot be stat'ed, so the caller bypasses the
+    cache and reports the failure per LoRA.
+    """
+    signature = []
+    for path in paths:
+        real_path = os.path.realpath(path)
+        try:
+            st = os.stat(real_path)
+        except OSError:
+            return None
+        signature.append([real_path, st.st_mtime_ns, st.st_size])
+    return hashlib.sha256(json.dumps(signature).encode("utf-8")).hexdigest()
+
+
+def _patch_set_bytes(patch_set: list[dict | None]) -> int:
+    """Bytes of the distinct tensors referenced by a patch set."""
+    seen: set[tuple[int, int]] = set()
+    total = 0
+    stack: list = [patches for patches in patch_set if patches is not None]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, torch.Tensor):
+            key = (item.data_ptr(), item.numel())
+            if key not in seen:
+                seen.add(key)
+                total += item.numel() * item.element_size()
+        elif isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+        elif hasattr(item, "weights"):
+            # comfy.weight_adapter adapters keep their tensors in ``weights``
+            stack.append(item.weights)
+    return total
+
+
+def _key_map(model, clip) -> dict:
+    key_map: dict = {}
+    if model is not None:
+        key_map = comfy.lora.model_lora_keys_unet(model.model, key_map)
+    if clip is not None:
+        key_map = comfy.lora.model_lora_keys_clip(clip.cond_stage_model, key_map)
+    return key_map
+
+
+def _cached_entries():
+    """Yield ``(stack cache, digest, tick, size)`` for every live cached stack."""
+    for per_model in list(_patch_sets.values()):
+        for cache in list(per_model.values()):
+            for digest, (_, tick, size) in cache.items():
+                yield cache, digest, tick, size
+
+
+def _evict_over_budget(budget_bytes: int) -> None:
+    """Drop least recently used stacks, across all models, until within budget."""
+    entries = sorted(_cached_entries(), key=lambda entry: entry[2])
+    total = sum(size for _, _, _, size in entries)
+    for cache, digest, _, size in entries:
+        if total <= budget_bytes:
+            break
+        del cache[digest]
+        total -= size
+
+
+def _stack_cache(model, clip) -> OrderedDict:
+    model_key = model.model if model is not None else _MISSING
+    clip_key = clip.cond_stage_model if clip is not None else _MISSING
+    per_model = _patch_sets.setdefault(model_key, weakref.WeakKeyDictionary())
+    return per_model.setdefault(clip_key, OrderedDict())
+
+
+def build_patch_set(
+    model,
+    clip,
+    paths: list[str],
+    on_error: Callable[[str, Exception], None] | None = None,
+) -> list[dict | None]:
+    """
+    Return one patch dict per path (``None`` where loading failed), using the
+    cached set for this model/CLIP pair when the stack content is unchanged.
+    """
+    budget_bytes = PATCH_CACHE_BUDGET_BYTES
+    digest = stack_hash(paths) if budget_bytes > 0 else None
+    if digest is not None:
+        with _lock:
+            cache = _stack_cache(model, clip)
+            cached = cache.get(digest)
+            if cached is not None:
+                cache[digest] = (cached[0], next(_tick), cached[2])
+                cache.move_to_end(digest)
+                return cached[0]
+
+    key_map = _key_map(model, clip)
+    patch_set: list[dict | None] = []
+    complete = True
+    for path in paths:
+        try:
+            lora = comfy.lora_convert.convert_lora(load_lora(path))
+            patch_set.append(comfy.lora.load_lora(lora, key_map))
+        except Exception as e:
+            complete = False
+            patch_set.append(None)
+            if on_error is not None:
+                on_error(path, e)
+            else:
+                raise
+
+    if complete and digest is not None:
+        size = _patch_set_bytes(patch_set)
+        if size <= budget_bytes:
+            with _lock:
+                cache = _stack_cache(model, clip)
+                cache[digest] = (patch_set, next(_tick), size)
+                while len(cache) > MAX_STACKS_PER_MODEL:
+                    cache.popitem(last=False)
+                _evict_over_budget(budget_bytes)
+    return patch_set
+
+
+def apply_lora_stack(
+    model,
+    clip,
+    stack: list[tuple[str, float, float]],
+    on_error: Callable[[str, Exception], None] | None = None,
+):
+    """
+    Apply a list of (path, strength_model, strength_clip) LoRAs in one pass.
+
+    Equivalent to chaining ``comfy.sd.load_lora_for_models`` over the stack,
+    but clones the model and CLIP once instead of once per LoRA.
+    """
+    if not stack:
+        return model, clip
+
+    patch_set = build_patch_set(model, clip, [path for path, _, _ in stack], on_error)
+
+    new_model = model.clone() if model is not None else None
+    new_clip = clip.clone() if clip is not None else None
+    for patches, (_, strength_model, strength_clip) in zip(patch_set, stack):
+        if patches is None:
+            continue
+        if new_model is not None and strength_model != 0:
+            new_model.add_patches(patches, strength_model)
+        if new_clip is not None and strength_clip != 0:
+            new_clip.add_patches(patches, strength_clip)
+    return new_model, new_clip
@@ -0,0 +1,66 @@
+"""
+Seed-stable noise engine for the latent noise nodes.
+
+Every batch item (or video frame) is drawn from a private ``torch.Generator``
+reseeded with a seed derived from ``(seed, index)``. Any slice of a batch is
+therefore reproducible on its own, chunks can be generated independently, and
+the global torch RNG is never touched.
+"""
+
+import torch
+
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+
+
+def item_seed(seed: int, index: int) -> int:
+    """Derive the seed for batch item ``index`` (SplitMix64 finalizer)."""
+    z = (seed + (index + 1) * 0x9E3779B97F4A7C15) & _MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return z ^ (z >> 31)
+
+
+def fill_noise(
+    out: torch.Tensor,
+    dim: int,
+    seed: int,
+    start: int = 0,
+    generator: torch.Generator | None = None,
+) -> torch.Tensor:
+    """
+    Fill ``out`` with standard normal noise, one independently seeded item per
+    index along ``dim``. Item ``i`` of ``out`` receives the noise for global
+    index ``start + i``, so filling a slice reproduces the same values as
+    filling the whole tensor.
+
+    Noise is generated directly on ``out.device``. CPU and CUDA generators
+    produce different streams for the same seed.
+    """
+    if generator is None:
+        generator = torch.Generator(device=out.device)
+    for i in range(out.shape[dim]):
+        generator.manual_seed(item_seed(seed, start + i))
+        item = out.select(dim, i)
+        if item.is_contiguous():
+            torch.randn(item.shape, generator=generator, dtype=out.dtype, device=out.device, out=item)
+        else:
+            item.copy_(torch.randn(item.shape, generator=generator, dtype=out.dtype, device=out.device))
+    return out
+
+
+def batched_noise(
+    shape: list[int],
+    dim: int,
+    seed: int,
+    device: torch.device | str = "cpu",
+    dtype: torch.dtype = torch.float32,
+) -> torch.Tensor:
+    """
+    Allocate a noise tensor of ``shape`` directly on ``device`` and fill it
+    item by item along ``dim``.
+
+    For constant-batch noise, request a shape with size 1 along ``dim`` and
+    ``expand`` the result — identical noise for every item at the memory
+    cost of one.
+    """
+    return fill_noise(torch.empty(shape, dtype=dtype, device=device), dim, seed)
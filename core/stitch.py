@@ -0,0 +1,147 @@
+"""
+Shared stitching engine for the Image Stitch node family.
+
+Tiles that share a source and target size are resized together in a single
+batched interpolate call on the tensors' own device, and every tile is written
+into one preallocated output canvas instead of chaining ``torch.cat`` calls.
+"""
+
+from typing import Sequence
+
+import torch
+import torch.nn.functional as F
+
+
+def placeholder_image() -> torch.Tensor:
+    """Return the 64×64 black image emitted when nothing is connected."""
+    return torch.zeros((1, 64, 64, 3), dtype=torch.float32)
+
+
+def _interpolate(batch: torch.Tensor, height: int, width: int) -> torch.Tensor:
+    """Resize a [B,H,W,C] batch with antialiased bicubic filtering."""
+    bchw = batch.movedim(-1, 1).float()
+    scaled = F.interpolate(
+        bchw, size=(height, width), mode="bicubic", align_corners=False, antialias=True
+    )
+    return scaled.clamp_(0.0, 1.0).movedim(1, -1)
+
+
+def resize_tiles(
+    tensors: Sequence[torch.Tensor],
+    sizes: Sequence[tuple[int, int]],
+) -> list[torch.Tensor]:
+    """
+    Resize each [B,H,W,C] tensor to its (height, width) target.
+
+    Tensors already at their target size are passed through untouched. The
+    rest are grouped by (source shape, device, target size) so that every
+    group costs exactly one interpolate call, regardless of how many tiles
+    it contains.
+    """
+    result = list(tensors)
+    groups: dict[tuple, list[int]] = {}
+    for idx, (t, (h, w)) in enumerate(zip(tensors, sizes)):
+        if t.shape[1] == h and t.shape[2] == w:
+            continue
+        key = (tuple(t.shape[1:]), t.device, h, w)
+        groups.setdefault(key, []).append(idx)
+
+    for (_, _, h, w), indices in groups.items():
+        members = [tensors[i] for i in indices]
+        batch = members[0] if len(members) == 1 else torch.cat(members, dim=0)
+        scaled = _interpolate(batch, h, w)
+        offset = 0
+        for i, t in zip(indices, members):
+            count = t.shape[0]
+            result[i] = scaled[offset:offset + count]
+            offset += count
+
+    return result
+
+
+def new_canvas(tensors: Sequence[torch.Tensor], height: int, width: int) -> torch.Tensor:
+    """
+    Allocate a black [B,height,width,C] canvas matching the first tile's
+    device, dtype and channel count. ``B`` is the largest tile batch; tiles
+    with a batch of 1 broadcast across it when written.
+    """
+    ref = tensors[0]
+    batch = max(t.shape[0] for t in tensors)
+    return torch.zeros(
+        (batch, height, width, ref.shape[-1]), dtype=ref.dtype, device=ref.device
+    )
+
+
+def stitch_horizontal(tensors: list[torch.Tensor]) -> torch.Tensor:
+    """
+    Stitch images side-by-side. All images are scaled to the height of
+    the tallest image (preserving aspect ratio), then placed along width.
+    """
+    max_h = max(t.shape[1] for t in tensors)
+    sizes = []
+    for t in tensors:
+        _, h, w, _ = t.shape
+        new_w = w if h == max_h else max(1, round(w * (max_h / h)))
+        sizes.append((max_h, new_w))
+
+    tiles = resize_tiles(tensors, sizes)
+    canvas = new_canvas(tiles, max_h, sum(w for _, w in sizes))
+    x = 0
+    for tile, (_, w) in zip(tiles, sizes):
+        canvas[:, :, x:x + w, :] = tile
+        x += w
+    return canvas
+
+
+def stitch_vertical(tensors: list[torch.Tensor]) -> torch.Tensor:
+    """
+    Stack images vertically. All images are center-cropped to the width of
+    the narrowest image, then placed along height.
+    """
+    min_w = min(t.shape[2] for t in tensors)
+    canvas = new_canvas(tensors, sum(t.shape[1] for t in tensors), min_w)
+    y = 0
+    for t in tensors:
+        _, h, w, _ = t.shape
+        offset = (w - min_w) // 2
+        canvas[:, y:y + h, :, :] = t[:, :, offset:offset + min_w, :]
+        y += h
+    return canvas
+
+
+def stitch_layout(grid: list[list[torch.Tensor | None]]) -> torch.Tensor:
+    """
+    Stitch images preserving their grid positions.
+
+    - Rows and columns that contain zero images are excluded.
+    - All images are scaled to a uniform cell size (max_h × max_w).
+    - Empty cells within active rows/columns stay black.
+    """
+    rows = len(grid)
+    cols = max((len(row) for row in grid), default=0)
+
+    def cell(r: int, c: int) -> torch.Tensor | None:
+        return grid[r][c] if c < len(grid[r]) else None
+
+    active_rows = [r for r in range(rows) if any(cell(r, c) is not None for c in range(cols))]
+    active_cols = [c for c in range(cols) if any(cell(r, c) is not None for r in range(rows))]
+
+    if not active_rows or not active_cols:
+        return placeholder_image()
+
+    placed = [
+        (row_idx, col_idx, cell(r, c))
+        for row_idx, r in enumerate(active_rows)
+        for col_idx, c in enumerate(active_cols)
+        if cell(r, c) is not None
+    ]
+
+    cell_h = max(t.shape[1] for _, _, t in placed)
+    cell_w = max(t.shape[2] for _, _, t in placed)
+
+    tiles = resize_tiles([t for _, _, t in placed], [(cell_h, cell_w)] * len(placed))
+    canvas = new_canvas(tiles, len(active_rows) * cell_h, len(active_cols) * cell_w)
+    for (row_idx, col_idx, _), tile in zip(placed, tiles):
+        y, x = row_idx * cell_h, col_idx * cell_w
+        canvas[:, y:y + cell_h, x:x + cell_w, :] = tile
+    return canvas
@@ -1,163 +1,127 @@
 # V3 Schema node definitions for Duffy_Nodes.
-# Import each node class here and add it to NODE_LIST.
+# Register each node as (module, class name) in _NODE_REGISTRY; NODE_LIST
+# keeps the registry order.
+#
+# Modules are imported one at a time so the startup log can report the
+# import cost of each one, and a module whose optional dependency is missing
+# only disables its own nodes instead of the whole extension. The GGUF
+# analyzers import llama_cpp on first model load (see utils/llama.py);
+# torchaudio and soundfile are imported inside the functions that use them.
 
-from .adaptive_resolution_latent import DuffyAdaptiveResolutionLatent
-from .advanced_connected_image_stitch import DuffyAdvancedConnectedImageStitch
-from .advanced_folder_image_selector import DuffyAdvancedFolderImageSelector
-from .advanced_image_adjuster import DuffyAdvancedImageAdjuster
-from .advanced_layer_control import DuffyAdvancedLayerControl
-from .advanced_text_overlay import DuffyAdvancedTextOverlay
-from .audio_duration import DuffyAudioDuration
-from .audio_slicer import DuffyAudioSlicer
-from .clip_loader import DuffyClipLoader
-from .connected_image_stitch import DuffyConnectedImageStitch
-from .directory_image_iterator import DuffyDirectoryImageIterator
-from .duffy_sam3_mask_editor import DuffySAM3MaskEditor
-from .dynamic_float import DuffyDynamicFloat
-# Primitive nodes
-from .dynamic_integer import DuffyDynamicInteger
-from .dynamic_multi_architecture_sampler import \
-    DuffyDynamicMultiArchitectureSampler
-# Latent nodes (migrated from legacy V1)
-from .empty_qwen_latent import DuffyEmptyQwenLatent
-from .find_and_replace_text import DuffyFindAndReplaceText
-from .five_float_sliders import DuffyFiveFloatSliders
-from .five_int_sliders import DuffyFiveIntSliders
-from .float_math import DuffyFloatMath
-from .flux2_klein_noise import DuffyFlux2KleinNoise
-from .flux_max_shift import DuffyFluxMaxShift
-from .gemma_4_12b_analyzer import DuffyGemma4_12B_Analyzer
-from .gemma_gguf_analyzer import DuffyGemmaGGUFAnalyzer
-from .gemma_ideogram_spatial_architect import DuffyGemmaIdeogramSpatialArchitect
-from .image_adjuster import DuffyImageAdjuster
-from .image_compare import DuffyImageCompare
-from .image_preview import DuffyImagePreview
-from .image_stitch import DuffyImageStitch
-from .image_styler import DuffyImageStyler
-from .image_text_overlay import DuffyImageTextOverlay
-from .integer_math import DuffyIntegerMath
-from .interactive_relight import DuffyInteractiveRelight
-from .iterator_current_filename import DuffyIteratorCurrentFilename
-from .json_format_string import DuffyJsonFormatString
-from .latent_noise_blender import DuffyLatentNoiseBlender
-from .load_image_resize import DuffyLoadImageResize
-# Logic nodes
-from .logic_gate import DuffyLogicGate
-from .lora_loader import DuffyLoraLoader
-from .lora_prompt_combiner import DuffyLoRaPromptCombiner
-from .math_expression import DuffyMathExpression
-from .megapixel_resize import DuffyMegapixelResize
-from .model_selector import DuffyModelSelector
-from .multi_pass_node import DuffyMultiPassSampling
-from .native_group_controller import (DuffyNativeGroupBypasser,
-                                      DuffyNativeGroupMuter,
-                                      DuffyNativeSingleGroupBypasser,
-                                      DuffyNativeSingleGroupMuter)
-from .node_alignment_tool import DuffyNodeAlignmentTool
-from .power_lora_loader import DuffyPowerLoraLoader
-from .primitive_boolean import DuffyPrimitiveBoolean
-from .primitive_float import DuffyPrimitiveFloat
-from .primitive_integer import DuffyPrimitiveInteger
-from .primitive_string import DuffyPrimitiveString
-from .primitive_string_multiline import DuffyPrimitiveStringMultiline
-from .prompt_box import DuffyPromptBox
-from .prompt_loader import DuffyPromptLoader
-from .qwen3_vl_gguf_analyzer import DuffyQwen3VLGGUFAnalyzer
-from .qwen_gguf_analyzer import DuffyQwenGGUFAnalyzer
-# Image processing nodes (migrated from legacy V1)
-from .rgba_to_rgb import DuffyRGBAtoRGB
-from .rich_text_note import DuffyRichTextNote
-from .save_image_sidecar import DuffySaveImageWithSidecar
-from .seed import DuffySeed
-from .seven_float_sliders import DuffySevenFloatSliders
-from .seven_int_sliders import DuffySevenIntSliders
-from .seven_wide_float_sliders import DuffySevenWideFloatSliders
-from .show_anything import DuffyShowAnything
-from .signal_selector import DuffySignalSelector
-from .toggle_switch import DuffyToggleSwitch
-from .triple_sampler_scheduler import DuffyTripleSamplerScheduler
+import importlib
+import logging
+import time
 
-NODE_LIST = [
-    DuffyAudioSlicer,
-    DuffyAudioDuration,
-    DuffyClipLoader,
-    DuffySignalSelector,
-    DuffyLoRaPromptCombiner,
-    DuffyFindAndReplaceText,
-    DuffyFiveFloatSliders,
-    DuffyFiveIntSliders,
-    DuffyFloatMath,
-    DuffySevenFloatSliders,
-    DuffySevenIntSliders,
-    DuffySevenWideFloatSliders,
-    DuffyIntegerMath,
-    DuffyMathExpression,
-    DuffyMultiPassSampling,
-    DuffyToggleSwitch,
+logger = logging.getLogger(__name__)
+
+_NODE_REGISTRY: list[tuple[str, str]] = [
+    ("audio_slicer", "DuffyAudioSlicer"),
+    ("audio_duration", "DuffyAudioDuration"),
+    ("clip_loader", "DuffyClipLoader"),
+    ("signal_selector", "DuffySignalSelector"),
+    ("lora_prompt_combiner", "DuffyLoRaPromptCombiner"),
+    ("find_and_replace_text", "DuffyFindAndReplaceText"),
+    ("five_float_sliders", "DuffyFiveFloatSliders"),
+    ("five_int_sliders", "DuffyFiveIntSliders"),
+    ("float_math", "DuffyFloatMath"),
+    ("seven_float_sliders", "DuffySevenFloatSliders"),
+    ("seven_int_sliders", "DuffySevenIntSliders"),
+    ("seven_wide_float_sliders", "DuffySevenWideFloatSliders"),
+    ("integer_math", "DuffyIntegerMath"),
+    ("math_expression", "DuffyMathExpression"),
+    ("multi_pass_node", "DuffyMultiPassSampling"),
+    ("toggle_switch", "DuffyToggleSwitch"),
     # Image processing
-    DuffyImageAdjuster,
-    DuffyRGBAtoRGB,
-    DuffyMegapixelResize,
-    DuffyLoadImageResize,
-    DuffySaveImageWithSidecar,
-    DuffyDirectoryImageIterator,
-    DuffyIteratorCurrentFilename,
-    DuffyAdvancedFolderImageSelector,
+    ("image_adjuster", "DuffyImageAdjuster"),
+    ("rgba_to_rgb", "DuffyRGBAtoRGB"),
+    ("megapixel_resize", "DuffyMegapixelResize"),
+    ("load_image_resize", "DuffyLoadImageResize"),
+    ("save_image_sidecar", "DuffySaveImageWithSidecar"),
+    ("directory_image_iterator", "DuffyDirectoryImageIterator"),
+    ("iterator_current_filename", "DuffyIteratorCurrentFilename"),
+    ("advanced_folder_image_selector", "DuffyAdvancedFolderImageSelector"),
     # Image stitching
-    DuffyImageCompare,
-    DuffyImageStitch,
-    DuffyConnectedImageStitch,
+    ("image_compare", "DuffyImageCompare"),
+    ("image_stitch", "DuffyImageStitch"),
+    ("connected_image_stitch", "DuffyConnectedImageStitch"),
+    ("contact_sheet", "DuffyContactSheet"),
     # Latent nodes
-    DuffyAdaptiveResolutionLatent,
-    DuffyEmptyQwenLatent,
-    DuffyLatentNoiseBlender,
-    DuffyFlux2KleinNoise,
+    ("adaptive_resolution_latent", "DuffyAdaptiveResolutionLatent"),
+    ("empty_qwen_latent", "DuffyEmptyQwenLatent"),
+    ("latent_noise_blender", "DuffyLatentNoiseBlender"),
+    ("flux2_klein_noise", "DuffyFlux2KleinNoise"),
     # Primitive nodes
-    DuffyDynamicInteger,
-    DuffyDynamicFloat,
-    DuffyPrimitiveBoolean,
-    DuffyPrimitiveInteger,
-    DuffyPrimitiveFloat,
-    DuffyPrimitiveString,
-    DuffyPrimitiveStringMultiline,
-    DuffyRichTextNote,
-    DuffyPromptBox,
-    DuffyPromptLoader,
+    ("dynamic_integer", "DuffyDynamicInteger"),
+    ("dynamic_float", "DuffyDynamicFloat"),
+    ("primitive_boolean", "DuffyPrimitiveBoolean"),
+    ("primitive_integer", "DuffyPrimitiveInteger"),
+    ("primitive_float", "DuffyPrimitiveFloat"),
+    ("primitive_string", "DuffyPrimitiveString"),
+    ("primitive_string_multiline", "DuffyPrimitiveStringMultiline"),
+    ("rich_text_note", "DuffyRichTextNote"),
+    ("prompt_box", "DuffyPromptBox"),
+    ("prompt_loader", "DuffyPromptLoader"),
     # Logic nodes
-    DuffyLogicGate,
+    ("logic_gate", "DuffyLogicGate"),
     # Selector nodes
-    DuffyModelSelector,
+    ("model_selector", "DuffyModelSelector"),
     # Loaders
-    DuffyLoraLoader,
-    DuffyPowerLoraLoader,
+    ("lora_loader", "DuffyLoraLoader"),
+    ("power_lora_loader", "DuffyPowerLoraLoader"),
     # Sampling nodes
-    DuffyDynamicMultiArchitectureSampler,
-    DuffyTripleSamplerScheduler,
-    DuffyFluxMaxShift,
+    ("dynamic_multi_architecture_sampler", "DuffyDynamicMultiArchitectureSampler"),
+    ("triple_sampler_scheduler", "DuffyTripleSamplerScheduler"),
+    ("flux_max_shift", "DuffyFluxMaxShift"),
     # SAM3 nodes
-    DuffySAM3MaskEditor,
+    ("duffy_sam3_mask_editor", "DuffySAM3MaskEditor"),
     # Utility nodes
-    DuffySeed,
-    DuffyNodeAlignmentTool,
-    DuffyJsonFormatString,
-    DuffyShowAnything,
-    DuffyImageTextOverlay,
-    DuffyAdvancedTextOverlay,
-    DuffyAdvancedLayerControl,
-    DuffyInteractiveRelight,
-    DuffyAdvancedImageAdjuster,
-    DuffyAdvancedConnectedImageStitch,
-    DuffyImagePreview,
+    ("seed", "DuffySeed"),
+    ("node_alignment_tool", "DuffyNodeAlignmentTool"),
+    ("json_format_string", "DuffyJsonFormatString"),
+    ("show_anything", "DuffyShowAnything"),
+    ("image_text_overlay", "DuffyImageTextOverlay"),
+    ("advanced_text_overlay", "DuffyAdvancedTextOverlay"),
+    ("advanced_layer_control", "DuffyAdvancedLayerControl"),
+    ("interactive_relight", "DuffyInteractiveRelight"),
+    ("advanced_image_adjuster", "DuffyAdvancedImageAdjuster"),
+    ("advanced_connected_image_stitch", "DuffyAdvancedConnectedImageStitch"),
+    ("image_preview", "DuffyImagePreview"),
     # LLM nodes
-    DuffyImageStyler,
-    DuffyGemmaGGUFAnalyzer,
-    DuffyGemma4_12B_Analyzer,
-    DuffyGemmaIdeogramSpatialArchitect,
-    DuffyQwenGGUFAnalyzer,
-    DuffyQwen3VLGGUFAnalyzer,
+    ("image_styler", "DuffyImageStyler"),
+    ("gemma_gguf_analyzer", "DuffyGemmaGGUFAnalyzer"),
+    ("gemma_4_12b_analyzer", "DuffyGemma4_12B_Analyzer"),
+    ("gemma_ideogram_spatial_architect", "DuffyGemmaIdeogramSpatialArchitect"),
+    ("qwen_gguf_analyzer", "DuffyQwenGGUFAnalyzer"),
+    ("qwen3_vl_gguf_analyzer", "DuffyQwen3VLGGUFAnalyzer"),
     # Group Control
-    DuffyNativeGroupBypasser,
-    DuffyNativeGroupMuter,
-    DuffyNativeSingleGroupBypasser,
-    DuffyNativeSingleGroupMuter,
+    ("native_group_controller", "DuffyNativeGroupBypasser"),
+    ("native_group_controller", "DuffyNativeGroupMuter"),
+    ("native_group_controller", "DuffyNativeSingleGroupBypasser"),
+    ("native_group_controller", "DuffyNativeSingleGroupMuter"),
 ]
+
+# module name → import time in seconds / error message, filled by _load_node_list()
+IMPORT_TIMINGS: dict[str, float] = {}
+IMPORT_ERRORS: dict[str, str] = {}
+
+
+def _load_node_list() -> list[type]:
+    modules: dict[str, object | None] = {}
+    node_list = []
+    for module_name, class_name in _NODE_REGISTRY:
+        if module_name not in modules:
+            started = time.perf_counter()
+            try:
+                modules[module_name] = importlib.import_module(f".{module_name}", __name__)
+            except Exception as e:
+                modules[module_name] = None
+                IMPORT_ERRORS[module_name] = str(e)
+                logger.error("[ Duffy_Nodes ] Failed to import nodes.%s: %s", module_name, e)
+            IMPORT_TIMINGS[module_name] = time.perf_counter() - started
+        module = modules[module_name]
+        if module is not None:
+            node_list.append(getattr(module, class_name))
+    return node_list
+
+
+NODE_LIST = _load_node_list()
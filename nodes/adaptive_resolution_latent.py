@@ -1,8 +1,9 @@
 import json
 
-import torch
 from comfy_api.latest import io
 
+from ..core.latent import LATENT_DEVICES, LATENT_MODES, empty_latent
+
 
 class DuffyAdaptiveResolutionLatent(io.ComfyNode):
     @classmethod
@@ -15,6 +16,10 @@ class DuffyAdaptiveResolutionLatent(io.ComfyNode):
             inputs=[
                 io.Int.Input("batch_size", default=1, min=1, max=4096),
                 io.String.Input("state_json", default="{}", socketless=True),
+                io.Combo.Input("latent_mode", options=LATENT_MODES, default="Dense", advanced=True,
+                               tooltip="Lazy emits a zero view that is only allocated when a consumer writes to it"),
+                io.Combo.Input("device", options=LATENT_DEVICES, default="cpu", advanced=True,
+                               tooltip="Create the latent directly on the sampling device instead of host memory"),
             ],
             outputs=[
                 io.Int.Output("width", display_name="WIDTH"),
@@ -24,7 +29,7 @@ class DuffyAdaptiveResolutionLatent(io.ComfyNode):
         )
 
     @classmethod
-    def execute(cls, batch_size: int, state_json: str, **kwargs) -> io.NodeOutput:
+    def execute(cls, batch_size: int, state_json: str, latent_mode: str = "Dense", device: str = "cpu", **kwargs) -> io.NodeOutput:
         try:
             state = json.loads(state_json)
         except json.JSONDecodeError:
@@ -50,6 +55,6 @@ class DuffyAdaptiveResolutionLatent(io.ComfyNode):
         spatial_w = width // downscale
         
         # Generate empty latent
-        latent_tensor = torch.zeros([batch_size, channels, spatial_h, spatial_w], device="cpu")
+        latent_tensor = empty_latent([batch_size, channels, spatial_h, spatial_w], latent_mode, device)
         
         return io.NodeOutput(width, height, {"samples": latent_tensor})
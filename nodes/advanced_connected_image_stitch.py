@@ -4,7 +4,6 @@ import json
 import threading
 import uuid
 
-import comfy.utils
 import numpy as np
 import server
 import torch
@@ -12,6 +11,9 @@ from aiohttp import web
 from comfy_api.latest import io, ui
 from PIL import Image
 
+from ..core.stitch import (placeholder_image, stitch_horizontal,
+                            stitch_layout, stitch_vertical)
+
 # Dictionary to hold thread synchronization objects
 PENDING_STITCHES = {}
 
@@ -36,64 +38,6 @@ except Exception:
 
 SLOTS = 9
 
-def _stitch_horizontal(tensors: list[torch.Tensor]) -> torch.Tensor:
-    max_h = max(t.shape[1] for t in tensors)
-    resized = []
-    for t in tensors:
-        _, h, w, _ = t.shape
-        if h == max_h:
-            resized.append(t)
-        else:
-            new_w = max(1, round(w * (max_h / h)))
-            bchw = t.movedim(-1, 1)
-            scaled = comfy.utils.common_upscale(bchw, new_w, max_h, "lanczos", crop="disabled")
-            resized.append(scaled.movedim(1, -1))
-    return torch.cat(resized, dim=2)
-
-def _stitch_vertical(tensors: list[torch.Tensor]) -> torch.Tensor:
-    min_w = min(t.shape[2] for t in tensors)
-    cropped = []
-    for t in tensors:
-        _, h, w, _ = t.shape
-        if w == min_w:
-            cropped.append(t)
-        else:
-            offset = (w - min_w) // 2
-            cropped.append(t[:, :, offset:offset + min_w, :])
-    return torch.cat(cropped, dim=1)
-
-def _scale_to_cell(t: torch.Tensor, cell_h: int, cell_w: int) -> torch.Tensor:
-    bchw = t.movedim(-1, 1)
-    scaled = comfy.utils.common_upscale(bchw, cell_w, cell_h, "lanczos", crop="disabled")
-    return scaled.movedim(1, -1)
-
-def _stitch_layout(grid: list[list[torch.Tensor | None]]) -> torch.Tensor:
-    active_rows = [r for r in range(3) if any(grid[r][c] is not None for c in range(3))]
-    active_cols = [c for c in range(3) if any(grid[r][c] is not None for r in range(3))]
-
-    if not active_rows or not active_cols:
-        return torch.zeros((1, 64, 64, 3), dtype=torch.float32)
-
-    all_tensors = [grid[r][c] for r in active_rows for c in active_cols if grid[r][c] is not None]
-    if not all_tensors:
-        return torch.zeros((1, 64, 64, 3), dtype=torch.float32)
-
-    cell_h = max(t.shape[1] for t in all_tensors)
-    cell_w = max(t.shape[2] for t in all_tensors)
-
-    row_tensors = []
-    for r in active_rows:
-        cells = []
-        for c in active_cols:
-            t = grid[r][c]
-            if t is not None:
-                cells.append(_scale_to_cell(t, cell_h, cell_w))
-            else:
-                cells.append(torch.zeros((1, cell_h, cell_w, 3), dtype=torch.float32))
-        row_tensors.append(torch.cat(cells, dim=2))
-
-    return torch.cat(row_tensors, dim=1)
-
 class DuffyAdvancedConnectedImageStitch(io.ComfyNode):
     @classmethod
     def define_schema(cls) -> io.Schema:
@@ -131,7 +75,7 @@ class DuffyAdvancedConnectedImageStitch(io.ComfyNode):
                 images[i] = t
 
         if not images:
-            return io.NodeOutput(torch.zeros((1, 64, 64, 3), dtype=torch.float32))
+            return io.NodeOutput(placeholder_image())
 
         if pause_execution:
             session_id = str(uuid.uuid4())
@@ -177,7 +121,7 @@ class DuffyAdvancedConnectedImageStitch(io.ComfyNode):
                     if img_idx in images:
                         r, c = divmod(pos - 1, 3)
                         grid[r][c] = images[img_idx]
-            result = _stitch_layout(grid)
+            result = stitch_layout(grid)
             return io.NodeOutput(result)
 
         tensors = [images[i] for i in sorted(images)]
@@ -186,8 +130,8 @@ class DuffyAdvancedConnectedImageStitch(io.ComfyNode):
             return io.NodeOutput(tensors[0])
 
         if orientation == "Horizontal":
-            result = _stitch_horizontal(tensors)
+            result = stitch_horizontal(tensors)
         else:
-            result = _stitch_vertical(tensors)
+            result = stitch_vertical(tensors)
 
         return io.NodeOutput(result, ui=ui.PreviewImage(result, cls=cls))
@@ -1,15 +1,20 @@
+import os
+import re
+
 import torch
 from comfy_api.latest import io
 
+SLICE_MODES = ["Single", "Ranges", "Window"]
+
 
 def parse_time(time_str: str) -> float:
     """Parses a time string like 'MM:SS', 'HH:MM:SS', or 'SS.s' into float seconds."""
     if not time_str or time_str.strip() == "":
         return 0.0
-    
+
     parts = time_str.strip().split(':')
     seconds = 0.0
-    
+
     try:
         if len(parts) == 3:
             # HH:MM:SS
@@ -22,13 +27,86 @@ def parse_time(time_str: str) -> float:
             seconds = float(parts[0])
     except ValueError:
         pass
-        
+
     return seconds
 
 
+def parse_ranges(ranges: str) -> list[tuple[float, float]]:
+    """
+    Parses 'start-end' entries separated by newlines, commas or semicolons into (start, end) seconds.
+    Entries without a '-' separator or spanning zero time are skipped.
+    """
+    parsed = []
+    for entry in re.split(r"[\n,;]+", ranges or ""):
+        start_str, separator, end_str = entry.partition("-")
+        if not separator:
+            continue
+        start_seconds, end_seconds = parse_time(start_str), parse_time(end_str)
+        if start_seconds > end_seconds:
+            start_seconds, end_seconds = end_seconds, start_seconds
+        if end_seconds > start_seconds:
+            parsed.append((start_seconds, end_seconds))
+    return parsed
+
+
+def segment_bounds(
+    mode: str,
+    total_samples: int,
+    sample_rate: int,
+    start_time: str,
+    end_time: str,
+    ranges: str,
+    window_seconds: float,
+    hop_seconds: float,
+) -> list[tuple[int, int]]:
+    """Returns clamped (start_sample, end_sample) pairs for the selected slicing mode."""
+    if mode == "Window":
+        window = max(1, int(window_seconds * sample_rate))
+        hop = max(1, int(hop_seconds * sample_rate)) if hop_seconds > 0 else window
+        if total_samples <= window:
+            return [(0, total_samples)] if total_samples > 0 else []
+        bounds = [(start, start + window) for start in range(0, total_samples - window + 1, hop)]
+        # At most one shorter window covers the samples after the last full one
+        tail_start = bounds[-1][0] + hop
+        if bounds[-1][1] < total_samples and tail_start < total_samples:
+            bounds.append((tail_start, total_samples))
+        return bounds
+
+    if mode == "Ranges":
+        seconds = parse_ranges(ranges)
+        if not seconds:
+            raise ValueError("Ranges mode found no valid ranges; enter entries like '0:05-0:12, 1:00-1:30'.")
+    else:
+        start_seconds, end_seconds = parse_time(start_time), parse_time(end_time)
+        # Ensure start_seconds is strictly less than end_seconds, otherwise flip
+        if start_seconds > end_seconds:
+            start_seconds, end_seconds = end_seconds, start_seconds
+        seconds = [(start_seconds, end_seconds)]
+
+    bounds = []
+    for start_seconds, end_seconds in seconds:
+        start_sample = max(0, min(int(start_seconds * sample_rate), total_samples))
+        end_sample = max(start_sample, min(int(end_seconds * sample_rate), total_samples))
+        bounds.append((start_sample, end_sample))
+    return bounds
+
+
+def _resolve_audio_path(source_path: str) -> str:
+    cleaned = source_path.strip().strip('"').strip("'")
+    if os.path.isfile(cleaned):
+        return cleaned
+    import folder_paths
+
+    resolved = folder_paths.get_annotated_filepath(cleaned)
+    if not os.path.isfile(resolved):
+        raise FileNotFoundError(f"Audio file not found: {source_path}")
+    return resolved
+
+
 class DuffyAudioSlicer(io.ComfyNode):
     """
     Slices a portion of an audio file based on start and end times string format (e.g. 0:30, 3:44, or 10.5).
+    Ranges and Window modes cut many segments in one execution and return them as a list.
     """
 
     @classmethod
@@ -37,74 +115,138 @@ class DuffyAudioSlicer(io.ComfyNode):
             node_id="Duffy_AudioSlicer",
             display_name="Audio Slicer",
             category="Duffy/Audio",
-            description="Slices a portion of an audio file based on start and end times string format (e.g. 0:30, 3:44, or 10.5).",
+            description=(
+                "Slices a portion of an audio file based on start and end times string format (e.g. 0:30, 3:44, or 10.5). "
+                "Ranges and Window modes return every segment as a list in one execution."
+            ),
             inputs=[
                 io.Audio.Input(
-                    "audio", 
+                    "audio",
                     display_name="Audio File",
+                    optional=True,
                     tooltip="The audio file to slice"
                 ),
                 io.String.Input(
-                    "start_time", 
-                    display_name="Start Time", 
-                    default="0:00", 
+                    "start_time",
+                    display_name="Start Time",
+                    default="0:00",
                     tooltip="Start time in format like 0:30, 1:20:00, or just seconds like 10.5"
                 ),
                 io.String.Input(
-                    "end_time", 
-                    display_name="End Time", 
-                    default="0:10", 
+                    "end_time",
+                    display_name="End Time",
+                    default="0:10",
                     tooltip="End time in format like 0:30, 1:20:00, or just seconds like 10.5"
                 ),
+                io.Combo.Input(
+                    "mode",
+                    display_name="Mode",
+                    options=SLICE_MODES,
+                    default="Single",
+                    tooltip="Single: one start/end window. Ranges: one segment per line of 'ranges'. Window: fixed window/hop over the whole file",
+                ),
+                io.String.Input(
+                    "ranges",
+                    display_name="Ranges",
+                    default="",
+                    multiline=True,
+                    tooltip="Ranges mode: 'start-end' per line (or comma separated), e.g. 0:00-0:12",
+                ),
+                io.Float.Input(
+                    "window_seconds",
+                    display_name="Window (s)",
+                    default=10.0,
+                    min=0.01,
+                    max=86400.0,
+                    step=0.01,
+                    tooltip="Window mode: segment length in seconds",
+                ),
+                io.Float.Input(
+                    "hop_seconds",
+                    display_name="Hop (s)",
+                    default=0.0,
+                    min=0.0,
+                    max=86400.0,
+                    step=0.01,
+                    tooltip="Window mode: distance between segment starts; 0 uses the window length (no overlap)",
+                ),
+                io.String.Input(
+                    "source_path",
+                    display_name="Source Path",
+                    default="",
+                    advanced=True,
+                    tooltip="Read segments directly from this file in chunks instead of slicing the connected audio",
+                ),
             ],
             outputs=[
                 io.Audio.Output(
-                    "audio", 
+                    "audio",
                     display_name="Modified Audio",
-                    tooltip="The sliced audio"
+                    is_output_list=True,
+                    tooltip="The sliced audio (one entry per segment)"
                 ),
             ],
         )
 
     @classmethod
-    def execute(cls, audio: dict, start_time: str, end_time: str, **kwargs) -> io.NodeOutput:
+    def execute(
+        cls,
+        start_time: str,
+        end_time: str,
+        audio: dict | None = None,
+        mode: str = "Single",
+        ranges: str = "",
+        window_seconds: float = 10.0,
+        hop_seconds: float = 0.0,
+        source_path: str = "",
+        **kwargs,
+    ) -> io.NodeOutput:
+        bounds_args = (start_time, end_time, ranges, window_seconds, hop_seconds)
+
+        if source_path and source_path.strip():
+            return io.NodeOutput(cls._slice_file(_resolve_audio_path(source_path), mode, *bounds_args))
+
+        if audio is None:
+            raise ValueError("Connect an audio input or set a source path.")
+
         waveform: torch.Tensor | None = audio.get("waveform")
         sampler_rate: int | None = audio.get("sampler_rate")
-        
+
         # Some audio dictionaries use 'sample_rate' instead of 'sampler_rate'
         if sampler_rate is None:
             sampler_rate = audio.get("sample_rate")
 
         if waveform is None or sampler_rate is None:
-            return io.NodeOutput(audio)
-        
-        start_seconds = parse_time(start_time)
-        end_seconds = parse_time(end_time)
-
-        # Ensure start_seconds is strictly less than end_seconds, otherwise flip
-        if start_seconds > end_seconds:
-            start_seconds, end_seconds = end_seconds, start_seconds
+            return io.NodeOutput([audio])
 
         # Audio waveform shape is typically [B, C, samples] or [1, C, samples]
-        # We slice along the last dimension (samples)
-        start_sample = int(start_seconds * sampler_rate)
-        end_sample = int(end_seconds * sampler_rate)
-
-        # Handle bounds
-        max_samples = waveform.size(-1)
-        start_sample = max(0, min(start_sample, max_samples))
-        end_sample = max(start_sample, min(end_sample, max_samples))
-
-        # Slice the last dimension
-        sliced_waveform = waveform[..., start_sample:end_sample]
-
-        # Return the new audio dictionary structure
-        new_audio = dict(audio)  # copy original metadata
-        new_audio["waveform"] = sliced_waveform
-        # Make sure that whichever sampling rate key was used before is safely written back
-        if "sampler_rate" in audio:
-            new_audio["sampler_rate"] = sampler_rate
-        else:
-            new_audio["sample_rate"] = sampler_rate
+        # We slice along the last dimension (samples); slices are views, not copies
+        bounds = segment_bounds(mode, waveform.size(-1), sampler_rate, *bounds_args)
+
+        segments = []
+        for start_sample, end_sample in bounds:
+            new_audio = dict(audio)  # copy original metadata
+            new_audio["waveform"] = waveform[..., start_sample:end_sample]
+            # Make sure that whichever sampling rate key was used before is safely written back
+            if "sampler_rate" in audio:
+                new_audio["sampler_rate"] = sampler_rate
+            else:
+                new_audio["sample_rate"] = sampler_rate
+            segments.append(new_audio)
+
+        return io.NodeOutput(segments)
+
+    @staticmethod
+    def _slice_file(path: str, mode: str, *bounds_args) -> list[dict]:
+        """Read only the requested sample ranges from disk, one segment at a time."""
+        import soundfile as sf
 
-        return io.NodeOutput(new_audio)
+        segments = []
+        with sf.SoundFile(path) as audio_file:
+            sample_rate = audio_file.samplerate
+            for start_sample, end_sample in segment_bounds(mode, audio_file.frames, sample_rate, *bounds_args):
+                audio_file.seek(start_sample)
+                data = audio_file.read(frames=end_sample - start_sample, dtype="float32", always_2d=True)
+                waveform = torch.from_numpy(data.T.copy()).unsqueeze(0)  # [frames, C] -> [1, C, frames]
+                segments.append({"waveform": waveform, "sample_rate": sample_rate})
+        return segments
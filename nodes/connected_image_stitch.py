@@ -6,93 +6,13 @@ output image — horizontally, vertically, or in a 3×3 grid layout.
 
 import hashlib
 
-import comfy.utils
 import torch
 from comfy_api.latest import io
 
-SLOTS = 9
-
-
-# ---------------------------------------------------------------------------
-# Stitching helpers
-# ---------------------------------------------------------------------------
-
-def _stitch_horizontal(tensors: list[torch.Tensor]) -> torch.Tensor:
-    """
-    Stitch images side-by-side. All images are scaled to the height of
-    the tallest image (preserving aspect ratio), then concatenated along width.
-    """
-    max_h = max(t.shape[1] for t in tensors)
-    resized = []
-    for t in tensors:
-        _, h, w, _ = t.shape
-        if h == max_h:
-            resized.append(t)
-        else:
-            new_w = max(1, round(w * (max_h / h)))
-            bchw = t.movedim(-1, 1)
-            scaled = comfy.utils.common_upscale(bchw, new_w, max_h, "lanczos", crop="disabled")
-            resized.append(scaled.movedim(1, -1))
-    return torch.cat(resized, dim=2)  # cat along W
-
-
-def _stitch_vertical(tensors: list[torch.Tensor]) -> torch.Tensor:
-    """
-    Stack images vertically. All images are center-cropped to the width of
-    the narrowest image, then concatenated along height.
-    """
-    min_w = min(t.shape[2] for t in tensors)
-    cropped = []
-    for t in tensors:
-        _, h, w, _ = t.shape
-        if w == min_w:
-            cropped.append(t)
-        else:
-            offset = (w - min_w) // 2
-            cropped.append(t[:, :, offset:offset + min_w, :])
-    return torch.cat(cropped, dim=1)  # cat along H
+from ..core.stitch import (placeholder_image, stitch_horizontal,
+                            stitch_layout, stitch_vertical)
 
-
-def _scale_to_cell(t: torch.Tensor, cell_h: int, cell_w: int) -> torch.Tensor:
-    """Scale a [1,H,W,C] tensor to exactly (cell_h, cell_w) using lanczos."""
-    bchw = t.movedim(-1, 1)
-    scaled = comfy.utils.common_upscale(bchw, cell_w, cell_h, "lanczos", crop="disabled")
-    return scaled.movedim(1, -1)
-
-
-def _stitch_layout(grid: list[list[torch.Tensor | None]]) -> torch.Tensor:
-    """
-    Stitch images preserving their 3×3 grid positions.
-
-    - Rows and columns that contain zero images are excluded.
-    - All images are scaled to a uniform cell size (max_h × max_w).
-    - Empty cells within active rows/columns are filled with black.
-    """
-    active_rows = [r for r in range(3) if any(grid[r][c] is not None for c in range(3))]
-    active_cols = [c for c in range(3) if any(grid[r][c] is not None for r in range(3))]
-
-    if not active_rows or not active_cols:
-        return torch.zeros((1, 64, 64, 3), dtype=torch.float32)
-
-    all_tensors = [grid[r][c] for r in active_rows for c in active_cols if grid[r][c] is not None]
-    if not all_tensors:
-        return torch.zeros((1, 64, 64, 3), dtype=torch.float32)
-
-    cell_h = max(t.shape[1] for t in all_tensors)
-    cell_w = max(t.shape[2] for t in all_tensors)
-
-    row_tensors = []
-    for r in active_rows:
-        cells = []
-        for c in active_cols:
-            t = grid[r][c]
-            if t is not None:
-                cells.append(_scale_to_cell(t, cell_h, cell_w))
-            else:
-                cells.append(torch.zeros((1, cell_h, cell_w, 3), dtype=torch.float32))
-        row_tensors.append(torch.cat(cells, dim=2))  # cat along W
-
-    return torch.cat(row_tensors, dim=1)  # cat along H
+SLOTS = 9
 
 
 # ---------------------------------------------------------------------------
@@ -173,7 +93,7 @@ class DuffyConnectedImageStitch(io.ComfyNode):
                 images[i] = t
 
         if not images:
-            return io.NodeOutput(torch.zeros((1, 64, 64, 3), dtype=torch.float32))
+            return io.NodeOutput(placeholder_image())
 
         if orientation == "Layout":
             # Build 3×3 grid using layout_pos mapping
@@ -185,7 +105,7 @@ class DuffyConnectedImageStitch(io.ComfyNode):
                     if img_idx in images:
                         r, c = divmod(pos - 1, 3)
                         grid[r][c] = images[img_idx]
-            result = _stitch_layout(grid)
+            result = stitch_layout(grid)
             return io.NodeOutput(result)
 
         # Horizontal / Vertical — collect as ordered list
@@ -195,9 +115,9 @@ class DuffyConnectedImageStitch(io.ComfyNode):
             return io.NodeOutput(tensors[0])
 
         if orientation == "Horizontal":
-            result = _stitch_horizontal(tensors)
+            result = stitch_horizontal(tensors)
         else:
-            result = _stitch_vertical(tensors)
+            result = stitch_vertical(tensors)
 
         return io.NodeOutput(result)
 
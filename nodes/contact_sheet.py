@@ -0,0 +1,317 @@
+"""
+Contact Sheet Node (V3 Schema)
+Lay out an image list or batch of any length on a single sheet — fixed
+columns, a target sheet aspect, or a masonry layout — with optional
+label strips underneath each tile.
+"""
+
+import math
+
+import numpy as np
+import torch
+from comfy_api.latest import io
+from PIL import Image, ImageDraw, ImageFont
+
+from ..core.stitch import placeholder_image, resize_tiles
+from .image_text_overlay import resolve_font_path
+
+LAYOUT_MODES = ["Fixed Columns", "Target Aspect", "Masonry"]
+
+
+# ---------------------------------------------------------------------------
+# Layout helpers
+# ---------------------------------------------------------------------------
+
+def _auto_columns(count: int) -> int:
+    return max(1, math.ceil(math.sqrt(count)))
+
+
+def _fit(h: int, w: int, cell_h: int, cell_w: int) -> tuple[int, int]:
+    """Largest (h, w) that fits inside the cell while preserving aspect ratio."""
+    scale = min(cell_h / h, cell_w / w)
+    return max(1, round(h * scale)), max(1, round(w * scale))
+
+
+def _aspect_columns(count: int, cell_h: int, cell_w: int, spacing: int, target: float) -> int:
+    """Pick the column count whose sheet aspect (W/H) is closest to ``target``."""
+    best_cols, best_err = 1, float("inf")
+    for cols in range(1, count + 1):
+        rows = math.ceil(count / cols)
+        sheet_w = cols * cell_w + (cols + 1) * spacing
+        sheet_h = rows * cell_h + (rows + 1) * spacing
+        err = abs(math.log((sheet_w / sheet_h) / target))
+        if err < best_err:
+            best_cols, best_err = cols, err
+    return best_cols
+
+
+def _grid_layout(
+    shapes: list[tuple[int, int]],
+    cols: int,
+    tile_width: int,
+    label_height: int,
+    spacing: int,
+) -> tuple[list[tuple[int, int, int, int]], list[tuple[int, int]], int, int]:
+    """
+    Uniform-cell layout. The cell height follows the median tile aspect so a
+    homogeneous sweep fills its cells exactly; outliers are letterboxed.
+
+    Returns (tile boxes as (y, x, h, w), label origins as (y, x), sheet_h, sheet_w).
+    """
+    aspects = sorted(h / w for h, w in shapes)
+    cell_w = tile_width
+    cell_h = max(1, round(tile_width * aspects[len(aspects) // 2]))
+    block_h = cell_h + label_height
+
+    boxes, label_origins = [], []
+    for idx, (h, w) in enumerate(shapes):
+        r, c = divmod(idx, cols)
+        cell_y = spacing + r * (block_h + spacing)
+        cell_x = spacing + c * (cell_w + spacing)
+        th, tw = _fit(h, w, cell_h, cell_w)
+        boxes.append((cell_y + (cell_h - th) // 2, cell_x + (cell_w - tw) // 2, th, tw))
+        label_origins.append((cell_y + cell_h, cell_x))
+
+    rows = math.ceil(len(shapes) / cols)
+    sheet_h = spacing + rows * (block_h + spacing)
+    sheet_w = spacing + cols * (cell_w + spacing)
+    return boxes, label_origins, sheet_h, sheet_w
+
+
+def _masonry_layout(
+    shapes: list[tuple[int, int]],
+    cols: int,
+    tile_width: int,
+    label_height: int,
+    spacing: int,
+) -> tuple[list[tuple[int, int, int, int]], list[tuple[int, int]], int, int]:
+    """
+    Fixed-width columns; each tile keeps its own aspect ratio and is dropped
+    into the currently shortest column.
+    """
+    col_heights = [spacing] * cols
+    boxes, label_origins = [], []
+    for h, w in shapes:
+        c = min(range(cols), key=col_heights.__getitem__)
+        th = max(1, round(tile_width * h / w))
+        y = col_heights[c]
+        x = spacing + c * (tile_width + spacing)
+        boxes.append((y, x, th, tile_width))
+        label_origins.append((y + th, x))
+        col_heights[c] = y + th + label_height + spacing
+
+    sheet_w = spacing + cols * (tile_width + spacing)
+    return boxes, label_origins, max(col_heights), sheet_w
+
+
+# ---------------------------------------------------------------------------
+# Label rendering
+# ---------------------------------------------------------------------------
+
+def _load_label_font(size: int):
+    try:
+        return ImageFont.truetype(resolve_font_path("Arial"), size)
+    except OSError:
+        try:
+            return ImageFont.load_default(size=size)
+        except TypeError:
+            return ImageFont.load_default()
+
+
+def _render_label(text: str, width: int, height: int, font, background: float) -> torch.Tensor:
+    """Render a single-line label strip as a [height, width, 3] float tensor."""
+    strip = Image.new("L", (width, height), 0)
+    draw = ImageDraw.Draw(strip)
+    if draw.textlength(text, font=font) > width - 8:
+        while text and draw.textlength(text + "…", font=font) > width - 8:
+            text = text[:-1]
+        text += "…"
+    draw.text((4, height // 2), text, fill=255, font=font, anchor="lm")
+
+    ink = torch.from_numpy(np.asarray(strip, dtype=np.float32) / 255.0)
+    text_value = 0.0 if background > 0.5 else 1.0
+    value = background + (text_value - background) * ink
+    return value.unsqueeze(-1).expand(-1, -1, 3)
+
+
+# ---------------------------------------------------------------------------
+# Node
+# ---------------------------------------------------------------------------
+
+class DuffyContactSheet(io.ComfyNode):
+    """
+    Build a contact sheet from an image list or batch of any length.
+
+    Tiles are downscaled in batched chunks straight into one preallocated
+    canvas, so peak memory is the sheet plus a single chunk and the cost
+    grows linearly with the tile count.
+    """
+
+    @classmethod
+    def define_schema(cls) -> io.Schema:
+        return io.Schema(
+            node_id="Duffy_ContactSheet",
+            display_name="Duffy Contact Sheet",
+            category="Duffy/Image",
+            description=(
+                "Lays out any number of images on one sheet. Accepts image lists "
+                "and batches. Fixed Columns and Target Aspect use uniform cells; "
+                "Masonry keeps each tile's aspect ratio in fixed-width columns. "
+                "Optional labels are drawn in a strip under each tile."
+            ),
+            is_input_list=True,
+            inputs=[
+                io.Image.Input(
+                    "images",
+                    display_name="Images",
+                    tooltip="Image list or batch; every frame becomes one tile",
+                ),
+                io.Combo.Input(
+                    "layout",
+                    options=LAYOUT_MODES,
+                    default="Fixed Columns",
+                    display_name="Layout",
+                    tooltip="How tiles are arranged on the sheet",
+                ),
+                io.Int.Input(
+                    "columns",
+                    display_name="Columns",
+                    default=0,
+                    min=0,
+                    max=256,
+                    tooltip="Column count for Fixed Columns / Masonry (0 = auto, roughly square)",
+                ),
+                io.Float.Input(
+                    "target_aspect",
+                    display_name="Target Aspect",
+                    default=16 / 9,
+                    min=0.1,
+                    max=10.0,
+                    step=0.01,
+                    tooltip="Sheet width / height used by the Target Aspect layout",
+                ),
+                io.Int.Input(
+                    "tile_width",
+                    display_name="Tile Width",
+                    default=256,
+                    min=16,
+                    max=4096,
+                    step=8,
+                    tooltip="Width of each cell in pixels; tiles are downscaled to fit",
+                ),
+                io.Int.Input(
+                    "spacing",
+                    display_name="Spacing",
+                    default=4,
+                    min=0,
+                    max=256,
+                    tooltip="Gap between tiles and around the sheet border",
+                ),
+                io.Float.Input(
+                    "background",
+                    display_name="Background",
+                    default=0.0,
+                    min=0.0,
+                    max=1.0,
+                    step=0.01,
+                    tooltip="Gray level of the sheet background and label strips",
+                ),
+                io.Int.Input(
+                    "label_height",
+                    display_name="Label Height",
+                    default=24,
+                    min=0,
+                    max=256,
+                    tooltip="Height of the label strip under each tile (0 disables labels)",
+                ),
+                io.Int.Input(
+                    "chunk_size",
+                    display_name="Chunk Size",
+                    default=16,
+                    min=1,
+                    max=256,
+                    advanced=True,
+                    tooltip="Tiles resized per batched call; bounds peak memory",
+                ),
+                io.String.Input(
+                    "labels",
+                    display_name="Labels",
+                    optional=True,
+                    force_input=True,
+                    tooltip="String list; one label per tile in order",
+                ),
+            ],
+            outputs=[
+                io.Image.Output(
+                    "sheet",
+                    display_name="Contact Sheet",
+                    tooltip="The assembled contact sheet",
+                ),
+            ],
+        )
+
+    @classmethod
+    def execute(
+        cls,
+        images: list[torch.Tensor],
+        layout: list[str],
+        columns: list[int],
+        target_aspect: list[float],
+        tile_width: list[int],
+        spacing: list[int],
+        background: list[float],
+        label_height: list[int],
+        chunk_size: list[int],
+        labels: list[str] | None = None,
+    ) -> io.NodeOutput:
+        layout_mode = layout[0]
+        tile_w = tile_width[0]
+        gap = spacing[0]
+        bg = background[0]
+        chunk = chunk_size[0]
+
+        # Split every batch into [1,H,W,C] views — no copies.
+        tiles = [
+            img[i:i + 1, :, :, :3]
+            for img in images if img is not None
+            for i in range(img.shape[0])
+        ]
+        if not tiles:
+            return io.NodeOutput(placeholder_image())
+
+        label_texts = [str(t) for t in (labels or [])]
+        strip_h = label_height[0] if label_texts else 0
+        shapes = [(t.shape[1], t.shape[2]) for t in tiles]
+        count = len(tiles)
+
+        if layout_mode == "Masonry":
+            cols = min(columns[0] or _auto_columns(count), count)
+            boxes, label_origins, sheet_h, sheet_w = _masonry_layout(shapes, cols, tile_w, strip_h, gap)
+        else:
+            if layout_mode == "Target Aspect":
+                aspects = sorted(h / w for h, w in shapes)
+                cell_h = max(1, round(tile_w * aspects[len(aspects) // 2]))
+                cols = _aspect_columns(count, cell_h + strip_h, tile_w, gap, target_aspect[0])
+            else:
+                cols = min(columns[0] or _auto_columns(count), count)
+            boxes, label_origins, sheet_h, sheet_w = _grid_layout(shapes, cols, tile_w, strip_h, gap)
+
+        canvas = torch.full((1, sheet_h, sheet_w, 3), bg, dtype=torch.float32)
+
+        # Resize and place tiles chunk by chunk in row-major order.
+        for start in range(0, count, chunk):
+            stop = min(start + chunk, count)
+            sizes = [(h, w) for _, _, h, w in boxes[start:stop]]
+            resized = resize_tiles(tiles[start:stop], sizes)
+            for (y, x, h, w), tile in zip(boxes[start:stop], resized):
+                canvas[:, y:y + h, x:x + w, :] = tile.to(canvas.device, canvas.dtype)
+            del resized
+
+        if strip_h:
+            font = _load_label_font(max(8, int(strip_h * 0.6)))
+            for idx, (y, x) in enumerate(label_origins):
+                if idx >= len(label_texts) or not label_texts[idx]:
+                    continue
+                canvas[0, y:y + strip_h, x:x + tile_w, :] = _render_label(label_texts[idx], tile_w, strip_h, font, bg)
+
+        return io.NodeOutput(canvas)
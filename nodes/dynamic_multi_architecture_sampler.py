@@ -1,4 +1,6 @@
+import logging
 import math
+import time
 
 import comfy.sample
 import comfy.samplers
@@ -7,6 +9,10 @@ import latent_preview
 import torch
 from comfy_api.latest import io
 
+from ..core.latent import materialize_latent
+
+logger = logging.getLogger(__name__)
+
 
 class DuffyDynamicMultiArchitectureSampler(io.ComfyNode):
     DEFAULT_PROFILE = "Z-Image Base"
@@ -200,7 +206,8 @@ class DuffyDynamicMultiArchitectureSampler(io.ComfyNode):
         ofd_parallel_mix: float,
         sigma_ratio: float,
         start_percent: float,
-        end_percent: float
+        end_percent: float,
+        cache: dict | None = None,
     ) -> torch.Tensor:
         if guided_noise.ndim < 2 or direction.ndim < 2:
             return guided_noise
@@ -213,10 +220,11 @@ class DuffyDynamicMultiArchitectureSampler(io.ComfyNode):
         normalized_pos = (progress - start_percent) / (end_percent - start_percent)
         envelope = math.sin(normalized_pos * math.pi) * float(ofd_strength)
 
-        flat_dir = direction.reshape(direction.shape[0], -1)
+        # Berechnung in Float32 für numerische Stabilität bei Float16/BFloat16
+        flat_dir = direction.reshape(direction.shape[0], -1).to(torch.float32)
         guided_flat = guided_noise.reshape(guided_noise.shape[0], -1)
-        dir_norm = flat_dir.norm(dim=1, keepdim=True).clamp_min(cls._EPS)
-        guided_norm = guided_flat.norm(dim=1, keepdim=True).clamp_min(cls._EPS)
+        dir_norm = flat_dir.norm(dim=1, keepdim=True)
+        guided_norm = guided_flat.norm(dim=1, keepdim=True).to(torch.float32).clamp_min(cls._EPS)
 
         sigma_value = 0
         if sigma is not None:
@@ -227,30 +235,34 @@ class DuffyDynamicMultiArchitectureSampler(io.ComfyNode):
 
         mixed_seed = (int(seed) ^ sigma_value ^ 0x9E3779B97F4A7C15) & 0x7FFFFFFFFFFFFFFF
 
-        generator = torch.Generator(device="cpu")
+        # Generator und Zufallspuffer leben auf dem Device und werden über Steps hinweg wiederverwendet
+        if cache is None:
+            cache = {}
+        device = flat_dir.device
+        generator = cache.get("generator")
+        if generator is None or generator.device != device:
+            generator = torch.Generator(device=device)
+            cache["generator"] = generator
         generator.manual_seed(mixed_seed)
-        rand = torch.randn(flat_dir.shape, dtype=torch.float32, device="cpu", generator=generator)
-        rand = rand.to(device=flat_dir.device, dtype=flat_dir.dtype)
-
-        # Point 2: Orthogonale Projektion mittels QR-Zerlegung für extreme Stabilität
-        # Stacken der Vektoren: Dimensionen (Batch, Flattened_Size, 2)
-        stacked = torch.stack([flat_dir, rand], dim=-1)
-        
-        # Berechnung in Float32 um Pytorch-Linalg-Fehler bei Float16 zu vermeiden
-        orig_dtype = stacked.dtype
-        stacked_f32 = stacked.to(torch.float32)
-        Q, _ = torch.linalg.qr(stacked_f32)
-        Q = Q.to(orig_dtype)
-
-        # Spalte 0 ist die normalisierte Richtung (flat_dir), Spalte 1 ist exakt orthogonal dazu
-        ortho_unit = Q[..., 1]
-        
-        rand_unit = rand / rand.norm(dim=1, keepdim=True).clamp_min(cls._EPS)
+
+        rand = cache.get("rand")
+        if rand is None or rand.shape != flat_dir.shape or rand.device != device:
+            rand = torch.empty(flat_dir.shape, dtype=torch.float32, device=device)
+            cache["rand"] = rand
+        torch.randn(rand.shape, generator=generator, dtype=torch.float32, device=device, out=rand)
+
+        # Point 2: Gram–Schmidt-Projektion — entfernt den Anteil von rand entlang direction
+        dir_unit = flat_dir / dir_norm.clamp_min(cls._EPS)
+        parallel = (rand * dir_unit).sum(dim=1, keepdim=True)
+        ortho = rand - parallel * dir_unit
+        ortho_unit = ortho / ortho.norm(dim=1, keepdim=True).clamp_min(cls._EPS)
 
         mix = max(0.0, min(0.5, float(ofd_parallel_mix)))
-        basis = ortho_unit * (1.0 - mix) + rand_unit * mix
-        basis_norm = basis.norm(dim=1, keepdim=True).clamp_min(cls._EPS)
-        basis = basis / basis_norm
+        basis = ortho_unit
+        if mix > 0.0:
+            rand_unit = rand / rand.norm(dim=1, keepdim=True).clamp_min(cls._EPS)
+            basis = ortho_unit * (1.0 - mix) + rand_unit * mix
+            basis = basis / basis.norm(dim=1, keepdim=True).clamp_min(cls._EPS)
 
         semantic_scale = torch.where(dir_norm > cls._EPS, dir_norm, guided_norm * 0.25)
 
@@ -259,7 +271,7 @@ class DuffyDynamicMultiArchitectureSampler(io.ComfyNode):
         effective_strength = envelope * strength_gain
 
         scaled_perturb = basis * (semantic_scale * effective_strength)
-        return guided_noise + scaled_perturb.reshape_as(guided_noise)
+        return guided_noise + scaled_perturb.to(guided_noise.dtype).reshape_as(guided_noise)
 
     @classmethod
     def _sigma_scalar(cls, sigma: torch.Tensor | float | int | None) -> float:
@@ -300,6 +312,10 @@ class DuffyDynamicMultiArchitectureSampler(io.ComfyNode):
 
         dynamic_model = model.clone()
         ofd_state: dict[str, float | None] = {"max_sigma": None}
+        ofd_cache: dict = {}
+        # CUDA kernels run asynchronously, so GPU calls are timed with events
+        # that are only resolved once sampling has finished.
+        ofd_timing = {"calls": 0, "seconds": 0.0, "events": []}
 
         def architecture_cfg_hook(args: dict) -> torch.Tensor:
             cond = args["cond"]
@@ -324,6 +340,12 @@ class DuffyDynamicMultiArchitectureSampler(io.ComfyNode):
                     max_sigma = sigma_scalar
                 sigma_ratio = sigma_scalar / max(float(max_sigma), cls._EPS)
 
+                use_events = guided.is_cuda
+                if use_events:
+                    ofd_started = torch.cuda.Event(enable_timing=True)
+                    ofd_started.record()
+                else:
+                    ofd_started = time.perf_counter()
                 guided = cls._apply_ofd(
                     guided_noise=guided,
                     direction=direction,
@@ -334,8 +356,16 @@ class DuffyDynamicMultiArchitectureSampler(io.ComfyNode):
                     ofd_parallel_mix=effective_ofd_parallel_mix,
                     sigma_ratio=sigma_ratio,
                     start_percent=float(ofd_start_percent),
-                    end_percent=float(ofd_end_percent)
+                    end_percent=float(ofd_end_percent),
+                    cache=ofd_cache,
                 )
+                ofd_timing["calls"] += 1
+                if use_events:
+                    ofd_finished = torch.cuda.Event(enable_timing=True)
+                    ofd_finished.record()
+                    ofd_timing["events"].append((ofd_started, ofd_finished))
+                else:
+                    ofd_timing["seconds"] += time.perf_counter() - ofd_started
 
             return guided
 
@@ -344,7 +374,7 @@ class DuffyDynamicMultiArchitectureSampler(io.ComfyNode):
             disable_cfg1_optimization=bool(is_distilled and enable_ofd),
         )
 
-        latent_samples = latent_image["samples"]
+        latent_samples = materialize_latent(latent_image["samples"])
         latent_samples = comfy.sample.fix_empty_latent_channels(
             dynamic_model,
             latent_samples,
@@ -374,6 +404,19 @@ class DuffyDynamicMultiArchitectureSampler(io.ComfyNode):
             seed=int(seed),
         )
 
+        if ofd_timing["events"]:
+            ofd_timing["events"][-1][1].synchronize()
+            ofd_timing["seconds"] += sum(
+                started.elapsed_time(finished) for started, finished in ofd_timing["events"]
+            ) / 1000.0
+        if ofd_timing["calls"]:
+            logger.info(
+                "OFD: %d steps, %.2f ms total, %.3f ms/step",
+                ofd_timing["calls"],
+                ofd_timing["seconds"] * 1000.0,
+                ofd_timing["seconds"] * 1000.0 / ofd_timing["calls"],
+            )
+
         out = latent_image.copy()
         out.pop("downscale_ratio_spacial", None)
         out["samples"] = sampled_latent
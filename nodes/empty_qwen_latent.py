@@ -1,6 +1,7 @@
-import torch
 from comfy_api.latest import io
 
+from ..core.latent import LATENT_DEVICES, LATENT_MODES, empty_latent
+
 # Pre-defined resolutions optimised for the Qwen-Image-2512 architecture
 _QWEN_RATIOS: dict[str, tuple[int, int]] = {
     "1:1 (1328x1328)": (1328, 1328),
@@ -58,6 +59,22 @@ class DuffyEmptyQwenLatent(io.ComfyNode):
                     step=1,
                     tooltip="Number of latent images in the batch",
                 ),
+                io.Combo.Input(
+                    "latent_mode",
+                    options=LATENT_MODES,
+                    display_name="Latent Mode",
+                    default="Dense",
+                    advanced=True,
+                    tooltip="Lazy emits a zero view that is only allocated when a consumer writes to it",
+                ),
+                io.Combo.Input(
+                    "device",
+                    options=LATENT_DEVICES,
+                    display_name="Device",
+                    default="cpu",
+                    advanced=True,
+                    tooltip="Create the latent directly on the sampling device instead of host memory",
+                ),
             ],
             outputs=[
                 io.Latent.Output(
@@ -84,6 +101,8 @@ class DuffyEmptyQwenLatent(io.ComfyNode):
         resolution: str,
         size_multiplier: float,
         batch_size: int,
+        latent_mode: str = "Dense",
+        device: str = "cpu",
     ) -> io.NodeOutput:
         base_width, base_height = _QWEN_RATIOS[resolution]
 
@@ -98,6 +117,6 @@ class DuffyEmptyQwenLatent(io.ComfyNode):
         latent_w = width // downscale_factor
         latent_h = height // downscale_factor
 
-        latent = torch.zeros([batch_size, latent_channels, latent_h, latent_w])
+        latent = empty_latent([batch_size, latent_channels, latent_h, latent_w], latent_mode, device)
 
         return io.NodeOutput({"samples": latent}, width, height)
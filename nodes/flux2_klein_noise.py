@@ -1,6 +1,8 @@
-import torch
 from comfy_api.latest import io
 
+from ..core.latent import LATENT_DEVICES, target_device
+from ..core.noise import batched_noise
+
 
 class DuffyFlux2KleinNoise(io.ComfyNode):
     """
@@ -104,6 +106,16 @@ class DuffyFlux2KleinNoise(io.ComfyNode):
                     default="BCHW",
                     tooltip="Tensor layout: BCHW for images, BCTHW/BTCHW for video",
                 ),
+                io.Combo.Input(
+                    "device",
+                    options=LATENT_DEVICES,
+                    display_name="Device",
+                    default="cpu",
+                    tooltip=(
+                        "Where noise is generated. GPU avoids a large host allocation "
+                        "and transfer, but produces a different noise stream than CPU."
+                    ),
+                ),
             ],
             outputs=[
                 io.Latent.Output(
@@ -128,8 +140,8 @@ class DuffyFlux2KleinNoise(io.ComfyNode):
         sigmas=None,
         latent_channels: str = "4",
         shape: str = "BCHW",
+        device: str = "cpu",
     ) -> io.NodeOutput:
-        generator = torch.manual_seed(seed)
         channels = int(latent_channels)
 
         # Flux 2 Klein uses f16 downsampling; legacy architectures use f8
@@ -137,27 +149,26 @@ class DuffyFlux2KleinNoise(io.ComfyNode):
         spatial_h = height // downscale_factor
         spatial_w = width // downscale_factor
 
-        if shape == "BCHW":
-            noise = torch.randn(
-                [batch_size, channels, spatial_h, spatial_w],
-                dtype=torch.float32, generator=generator, device="cpu",
-            )
-        elif shape == "BCTHW":
-            noise = torch.randn(
-                [1, channels, batch_size, spatial_h, spatial_w],
-                dtype=torch.float32, generator=generator, device="cpu",
-            )
+        # Full tensor shape and the dimension that indexes batch items / frames
+        if shape == "BCTHW":
+            full_shape, item_dim = [1, channels, batch_size, spatial_h, spatial_w], 2
         elif shape == "BTCHW":
-            noise = torch.randn(
-                [1, batch_size, channels, spatial_h, spatial_w],
-                dtype=torch.float32, generator=generator, device="cpu",
-            )
+            full_shape, item_dim = [1, batch_size, channels, spatial_h, spatial_w], 1
+        else:
+            full_shape, item_dim = [batch_size, channels, spatial_h, spatial_w], 0
+
+        # Constant batch noise: generate one item, expand to the batch at the end
+        gen_shape = list(full_shape)
+        if constant_batch_noise:
+            gen_shape[item_dim] = 1
+
+        noise = batched_noise(gen_shape, item_dim, seed, device=target_device(device))
 
         # Sigma-based variance scaling
         if sigmas is not None and model is not None:
             sigma = sigmas - sigmas[-1]
             sigma /= model.model.latent_format.scale_factor
-            noise *= sigma
+            noise *= sigma.to(noise.device)
 
         noise *= multiplier
 
@@ -165,6 +176,6 @@ class DuffyFlux2KleinNoise(io.ComfyNode):
             noise = noise / noise.std()
 
         if constant_batch_noise:
-            noise = noise.repeat(batch_size, 1, 1, 1)
+            noise = noise.expand(full_shape)
 
         return io.NodeOutput({"samples": noise})
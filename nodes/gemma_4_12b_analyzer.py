@@ -7,8 +7,15 @@ import folder_paths  # type: ignore  — provided by ComfyUI runtime
 import torch
 from comfy_api.latest import io
 
+from ..utils.llama import chat_handler_class, llama_class
+from ..utils.media import (VIDEO_SAMPLING_MODES, audio_to_data_uri_omni,
+                           image_tensor_to_data_uri, video_tensor_to_frame_list)
+from ..utils.llm_scheduler import LlmScheduler
+from ..utils.memory import plan_gpu_layers, register_llm, unload_llm, unregister_llm
+from ..utils.structured import json_response_format, parse_output_schema, structured_output
+
 # ---------------------------------------------------------------------------
-# Import-time validation: verify the JamePeng llama-cpp-python wheel
+# Load-time validation: verify the JamePeng llama-cpp-python wheel
 # ---------------------------------------------------------------------------
 _IMPORT_ERROR_MSG = (
     "You have an outdated or incompatible version of the llama-cpp-python library. "
@@ -16,22 +23,6 @@ _IMPORT_ERROR_MSG = (
     "Install it via: pip install https://github.com/TAO71-AI/llama-cpp-python-JamePeng/releases/download/v0.3.40-cu130-win-20260608/llama_cpp_python-0.3.40-cp312-cp312-win_amd64.whl"
 )
 
-try:
-    from llama_cpp import Llama  # type: ignore
-    from llama_cpp.llama_chat_format import Gemma4ChatHandler  # type: ignore
-except ImportError:
-    raise ImportError(_IMPORT_ERROR_MSG)
-
-# Fallback Llava16ChatHandler kept for the multi-strategy model loading
-try:
-    from llama_cpp.llama_chat_format import Llava16ChatHandler  # type: ignore
-except ImportError:
-    Llava16ChatHandler = None  # type: ignore
-
-from ..utils.media import (audio_to_data_uri_omni, image_tensor_to_data_uri,
-                           video_tensor_to_frame_list)
-from ..utils.memory import unload_llm
-
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
@@ -203,7 +194,8 @@ class _ModelCache:
     """
 
     def __init__(self):
-        self.model_instance: Optional[Llama] = None
+        self.model_instance: Optional[Any] = None  # llama_cpp.Llama
+        self.scheduler = LlmScheduler(self)
         self.current_model_path: Optional[str] = None
         self.current_mmproj_path: Optional[str] = None
         self.current_n_gpu_layers: Optional[int] = None
@@ -234,8 +226,20 @@ class _ModelCache:
     ) -> None:
         if self.model_instance is not None:
             logger.info("Unloading previous model before reload")
-            unload_llm(self.model_instance)
-            self.model_instance = None
+            unregister_llm(self)
+            with self.scheduler.exclusive():
+                unload_llm(self.model_instance)
+                self.model_instance = None
+
+        requested_gpu_layers = n_gpu_layers
+        n_gpu_layers, vram_bytes = plan_gpu_layers(model_path, mmproj_path, n_gpu_layers, n_ctx)
+
+        Llama = llama_class(_IMPORT_ERROR_MSG)
+        Gemma4ChatHandler = chat_handler_class("Gemma4ChatHandler")
+        if Gemma4ChatHandler is None:
+            raise ImportError(_IMPORT_ERROR_MSG)
+        # Fallback Llava16ChatHandler kept for the multi-strategy model loading
+        Llava16ChatHandler = chat_handler_class("Llava16ChatHandler")
 
         logger.info("Loading model: %s", model_path)
         logger.info("Loading mmproj: %s", mmproj_path)
@@ -282,14 +286,16 @@ class _ModelCache:
 
         self.current_model_path = model_path
         self.current_mmproj_path = mmproj_path
-        self.current_n_gpu_layers = n_gpu_layers
+        self.current_n_gpu_layers = requested_gpu_layers
         self.current_n_ctx = n_ctx
         self.current_enable_thinking = enable_thinking
         self.current_preserve_thinking = preserve_thinking
         logger.info("Model loaded successfully (n_gpu_layers=%d, n_ctx=%d)", n_gpu_layers, n_ctx)
+        register_llm(self, os.path.basename(model_path), vram_bytes)
 
     def _load_text_only(self, model_path: str, n_gpu_layers: int, n_ctx: int) -> None:
         """Fallback: load model without multimodal projector."""
+        Llama = llama_class(_IMPORT_ERROR_MSG)
         self.model_instance = Llama(
             model_path=model_path,
             n_gpu_layers=n_gpu_layers,
@@ -302,9 +308,11 @@ class _ModelCache:
         )
 
     def unload(self) -> None:
-        if self.model_instance is not None:
-            unload_llm(self.model_instance)
-        self.model_instance = None
+        unregister_llm(self)
+        with self.scheduler.exclusive():
+            if self.model_instance is not None:
+                unload_llm(self.model_instance)
+            self.model_instance = None
         self.current_model_path = None
         self.current_mmproj_path = None
         self.current_n_gpu_layers = None
@@ -360,9 +368,17 @@ class DuffyGemma4_12B_Analyzer(io.ComfyNode):
                 io.Float.Input("mirostat_tau", default=5.0, min=0.0, max=20.0, step=0.1),
                 io.Float.Input("mirostat_eta", default=0.1, min=0.0, max=1.0, step=0.01),
                 io.Int.Input("seed", default=-1, min=-1, max=0x7FFFFFFFFFFFFFFF),
-                io.Int.Input("n_gpu_layers", default=-1, min=-1, max=200, step=1, tooltip="-1 = offload all layers to GPU"),
+                io.Int.Input("n_gpu_layers", default=-1, min=-1, max=200, step=1, tooltip="-1 = auto: all layers if they fit in free VRAM, otherwise as many as fit"),
                 io.Int.Input("n_ctx", default=10240, min=512, max=131072, step=512, tooltip="Context window size (default 10 K for multimodal analysis; model supports up to 256 K)"),
                 io.Float.Input("frame_sample_interval", default=2.0, min=0.5, max=10.0, step=0.5, tooltip="Temporal interval in seconds between sampled video frames"),
+                io.Combo.Input("video_sampling", options=VIDEO_SAMPLING_MODES, default="Adaptive", advanced=True, tooltip="Adaptive keeps frames at scene changes and high motion within the same frame budget; Uniform spaces them evenly"),
+                io.String.Input(
+                    "output_schema", multiline=True, default="", advanced=True,
+                    tooltip=(
+                        "JSON output mode: a JSON Schema (or {} for any object) compiled to a decoding grammar. "
+                        "The reply is always valid JSON and ends when the object closes. Empty = free text."
+                    ),
+                ),
                 # --- Optional media inputs ---
                 io.Image.Input("image", optional=True),
                 io.Image.Input("reference_image", optional=True, tooltip="Reference image for style transfer"),
@@ -410,6 +426,8 @@ class DuffyGemma4_12B_Analyzer(io.ComfyNode):
         n_gpu_layers: int,
         n_ctx: int,
         frame_sample_interval: float,
+        video_sampling: str = "Adaptive",
+        output_schema: str = "",
         image: Optional[torch.Tensor] = None,
         reference_image: Optional[torch.Tensor] = None,
         video: Optional[torch.Tensor] = None,
@@ -452,6 +470,8 @@ class DuffyGemma4_12B_Analyzer(io.ComfyNode):
             n_gpu_layers,
             n_ctx,
             frame_sample_interval,
+            video_sampling,
+            output_schema,
             image is not None,
             reference_image is not None,
             video is not None,
@@ -486,6 +506,8 @@ class DuffyGemma4_12B_Analyzer(io.ComfyNode):
         n_gpu_layers: int,
         n_ctx: int,
         frame_sample_interval: float,
+        video_sampling: str = "Adaptive",
+        output_schema: str = "",
         image: Optional[torch.Tensor] = None,
         reference_image: Optional[torch.Tensor] = None,
         video: Optional[torch.Tensor] = None,
@@ -518,6 +540,8 @@ class DuffyGemma4_12B_Analyzer(io.ComfyNode):
                 n_gpu_layers=n_gpu_layers,
                 n_ctx=n_ctx,
                 frame_sample_interval=frame_sample_interval,
+                video_sampling=video_sampling,
+                output_schema=output_schema,
                 image=image,
                 reference_image=reference_image,
                 video=video,
@@ -571,11 +595,15 @@ def _run_inference(
     n_gpu_layers: int,
     n_ctx: int,
     frame_sample_interval: float,
+    video_sampling: str = "Adaptive",
+    output_schema: str = "",
     image: Optional[torch.Tensor] = None,
     reference_image: Optional[torch.Tensor] = None,
     video: Optional[torch.Tensor] = None,
     audio: Optional[dict] = None,
 ) -> str:
+    response_schema = parse_output_schema(output_schema)
+
     # ----- Resolve file paths ----- #
     model_path = folder_paths.get_full_path("LLM", gguf_model)
     mmproj_path = folder_paths.get_full_path("LLM", mmproj_model)
@@ -632,7 +660,7 @@ def _run_inference(
         target_fps = 1.0 / frame_sample_interval if frame_sample_interval > 0 else 1.0
         user_content.extend(
             video_tensor_to_frame_list(
-                video, target_fps=target_fps, n_ctx=n_ctx,
+                video, target_fps=target_fps, n_ctx=n_ctx, sampling=video_sampling,
             )
         )
 
@@ -664,7 +692,7 @@ def _run_inference(
             logger.info("Thinking disabled: presence_penalty auto-adjusted to 1.5")
 
     # ----- Run inference with deterministic seed ----- #
-    completion = _model_cache_12b.model_instance.create_chat_completion(
+    completion = _model_cache_12b.scheduler.chat_completion(
         messages=messages,
         max_tokens=max_tokens,
         temperature=temperature,
@@ -678,9 +706,13 @@ def _run_inference(
         mirostat_tau=mirostat_tau,
         mirostat_eta=mirostat_eta,
         seed=seed if seed >= 0 else None,  # Deterministic: passed directly, no global set_seed()
+        response_format=json_response_format(response_schema) if response_schema is not None else None,
     )
 
     response_text: str = completion["choices"][0]["message"]["content"] or ""
+    if response_schema is not None:
+        # Grammar-constrained JSON has no thinking block to strip
+        return structured_output(response_text)
 
     # ----- Strip thinking tags if requested (but honor preserve_thinking) ----- #
     if strip_thinking_tags:
@@ -1,4 +1,5 @@
 import base64
+import hashlib
 import io as py_io
 import json
 import logging
@@ -16,7 +17,9 @@ from aiohttp import web
 from comfy_api.latest import io, ui
 from PIL import Image
 
+from ..utils.llm_session import ChatSession
 from ..utils.media import image_tensor_to_data_uri
+from ..utils.structured import json_grammar, json_response_format
 from .gemma_4_12b_analyzer import _get_gguf_models, _get_mmproj_models, _model_cache_12b
 
 logger = logging.getLogger(__name__)
@@ -24,6 +27,58 @@ logger = logging.getLogger(__name__)
 # Dictionary to hold thread synchronization objects for GISA layout editor sessions
 PENDING_GISA_SESSIONS = {}
 
+# Conversation of the most recent layout analysis, kept resident in the model's KV cache.
+# Its key is (node id, image digest), so a refinement only continues the same node's analysis of the same image.
+_layout_session: Optional[ChatSession] = None
+
+_PALETTE_SCHEMA = {"type": "array", "items": {"type": "string"}}
+
+# Ideogram 4 layout structure, compiled into a decoding grammar (key order matters)
+LAYOUT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "high_level_description": {"type": "string"},
+        "style_description": {
+            "type": "object",
+            "properties": {
+                "aesthetics": {"type": "string"},
+                "lighting": {"type": "string"},
+                "medium": {"type": "string"},
+                "color_palette": dict(_PALETTE_SCHEMA, maxItems=16),
+                "photo": {"type": "object"},
+                "art_style": {"type": "string"},
+            },
+            "required": ["aesthetics", "lighting", "medium", "color_palette"],
+            "additionalProperties": False,
+        },
+        "compositional_deconstruction": {
+            "type": "object",
+            "properties": {
+                "background": {"type": "string"},
+                "elements": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "type": {"enum": ["obj", "text"]},
+                            "desc": {"type": "string"},
+                            "bbox": {"type": "array", "items": {"type": "integer"}, "minItems": 4, "maxItems": 4},
+                            "text": {"type": "string"},
+                            "color_palette": dict(_PALETTE_SCHEMA, maxItems=5),
+                        },
+                        "required": ["type", "desc", "bbox"],
+                        "additionalProperties": False,
+                    },
+                },
+            },
+            "required": ["background", "elements"],
+            "additionalProperties": False,
+        },
+    },
+    "required": ["high_level_description", "style_description", "compositional_deconstruction"],
+    "additionalProperties": False,
+}
+
 # ---------------------------------------------------------------------------
 # aiohttp HTTP route for GISA frontend communication
 # ---------------------------------------------------------------------------
@@ -237,6 +292,43 @@ def clean_json_syntactically(json_str: str) -> str:
     return json_str.strip()
 
 
+def _image_digest(image: Optional[torch.Tensor]) -> Optional[str]:
+    """SHA-1 of the reference image's pixel data, or None without an image."""
+    if image is None:
+        return None
+    return hashlib.sha1(image.detach().cpu().contiguous().numpy().tobytes()).hexdigest()
+
+
+def _session_capture(transcript: list, session_key: tuple):
+    """Scheduler hook that keeps a full analysis resident for later refinement turns."""
+    def on_complete(model, completion: dict) -> None:
+        global _layout_session
+        raw_response = completion["choices"][0]["message"]["content"] or ""
+        _layout_session = ChatSession.capture(model, transcript, raw_response, key=session_key)
+    return on_complete
+
+
+def _refine_layout(model, text_prompt: str, layout: dict, session_key: tuple, **completion_kwargs) -> Optional[str]:
+    """Revise ``layout`` for a new prompt, evaluating only the new turn; None if no session applies."""
+    if _layout_session is None or _layout_session.key != session_key:
+        return None
+    user_text = (
+        f"Updated User Prompt: {text_prompt}\n"
+        f"Current layout JSON: {json.dumps(layout, ensure_ascii=False)}\n"
+        "Revise the layout for the updated prompt and return the complete JSON object, following all rules above."
+    )
+    return _layout_session.send(model, user_text, **completion_kwargs)
+
+
+def _parse_layout(raw_response: str) -> dict:
+    """Parse a layout reply; grammar-constrained replies load directly, others get the repair pass."""
+    try:
+        return json.loads(raw_response)
+    except ValueError:
+        # Extract JSON block stripping any thinking tags, then repair common syntax issues
+        return json.loads(clean_json_syntactically(extract_json_block(raw_response)))
+
+
 # ---------------------------------------------------------------------------
 # GISA Node Implementation
 # ---------------------------------------------------------------------------
@@ -263,12 +355,21 @@ class DuffyGemmaIdeogramSpatialArchitect(io.ComfyNode):
                 io.Int.Input("n_gpu_layers", default=-1, min=-1, max=200),
                 io.Int.Input("n_ctx", default=16384, min=1024, max=131072, step=1024),
                 io.Int.Input("seed", default=42, min=-1, max=0x7FFFFFFFFFFFFFFF),
+                io.Boolean.Input(
+                    "constrain_json", default=True, advanced=True,
+                    tooltip="Decode with a grammar built from the Ideogram 4 layout schema so the reply is always valid JSON (no thinking output)",
+                ),
+                io.Boolean.Input(
+                    "refine_in_session", default=True, advanced=True,
+                    tooltip="When only the text prompt changes, revise the current layout as a follow-up turn that reuses the cached conversation instead of re-analyzing from scratch",
+                ),
                 io.Image.Input("image", optional=True, tooltip="Reference sketch or layout layout image"),
                 io.Image.Input("preview_image", optional=True, tooltip="Optional preview image to display in the node workspace"),
             ],
             outputs=[
                 io.String.Output("json_prompt", display_name="JSON Prompt"),
             ],
+            hidden=[io.Hidden.unique_id],
         )
 
     @classmethod
@@ -286,6 +387,8 @@ class DuffyGemmaIdeogramSpatialArchitect(io.ComfyNode):
         n_gpu_layers: int = -1,
         n_ctx: int = 16384,
         seed: int = 42,
+        constrain_json: bool = True,
+        refine_in_session: bool = True,
         image: Optional[torch.Tensor] = None,
         preview_image: Optional[torch.Tensor] = None,
         **kwargs
@@ -300,15 +403,24 @@ class DuffyGemmaIdeogramSpatialArchitect(io.ComfyNode):
             # ---------------------------------------------------------------------------
             # Determine if VLM inference is required
             # ---------------------------------------------------------------------------
+            image_digest = _image_digest(image)
+            node_id = str(cls.hidden.unique_id) if cls.hidden.unique_id is not None else None
+            session_key = (node_id, image_digest)
             needs_vlm = False
+            can_refine = False
             if not state_dict or "compositional_deconstruction" not in state_dict:
                 needs_vlm = True
             else:
                 meta = state_dict.get("_meta", {})
-                if meta.get("text_prompt") != text_prompt:
+                same_image = (
+                    (image is not None) == meta.get("has_image", False)
+                    and meta.get("image_digest") == image_digest
+                )
+                if not same_image:
                     needs_vlm = True
-                elif (image is not None) != meta.get("has_image", False):
+                elif meta.get("text_prompt") != text_prompt:
                     needs_vlm = True
+                    can_refine = meta.get("node_id") == node_id
 
             if needs_vlm:
                 logger.info("[GISA] Inputs changed or state is empty. Executing Gemma-4-12B layout analysis...")
@@ -343,40 +455,47 @@ class DuffyGemmaIdeogramSpatialArchitect(io.ComfyNode):
                     "Do not include markdown syntax, code fences, or any preambles."
                 )
 
-                user_content = [{"type": "text", "text": f"User Prompt: {text_prompt}"}]
-                if image is not None:
-                    user_content.append(image_tensor_to_data_uri(image))
-
-                messages = [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_content}
-                ]
-
-                completion = _model_cache_12b.model_instance.create_chat_completion(
-                    messages=messages,
-                    max_tokens=max_tokens,
-                    temperature=temperature,
-                    seed=seed if seed >= 0 else None,
-                )
+                completion_kwargs = {
+                    "max_tokens": max_tokens,
+                    "temperature": temperature,
+                    "seed": seed if seed >= 0 else None,
+                }
+                raw_response = None
+                if refine_in_session and can_refine:
+                    layout = {k: v for k, v in state_dict.items() if k != "_meta"}
+                    if constrain_json:
+                        completion_kwargs["grammar"] = json_grammar(LAYOUT_SCHEMA)
+                    raw_response = _model_cache_12b.scheduler.run(
+                        _refine_layout, text_prompt, layout, session_key, **completion_kwargs
+                    )
+                    completion_kwargs.pop("grammar", None)
+                if raw_response is None:
+                    user_content = [{"type": "text", "text": f"User Prompt: {text_prompt}"}]
+                    if image is not None:
+                        user_content.append(image_tensor_to_data_uri(image))
+
+                    messages = [
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_content}
+                    ]
+                    if constrain_json:
+                        completion_kwargs["response_format"] = json_response_format(LAYOUT_SCHEMA)
+                    transcript = [
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": f"User Prompt: {text_prompt}"},
+                    ]
+                    completion = _model_cache_12b.scheduler.chat_completion(
+                        messages=messages,
+                        on_complete=_session_capture(transcript, session_key),
+                        **completion_kwargs,
+                    )
+                    raw_response = completion["choices"][0]["message"]["content"] or ""
 
-                raw_response = completion["choices"][0]["message"]["content"] or ""
                 logger.info("[GISA] Gemma raw response length: %d", len(raw_response))
-                
-                try:
-                    debug_file = r"C:\Users\elmar\.gemini\antigravity\brain\7f0c43ca-7342-475b-aa01-fd92971795ce\scratch\raw_gisa_output.txt"
-                    os.makedirs(os.path.dirname(debug_file), exist_ok=True)
-                    with open(debug_file, "w", encoding="utf-8") as f:
-                        f.write(raw_response)
-                except Exception as ex:
-                    logger.warning("[GISA] Failed to write debug raw response: %s", ex)
-
-                # Extract JSON block stripping any thinking tags
-                extracted_response = extract_json_block(raw_response)
-                # Repair common syntax issues (e.g. trailing commas)
-                repaired_response = clean_json_syntactically(extracted_response)
+                logger.debug("[GISA] Gemma raw response:\n%s", raw_response)
 
                 try:
-                    vlm_layout = json.loads(repaired_response)
+                    vlm_layout = _parse_layout(raw_response)
                     # Ensure structure matches
                     state_dict = CaptionVerifier.clean_and_verify(vlm_layout)
                 except Exception as e:
@@ -400,7 +519,9 @@ class DuffyGemmaIdeogramSpatialArchitect(io.ComfyNode):
                 # Save metadata so we can skip execution if same prompt is queried again
                 state_dict["_meta"] = {
                     "text_prompt": text_prompt,
-                    "has_image": image is not None
+                    "has_image": image is not None,
+                    "image_digest": image_digest,
+                    "node_id": node_id,
                 }
 
             # ---------------------------------------------------------------------------
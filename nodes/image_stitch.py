@@ -7,7 +7,6 @@ and stitch them into a single output image (horizontally or vertically).
 import hashlib
 import os
 
-import comfy.utils
 import folder_paths
 import node_helpers
 import numpy as np
@@ -15,6 +14,9 @@ import torch
 from comfy_api.latest import io
 from PIL import Image, ImageOps
 
+from ..core.stitch import (placeholder_image, stitch_horizontal,
+                            stitch_layout, stitch_vertical)
+
 
 def _get_image_files() -> list[str]:
     """Return sorted list of image files from the ComfyUI input directory."""
@@ -43,88 +45,6 @@ def _load_image_tensor(image_name: str) -> torch.Tensor:
     return torch.from_numpy(img_np).unsqueeze(0)  # [1, H, W, C]
 
 
-def _stitch_horizontal(tensors: list[torch.Tensor]) -> torch.Tensor:
-    """
-    Stitch images side-by-side. All images are scaled to the height of
-    the tallest image (preserving aspect ratio), then concatenated along width.
-    """
-    max_h = max(t.shape[1] for t in tensors)
-    resized = []
-    for t in tensors:
-        _, h, w, _ = t.shape
-        if h == max_h:
-            resized.append(t)
-        else:
-            new_w = max(1, round(w * (max_h / h)))
-            # common_upscale expects [B, C, H, W]
-            bchw = t.movedim(-1, 1)
-            scaled = comfy.utils.common_upscale(bchw, new_w, max_h, "lanczos", crop="disabled")
-            resized.append(scaled.movedim(1, -1))
-    return torch.cat(resized, dim=2)  # cat along W
-
-
-def _stitch_vertical(tensors: list[torch.Tensor]) -> torch.Tensor:
-    """
-    Stack images vertically. All images are center-cropped to the width of
-    the narrowest image, then concatenated along height.
-    """
-    min_w = min(t.shape[2] for t in tensors)
-    cropped = []
-    for t in tensors:
-        _, h, w, _ = t.shape
-        if w == min_w:
-            cropped.append(t)
-        else:
-            offset = (w - min_w) // 2
-            cropped.append(t[:, :, offset:offset + min_w, :])
-    return torch.cat(cropped, dim=1)  # cat along H
-
-
-def _scale_to_cell(t: torch.Tensor, cell_h: int, cell_w: int) -> torch.Tensor:
-    """Scale a [1,H,W,C] tensor to exactly (cell_h, cell_w) using lanczos."""
-    bchw = t.movedim(-1, 1)
-    scaled = comfy.utils.common_upscale(bchw, cell_w, cell_h, "lanczos", crop="disabled")
-    return scaled.movedim(1, -1)
-
-
-def _stitch_layout(grid: list[list[torch.Tensor | None]]) -> torch.Tensor:
-    """
-    Stitch images preserving their 3×3 grid positions.
-
-    - Rows and columns that contain zero images are excluded.
-    - All images are scaled to a uniform cell size (max_h × max_w).
-    - Empty cells within active rows/columns are filled with black.
-    """
-    # Determine active rows and columns
-    active_rows = [r for r in range(3) if any(grid[r][c] is not None for c in range(3))]
-    active_cols = [c for c in range(3) if any(grid[r][c] is not None for r in range(3))]
-
-    if not active_rows or not active_cols:
-        return torch.zeros((1, 64, 64, 3), dtype=torch.float32)
-
-    # Collect all present tensors to determine uniform cell size
-    all_tensors = [grid[r][c] for r in active_rows for c in active_cols if grid[r][c] is not None]
-    if not all_tensors:
-        return torch.zeros((1, 64, 64, 3), dtype=torch.float32)
-
-    cell_h = max(t.shape[1] for t in all_tensors)
-    cell_w = max(t.shape[2] for t in all_tensors)
-
-    # Build each active row
-    row_tensors = []
-    for r in active_rows:
-        cells = []
-        for c in active_cols:
-            t = grid[r][c]
-            if t is not None:
-                cells.append(_scale_to_cell(t, cell_h, cell_w))
-            else:
-                cells.append(torch.zeros((1, cell_h, cell_w, 3), dtype=torch.float32))
-        row_tensors.append(torch.cat(cells, dim=2))  # cat along W
-
-    return torch.cat(row_tensors, dim=1)  # cat along H
-
-
 class DuffyImageStitch(io.ComfyNode):
     """
     Upload up to 9 images, reorder them via drag-and-drop in a 3×3 grid,
@@ -193,8 +113,8 @@ class DuffyImageStitch(io.ComfyNode):
                     grid[r][c] = _load_image_tensor(name)
                     has_any = True
             if not has_any:
-                return io.NodeOutput(torch.zeros((1, 64, 64, 3), dtype=torch.float32))
-            result = _stitch_layout(grid)
+                return io.NodeOutput(placeholder_image())
+            result = stitch_layout(grid)
             return io.NodeOutput(result)
 
         # Horizontal / Vertical — collect images as flat list
@@ -205,16 +125,16 @@ class DuffyImageStitch(io.ComfyNode):
                 tensors.append(_load_image_tensor(name))
 
         if not tensors:
-            placeholder = torch.zeros((1, 64, 64, 3), dtype=torch.float32)
+            placeholder = placeholder_image()
             return io.NodeOutput(placeholder)
 
         if len(tensors) == 1:
             return io.NodeOutput(tensors[0])
 
         if orientation == "Horizontal":
-            result = _stitch_horizontal(tensors)
+            result = stitch_horizontal(tensors)
         else:
-            result = _stitch_vertical(tensors)
+            result = stitch_vertical(tensors)
 
         return io.NodeOutput(result)
 
@@ -1,4 +1,5 @@
 import re
+import threading
 from pathlib import Path
 from typing import Optional
 
@@ -341,10 +342,63 @@ def _compose_system_prompt(style_name: str, style_prompt: str, base_prompt: str)
     )
 
 
+class _StyleRegistry:
+    """
+    Style options and composed system prompts, loaded once and kept in memory.
+
+    Options are re-discovered only when the assets directory mtime changes
+    (files added, removed or renamed). Composed prompts are keyed by the
+    style and base file signatures, so editing a style file in place
+    recomposes just that entry; otherwise switching styles is a dict lookup.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dir_mtime: Optional[int] = None
+        self._options: list[str] = []
+        self._entries: dict[str, tuple[tuple, tuple, str, str, str]] = {}
+
+    def _refresh(self) -> None:
+        try:
+            dir_mtime = ASSETS_DIR.stat().st_mtime_ns
+        except OSError:
+            dir_mtime = -1
+        if dir_mtime != self._dir_mtime:
+            self._dir_mtime = dir_mtime
+            self._options = _discover_style_options()
+            self._entries.clear()
+
+    def options(self) -> list[str]:
+        with self._lock:
+            self._refresh()
+            return list(self._options)
+
+    def entry(self, style: str) -> tuple[str, str, str]:
+        """Return (style_prompt, base_prompt, composed system prompt) for ``style``."""
+        style_path = _style_prompt_path(style)
+        style_sig = _file_signature(style_path)
+        base_sig = _file_signature(BASE_PROMPT_FILE) if style == "photorealistic" else ("", -1, -1)
+        with self._lock:
+            self._refresh()
+            cached = self._entries.get(style)
+            if cached is not None and cached[0] == style_sig and cached[1] == base_sig:
+                return cached[2:]
+
+        style_prompt = _read_text_file(style_path)
+        base_prompt = _read_text_file(BASE_PROMPT_FILE) if base_sig[1] >= 0 else ""
+        composed_prompt = _compose_system_prompt(style, style_prompt, base_prompt)
+        with self._lock:
+            self._entries[style] = (style_sig, base_sig, style_prompt, base_prompt, composed_prompt)
+        return style_prompt, base_prompt, composed_prompt
+
+
+_STYLE_REGISTRY = _StyleRegistry()
+
+
 class DuffyImageStyler(io.ComfyNode):
     @classmethod
     def define_schema(cls) -> io.Schema:
-        style_options = _discover_style_options()
+        style_options = _STYLE_REGISTRY.options()
         if not style_options:
             style_options = ["photorealistic"]
 
@@ -384,7 +438,7 @@ class DuffyImageStyler(io.ComfyNode):
             return f"Style prompt not found for '{style}'"
 
         try:
-            style_prompt = _read_text_file(style_path)
+            style_prompt, base_prompt, _ = _STYLE_REGISTRY.entry(style)
             if not style_prompt:
                 return f"Style prompt file is empty for '{style}'"
 
@@ -392,7 +446,6 @@ class DuffyImageStyler(io.ComfyNode):
                 if not BASE_PROMPT_FILE.exists():
                     return "Base style prompt missing: assets/image_styler/photorealistic_prompt.txt"
 
-                base_prompt = _read_text_file(BASE_PROMPT_FILE)
                 if not base_prompt:
                     return "Base style prompt is empty: photorealistic_prompt.txt"
         except Exception as exc:
@@ -417,9 +470,5 @@ class DuffyImageStyler(io.ComfyNode):
 
     @classmethod
     def execute(cls, style: str, **kwargs) -> io.NodeOutput:
-        style_prompt = _read_text_file(_style_prompt_path(style))
-        base_prompt = ""
-        if style == "photorealistic" and BASE_PROMPT_FILE.exists():
-            base_prompt = _read_text_file(BASE_PROMPT_FILE)
-        composed_prompt = _compose_system_prompt(style, style_prompt, base_prompt)
+        _, _, composed_prompt = _STYLE_REGISTRY.entry(style)
         return io.NodeOutput(composed_prompt, ui={"text": [composed_prompt]})
@@ -1,8 +1,9 @@
 import comfy.sd
-import comfy.utils
 import folder_paths
 from comfy_api.latest import io
 
+from ..core.lora_cache import load_lora
+
 
 class DuffyLoraLoader(io.ComfyNode):
     """
@@ -66,7 +67,7 @@ class DuffyLoraLoader(io.ComfyNode):
             return io.NodeOutput(model, clip)
 
         lora_path = folder_paths.get_full_path_or_raise("loras", lora_name)
-        lora = comfy.utils.load_torch_file(lora_path, safe_load=True)
+        lora = load_lora(lora_path)
         model_lora, clip_lora = comfy.sd.load_lora_for_models(
             model, clip, lora, strength_model, strength_clip
         )
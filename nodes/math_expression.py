@@ -1,7 +1,104 @@
+import ast
+import functools
 import math
+from types import CodeType
 
+import torch
 from comfy_api.latest import io
 
+_ALLOWED_NODES = (
+    ast.Expression, ast.Constant, ast.Name, ast.Load, ast.Attribute, ast.Call,
+    ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.IfExp,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+    ast.UAdd, ast.USub, ast.Not, ast.And, ast.Or,
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+)
+_VARIABLES = {"a", "b", "c", "math"}
+
+# math functions with an elementwise torch equivalent of the same meaning
+_TORCH_MATH = {
+    "sin": torch.sin, "cos": torch.cos, "tan": torch.tan,
+    "asin": torch.asin, "acos": torch.acos, "atan": torch.atan, "atan2": torch.atan2,
+    "sinh": torch.sinh, "cosh": torch.cosh, "tanh": torch.tanh,
+    "asinh": torch.asinh, "acosh": torch.acosh, "atanh": torch.atanh,
+    "exp": torch.exp, "expm1": torch.expm1, "log2": torch.log2, "log10": torch.log10, "log1p": torch.log1p,
+    "sqrt": torch.sqrt, "floor": torch.floor, "ceil": torch.ceil, "trunc": torch.trunc,
+    "fabs": torch.abs, "pow": torch.pow, "hypot": torch.hypot, "copysign": torch.copysign,
+    "fmod": torch.fmod, "degrees": torch.rad2deg, "radians": torch.deg2rad,
+    "isnan": torch.isnan, "isinf": torch.isinf, "isfinite": torch.isfinite,
+    "pi": math.pi, "e": math.e, "tau": math.tau, "inf": math.inf, "nan": math.nan,
+}
+
+
+class _TensorMath:
+    """Stand-in for ``math`` whose functions operate elementwise on tensors."""
+
+    def __getattr__(self, name: str):
+        if name == "log":
+            return lambda x, base=None: torch.log(x) if base is None else torch.log(x) / math.log(base)
+        try:
+            return _TORCH_MATH[name]
+        except KeyError:
+            raise AttributeError(f"math.{name} has no vectorized form") from None
+
+
+_TENSOR_MATH = _TensorMath()
+
+
+@functools.lru_cache(maxsize=256)
+def compile_expression(expression: str) -> CodeType:
+    """Parse and validate an expression against the whitelist, then compile it once."""
+    tree = ast.parse(expression.strip(), mode="eval")
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"'{type(node).__name__}' is not allowed in expressions")
+        if isinstance(node, ast.Name) and node.id not in _VARIABLES:
+            raise ValueError(f"Unknown name '{node.id}'")
+        if isinstance(node, ast.Attribute):
+            if not (isinstance(node.value, ast.Name) and node.value.id == "math") or node.attr.startswith("_"):
+                raise ValueError("Only public math.* attributes are allowed")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float, bool)):
+            raise ValueError("Only numeric constants are allowed")
+    return compile(tree, "<expression>", "eval")
+
+
+def _to_values(items: list) -> torch.Tensor:
+    """Flatten a list of numbers and tensors into one float64 vector."""
+    parts = [torch.as_tensor(item, dtype=torch.float64).detach().cpu().flatten() for item in items]
+    return torch.cat(parts) if parts else torch.zeros(1, dtype=torch.float64)
+
+
+def evaluate_expression(code: CodeType, a: torch.Tensor, b: torch.Tensor, c: torch.Tensor) -> torch.Tensor:
+    """
+    Evaluate compiled ``code`` over broadcast vectors a, b, c.
+
+    Every element follows Python float semantics. Vectors are evaluated in
+    one torch pass first; expressions that cannot vectorize (conditionals,
+    math functions without a torch equivalent) and results with inf or nan
+    (e.g. division by zero, a negative base with a fractional exponent) fall
+    back to a per-element loop, which raises where Python would.
+    """
+    count = max(a.numel(), b.numel(), c.numel())
+    for name, values in (("a", a), ("b", b), ("c", c)):
+        if values.numel() not in (1, count):
+            raise ValueError(f"'{name}' has {values.numel()} values; expected 1 or {count}")
+
+    if count > 1:
+        try:
+            result = eval(code, {"__builtins__": {}}, {"a": a, "b": b, "c": c, "math": _TENSOR_MATH})
+            result = torch.as_tensor(result, dtype=torch.float64).expand(count)
+            if torch.isfinite(result).all():
+                return result.clone()
+        except (TypeError, ValueError, RuntimeError, AttributeError):
+            pass
+
+    a, b, c = (values.expand(count).tolist() for values in (a, b, c))
+    results = [
+        float(eval(code, {"__builtins__": {}}, {"a": a[i], "b": b[i], "c": c[i], "math": math}))
+        for i in range(count)
+    ]
+    return torch.tensor(results, dtype=torch.float64)
+
 
 class DuffyMathExpression(io.ComfyNode):
     """
@@ -15,73 +112,89 @@ class DuffyMathExpression(io.ComfyNode):
             node_id="Duffy_MathExpression",
             display_name="Math Expression",
             category="Duffy/Math",
-            description="Evaluates a mathematical expression using inputs a, b, and c and outputs both integer and float results.",
+            description=(
+                "Evaluates a mathematical expression using inputs a, b, and c and outputs both integer and float results. "
+                "List or SIGMAS inputs are evaluated elementwise in one pass."
+            ),
+            is_input_list=True,
             inputs=[
-                io.Float.Input(
-                    "a",
-                    display_name="A",
-                    default=0.0,
-                    min=-1e12,
-                    max=1e12,
-                    step=0.01,
-                    tooltip="Variable 'a' for the expression",
+                io.MultiType.Input(
+                    io.Float.Input(
+                        "a",
+                        display_name="A",
+                        default=0.0,
+                        min=-1e12,
+                        max=1e12,
+                        step=0.01,
+                        tooltip="Variable 'a' for the expression (a float, float list, or SIGMAS)",
+                    ),
+                    types=[io.Float, io.Sigmas],
                 ),
-                io.Float.Input(
-                    "b",
-                    display_name="B",
-                    default=0.0,
-                    min=-1e12,
-                    max=1e12,
-                    step=0.01,
-                    tooltip="Variable 'b' for the expression",
+                io.MultiType.Input(
+                    io.Float.Input(
+                        "b",
+                        display_name="B",
+                        default=0.0,
+                        min=-1e12,
+                        max=1e12,
+                        step=0.01,
+                        tooltip="Variable 'b' for the expression (a float, float list, or SIGMAS)",
+                    ),
+                    types=[io.Float, io.Sigmas],
                 ),
-                io.Float.Input(
-                    "c",
-                    display_name="C",
-                    default=0.0,
-                    min=-1e12,
-                    max=1e12,
-                    step=0.01,
-                    tooltip="Variable 'c' for the expression",
+                io.MultiType.Input(
+                    io.Float.Input(
+                        "c",
+                        display_name="C",
+                        default=0.0,
+                        min=-1e12,
+                        max=1e12,
+                        step=0.01,
+                        tooltip="Variable 'c' for the expression (a float, float list, or SIGMAS)",
+                    ),
+                    types=[io.Float, io.Sigmas],
                 ),
                 io.String.Input(
                     "expression",
                     display_name="Expression",
                     default="a + b + c",
-                    tooltip="Mathematical expression natively evaluated using Python (e.g., 'a * math.sin(b) + c')",
+                    tooltip="Mathematical expression using a, b, c and math.* (e.g., 'a * math.sin(b) + c')",
                 ),
             ],
             outputs=[
                 io.Int.Output(
                     "int_result",
                     display_name="Int Result",
-                    tooltip="Integer result of the evaluated expression",
+                    is_output_list=True,
+                    tooltip="Integer result of the evaluated expression (one per element)",
                 ),
                 io.Float.Output(
                     "float_result",
                     display_name="Float Result",
-                    tooltip="Float result of the evaluated expression",
+                    is_output_list=True,
+                    tooltip="Float result of the evaluated expression (one per element)",
+                ),
+                io.Sigmas.Output(
+                    "tensor_result",
+                    display_name="Tensor Result",
+                    tooltip="All results as a single 1D tensor, e.g. a sigma or strength schedule",
                 ),
             ],
         )
 
     @classmethod
-    def execute(cls, a: float, b: float, c: float, expression: str, **kwargs) -> io.NodeOutput:
-        allowed_names = {
-            "a": a,
-            "b": b,
-            "c": c,
-            "math": math,
-        }
-        
+    def execute(cls, a: list, b: list, c: list, expression: list[str], **kwargs) -> io.NodeOutput:
+        if len(expression) > 1:
+            raise ValueError(f"Expected a single expression, got a list of {len(expression)}")
+        expression = expression[0] if expression else ""
+
         try:
-            # Safely evaluate the expression restricting access to built-in functions
-            result = eval(expression, {"__builtins__": {}}, allowed_names)
-            float_res = float(result)
-            int_res = int(float_res)
+            code = compile_expression(expression)
+            values = evaluate_expression(code, _to_values(a), _to_values(b), _to_values(c))
         except Exception as e:
             print(f"[Duffy Math Expression] Error evaluating expression '{expression}': {e}")
-            float_res = 0.0
-            int_res = 0
-            
-        return io.NodeOutput(int_res, float_res)
+            values = torch.zeros(1, dtype=torch.float64)
+
+        float_res = values.tolist()
+        int_res = [int(v) if math.isfinite(v) else 0 for v in float_res]
+        return io.NodeOutput(int_res, float_res, values.float())
@@ -1,9 +1,13 @@
+import asyncio
 import json
 import logging
 import os
+import threading
 
 import folder_paths
+from aiohttp import web
 from comfy_api.latest import io
+from server import PromptServer
 
 logger = logging.getLogger(__name__)
 
@@ -11,6 +15,10 @@ MODEL_EXTENSIONS = {".safetensors", ".ckpt", ".pt", ".bin", ".pth", ".gguf"}
 SLOT_COUNT = 3
 _NONE = "(empty)"
 _CONFIG_FILE = os.path.join(os.path.dirname(__file__), "model_dirs_config.json")
+_INDEX_FILE = os.path.join(os.path.dirname(__file__), "model_topology_index.json")
+
+_index_lock = threading.Lock()
+_refresh_thread: threading.Thread | None = None
 
 
 # ── Config persistence helpers ──────────────────────────────────
@@ -58,46 +66,177 @@ def _get_extra_dirs_text() -> str:
     return ""
 
 
-# ── Directory scanning helpers ──────────────────────────────────
+# ── Topology index ──────────────────────────────────────────────
+#
+# The index maps every directory below the configured model dirs to
+# {"mtime_ns", "subdirs", "files"}.  A refresh stats each directory and
+# only re-lists the ones whose mtime changed, so an unchanged library
+# costs one stat per directory instead of a full os.walk over every file.
+# Schema construction only reads the index; refreshes run in the background
+# or through the /duffynodes/api/v1/model-selector/refresh route.
 
-def _scan_subfolders() -> dict[str, list[str]]:
-    """
-    Walk every directory in MODELS_DIRS and return a mapping of
-    subfolder_name → sorted list of model filenames found inside.
-    If the same subfolder name appears in multiple base dirs, the
-    model lists are merged and deduplicated.
-    """
-    topology: dict[str, set[str]] = {}
+def _resolved_bases() -> list[str]:
+    bases = []
     for base in _load_model_dirs():
         base = os.path.expandvars(os.path.expanduser(base))
         if not os.path.isdir(base):
             logger.warning("Model Selector: configured path does not exist: %s", base)
             continue
-        real_base = os.path.realpath(base)
+        bases.append(os.path.realpath(base))
+    return bases
+
+
+def _read_index() -> dict[str, dict]:
+    if not os.path.isfile(_INDEX_FILE):
+        return {}
+    try:
+        with open(_INDEX_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (json.JSONDecodeError, OSError):
+        logger.warning("Model Selector: could not read topology index: %s", _INDEX_FILE)
+        return {}
+
+
+def _write_index(index: dict[str, dict]) -> None:
+    tmp_path = _INDEX_FILE + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, _INDEX_FILE)
+    except OSError:
+        logger.warning("Model Selector: could not write topology index: %s", _INDEX_FILE)
+
+
+def _list_dir(path: str, follow_symlinks: bool) -> tuple[list[str], list[str]]:
+    """Return (subdirectory names, model filenames) directly inside ``path``."""
+    subdirs, files = [], []
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                if entry.is_dir(follow_symlinks=follow_symlinks):
+                    subdirs.append(entry.name)
+                elif os.path.splitext(entry.name)[1].lower() in MODEL_EXTENSIONS:
+                    files.append(entry.name)
+            except OSError:
+                continue
+    return sorted(subdirs), sorted(files)
+
+
+def _refresh_index() -> tuple[dict[str, dict], int]:
+    """
+    Bring the persisted index up to date, re-listing only directories whose
+    mtime changed.  Returns (index, number of directories re-listed).
+    """
+    with _index_lock:
+        old_index = _read_index()
+        new_index: dict[str, dict] = {}
+        relisted = 0
+        for base in _resolved_bases():
+            # Top-level entries follow symlinks (matching os.path.isdir); below
+            # that, symlinked directories are not descended (matching os.walk).
+            stack = [(base, True)]
+            while stack:
+                path, follow = stack.pop()
+                if path in new_index:
+                    continue
+                try:
+                    mtime_ns = os.stat(path).st_mtime_ns
+                    entry = old_index.get(path)
+                    if entry is None or entry.get("mtime_ns") != mtime_ns:
+                        subdirs, files = _list_dir(path, follow)
+                        entry = {"mtime_ns": mtime_ns, "subdirs": subdirs, "files": files}
+                        relisted += 1
+                except OSError:
+                    logger.warning("Model Selector: could not read directory: %s", path)
+                    continue
+                new_index[path] = entry
+                for name in entry["subdirs"]:
+                    if path == base and name.startswith("."):
+                        continue
+                    stack.append((os.path.join(path, name), False))
+        if relisted or new_index.keys() != old_index.keys():
+            _write_index(new_index)
+        return new_index, relisted
+
+
+def _refresh_in_background() -> None:
+    """Start a single background index refresh if none is running."""
+    global _refresh_thread
+    if _refresh_thread is not None and _refresh_thread.is_alive():
+        return
+
+    def run() -> None:
         try:
-            for entry in os.listdir(real_base):
-                entry_path = os.path.join(real_base, entry)
-                if not os.path.isdir(entry_path) or entry.startswith("."):
+            _, relisted = _refresh_index()
+            if relisted:
+                logger.info("Model Selector: topology index updated (%d directories re-listed)", relisted)
+        except Exception as e:
+            logger.warning("Model Selector: background index refresh failed: %s", e)
+
+    _refresh_thread = threading.Thread(target=run, name="duffy-model-index", daemon=True)
+    _refresh_thread.start()
+
+
+def _topology_from_index(index: dict[str, dict], bases: list[str]) -> dict[str, list[str]]:
+    """
+    Compose subfolder_name → sorted model paths from the index.  If the same
+    subfolder name appears in multiple base dirs, the model lists are merged
+    and deduplicated.
+    """
+    topology: dict[str, set[str]] = {}
+    for base in bases:
+        base_entry = index.get(base)
+        if base_entry is None:
+            continue
+        for name in base_entry["subdirs"]:
+            if name.startswith("."):
+                continue
+            models = topology.setdefault(name, set())
+            stack = [(os.path.join(base, name), "")]
+            while stack:
+                path, rel = stack.pop()
+                entry = index.get(path)
+                if entry is None:
                     continue
-                models = topology.setdefault(entry, set())
-                for root, _dirs, files in os.walk(entry_path):
-                    for f in files:
-                        if os.path.splitext(f)[1].lower() in MODEL_EXTENSIONS:
-                            rel = os.path.relpath(
-                                os.path.join(root, f), entry_path
-                            ).replace("\\", "/")
-                            models.add(rel)
-        except OSError:
-            logger.warning("Model Selector: could not read directory: %s", base)
-    result = {k: sorted(v) for k, v in sorted(topology.items())}
+                models.update(rel + f for f in entry["files"])
+                stack.extend((os.path.join(path, d), f"{rel}{d}/") for d in entry["subdirs"])
+    return {k: sorted(v) for k, v in sorted(topology.items())}
+
+
+def _scan_subfolders() -> dict[str, list[str]]:
+    """
+    Return the subfolder topology of all configured model directories.
+
+    Reads the persisted index and schedules a background refresh; only when
+    a configured directory has never been indexed is the scan done inline.
+    """
+    bases = _resolved_bases()
+    index = _read_index()
+    if any(base not in index for base in bases):
+        index, _ = _refresh_index()
+    else:
+        _refresh_in_background()
+
+    result = _topology_from_index(index, bases)
     logger.info(
-        "Model Selector: scanned %d subfolder(s) across directories: %s",
+        "Model Selector: indexed %d subfolder(s) across directories: %s",
         len(result),
         ", ".join(_load_model_dirs()),
     )
     return result
 
 
+@PromptServer.instance.routes.post("/duffynodes/api/v1/model-selector/refresh")
+async def refresh_model_index(request):
+    try:
+        index, relisted = await asyncio.to_thread(_refresh_index)
+        folders = len(_topology_from_index(index, _resolved_bases()))
+        return web.json_response({"status": "success", "folders": folders, "relisted": relisted})
+    except Exception as e:
+        return web.json_response({"status": "error", "message": str(e)}, status=500)
+
+
 def _build_folder_combo(slot_index: int, topology: dict[str, list[str]]) -> io.DynamicCombo.Input:
     """
     Build a DynamicCombo for one slot.  Each subfolder becomes an Option;
@@ -132,8 +271,8 @@ def _build_folder_combo(slot_index: int, topology: dict[str, list[str]]) -> io.D
 class DuffyModelSelector(io.ComfyNode):
     """
     Three-slot model path selector using DynamicCombo.  The subfolder
-    topology is pre-computed from MODELS_DIRS at server startup — no JS
-    needed for dropdown population.  Each slot has a customizable label
+    topology is read from a persisted, incrementally refreshed index of
+    MODELS_DIRS — no JS needed for dropdown population.  Each slot has a customizable label
     that is reflected on the output port via the companion JS extension.
     Outputs are plain-string filenames; nothing is loaded into VRAM.
     """
@@ -144,7 +283,7 @@ class DuffyModelSelector(io.ComfyNode):
         if not topology:
             logger.warning(
                 "Model Selector: no subfolders found in configured directories. "
-                "Add paths in the 'Extra Model Directories' field and restart."
+                "Add paths in the 'Extra Model Directories' field and refresh node definitions."
             )
 
         inputs: list[io.Input] = [
@@ -157,7 +296,7 @@ class DuffyModelSelector(io.ComfyNode):
                     "Enter additional model directory paths, one per line. "
                     "The default ComfyUI models directory is always included. "
                     "After changing paths, run the workflow once to save, "
-                    "then restart ComfyUI to rescan."
+                    "then refresh node definitions to rescan."
                 ),
             ),
         ]
@@ -189,8 +328,8 @@ class DuffyModelSelector(io.ComfyNode):
             description=(
                 "Pick a subfolder and model for each of three slots. "
                 "Outputs filenames as strings — models are NOT loaded. "
-                "Add extra model directories in the text field and restart "
-                "ComfyUI to rescan."
+                "Add extra model directories in the text field and refresh "
+                "node definitions to rescan."
             ),
             inputs=inputs,
             outputs=outputs,
@@ -1,12 +1,15 @@
+import asyncio
 import os
 import json
 import torch
 from aiohttp import web
 from server import PromptServer
 import folder_paths
-import comfy.sd
 from comfy_api.latest import io
 
+from ..core.lora_metadata import trigger_index
+from ..core.lora_patches import apply_lora_stack
+
 # Custom API endpoints
 @PromptServer.instance.routes.get("/duffynodes/api/v1/lora-list")
 async def get_lora_list(request):
@@ -24,13 +27,36 @@ async def get_trigger_lookup(request):
         return web.json_response({"status": "error", "message": "Missing lora_name param"}, status=400)
     
     try:
-        # Fallback/stub implemented for metadata lookup
         lora_path = folder_paths.get_full_path_or_raise("loras", lora_name)
-        # TODO: Implement Safetensors metadata extraction
-        return web.json_response({"status": "success", "trigger_words": []})
+        trigger_words = await asyncio.to_thread(_lookup_triggers, [(lora_name, lora_path)])
+        return web.json_response({"status": "success", "trigger_words": trigger_words[lora_name]})
+    except Exception as e:
+        return web.json_response({"status": "error", "message": str(e)}, status=500)
+
+@PromptServer.instance.routes.get("/duffynodes/api/v1/trigger-lookup/all")
+async def get_trigger_lookup_all(request):
+    try:
+        entries = []
+        for lora_name in folder_paths.get_filename_list("loras"):
+            lora_path = folder_paths.get_full_path("loras", lora_name)
+            if lora_path:
+                entries.append((lora_name, lora_path))
+        triggers = await asyncio.to_thread(_lookup_triggers, entries)
+        return web.json_response({"status": "success", "triggers": triggers})
     except Exception as e:
         return web.json_response({"status": "error", "message": str(e)}, status=500)
 
+def _lookup_triggers(entries: list[tuple[str, str]]) -> dict[str, list[str]]:
+    """Resolve trigger words for (lora_name, path) pairs via the persistent header index."""
+    result = {}
+    for lora_name, lora_path in entries:
+        try:
+            result[lora_name] = trigger_index.lookup(lora_path)
+        except OSError:
+            result[lora_name] = []
+    trigger_index.save()
+    return result
+
 class DuffyPowerLoraLoader(io.ComfyNode):
     @classmethod
     def define_schema(cls) -> io.Schema:
@@ -59,9 +85,8 @@ class DuffyPowerLoraLoader(io.ComfyNode):
         except json.JSONDecodeError:
             lora_data = []
 
-        current_model = model
-        current_clip = clip
-        active_triggers = []
+        stack = []
+        stack_triggers = []
 
         for lora in lora_data:
             if not lora.get("is_active", True):
@@ -75,30 +100,33 @@ class DuffyPowerLoraLoader(io.ComfyNode):
             if not lora_name:
                 continue
 
-            # Load and Patch LoRA
             try:
                 lora_path = folder_paths.get_full_path_or_raise("loras", lora_name)
-                lora_weights = comfy.utils.load_torch_file(lora_path, safe_load=True)
-                
-                current_model, current_clip = comfy.sd.load_lora_for_models(
-                    current_model, current_clip, lora_weights, strength_model, strength_clip
-                )
-                
-                if trigger_words:
-                    active_triggers.append(trigger_words)
-                    
             except FileNotFoundError:
                 print(f"[Duffy Power Lora Loader] Warning: Lora file {lora_name} not found. Bypassing...")
                 PromptServer.instance.send_sync("duffy.lora.error", {
                     "node_type": "Duffy_PowerLoraLoader",
                     "message": f"Lora file {lora_name} not found. Bypassing..."
                 })
-            except Exception as e:
-                print(f"[Duffy Power Lora Loader] Error applying Lora {lora_name}: {e}")
-                PromptServer.instance.send_sync("duffy.lora.error", {
-                    "node_type": "Duffy_PowerLoraLoader",
-                    "message": str(e)
-                })
+                continue
+
+            stack.append((lora_path, strength_model, strength_clip))
+            stack_triggers.append((lora_path, trigger_words))
+
+        failed_paths = set()
+
+        def report_error(lora_path: str, e: Exception) -> None:
+            failed_paths.add(lora_path)
+            print(f"[Duffy Power Lora Loader] Error applying Lora {os.path.basename(lora_path)}: {e}")
+            PromptServer.instance.send_sync("duffy.lora.error", {
+                "node_type": "Duffy_PowerLoraLoader",
+                "message": str(e)
+            })
+
+        # Patch sets for the whole stack are cached, so strength sweeps and
+        # repeated stacks skip LoRA conversion and only clone model/CLIP once.
+        current_model, current_clip = apply_lora_stack(model, clip, stack, on_error=report_error)
+        active_triggers = [words for path, words in stack_triggers if words and path not in failed_paths]
 
         trigger_str = ", ".join(active_triggers)
         return io.NodeOutput(current_model, current_clip)
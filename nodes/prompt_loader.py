@@ -1,16 +1,22 @@
 from __future__ import annotations
 
 import asyncio
+import concurrent.futures
 import hashlib
 import importlib
+import inspect
 import json
 import logging
 import os
 import re
+import ssl
+import tempfile
 import threading
+import time
 import urllib.error
 import urllib.request
 import uuid
+from array import array
 from pathlib import Path
 from typing import Any
 
@@ -54,10 +60,27 @@ _ALLOWED_EXTENSIONS = {".txt", ".csv", ".md"}
 _DEFAULT_SEPARATOR = "|"
 _DEFAULT_POSITIVE_MARKER = "(+)"
 _DEFAULT_NEGATIVE_MARKER = "(-)"
+_EMIT_MODES = ["Single", "Batch"]
+_INDEX_VERSION = 2
+_INDEX_CHUNK_SIZE = 4 * 1024 * 1024
 _PROMPT_LOADER_STATE: dict[str, dict[str, Any]] = {}
 _STATE_LOCK = threading.Lock()
 
 
+def _index_dir() -> str:
+    """Prompt index location: ComfyUI's user directory, else the system temp directory."""
+    base = None
+    if _folder_paths is not None:
+        try:
+            base = _folder_paths.get_user_directory()
+        except Exception:
+            base = None
+    return os.path.join(base or tempfile.gettempdir(), "duffy_prompt_loader_index")
+
+
+_INDEX_DIR = _index_dir()
+
+
 def _normalize_hidden_value(value: Any) -> Any:
     if isinstance(value, list):
         return value[0] if value else None
@@ -109,13 +132,179 @@ def _file_signature(path: str) -> tuple[str, int, int]:
     return (path, stat.st_mtime_ns, stat.st_size)
 
 
-def _read_text_file(path: str) -> str:
+def _index_file_path(file_path: str, separator: str, positive_marker: str, negative_marker: str) -> str:
+    key = "\0".join((file_path, separator, positive_marker, negative_marker))
+    digest = hashlib.sha1(key.encode("utf-8", errors="surrogatepass")).hexdigest()
+    return os.path.join(_INDEX_DIR, f"{digest}.idx")
+
+
+def _load_prompt_index(index_path: str, signature: tuple[str, int, int]) -> dict[str, Any] | None:
+    """Load a persisted block index if it was built for the current file signature."""
+    try:
+        with open(index_path, "rb") as file_handle:
+            header = json.loads(file_handle.readline())
+            if (
+                header.get("version") != _INDEX_VERSION
+                or header.get("path") != signature[0]
+                or header.get("signature") != list(signature[1:])
+            ):
+                return None
+            offsets = array("q")
+            offsets.frombytes(file_handle.read())
+    except (OSError, ValueError, AttributeError):
+        return None
+
+    if len(offsets) != 2 * int(header.get("count", -1)):
+        return None
+    return {"encoding": header["encoding"], "file_hash": header["file_hash"], "offsets": offsets}
+
+
+def _save_prompt_index(index_path: str, signature: tuple[str, int, int], index: dict[str, Any]) -> None:
+    header = {
+        "version": _INDEX_VERSION,
+        "path": signature[0],
+        "signature": list(signature[1:]),
+        "encoding": index["encoding"],
+        "file_hash": index["file_hash"],
+        "count": len(index["offsets"]) // 2,
+    }
+    tmp_path = index_path + ".tmp"
+    try:
+        os.makedirs(_INDEX_DIR, exist_ok=True)
+        with open(tmp_path, "wb") as file_handle:
+            file_handle.write(json.dumps(header).encode("utf-8") + b"\n")
+            index["offsets"].tofile(file_handle)
+        os.replace(tmp_path, index_path)
+    except OSError as exc:
+        LOGGER.warning("[DuffyPromptLoader] Unable to persist prompt index %s: %s", index_path, exc)
+        return
+    _prune_prompt_indexes(keep=index_path)
+
+
+def _index_is_current(index_path: str) -> bool:
+    """True if the index file's source still exists with the mtime and size it was built for."""
+    try:
+        with open(index_path, "rb") as file_handle:
+            header = json.loads(file_handle.readline())
+        if header.get("version") != _INDEX_VERSION:
+            return False
+        return header.get("signature") == list(_file_signature(header["path"])[1:])
+    except (OSError, ValueError, AttributeError, KeyError, TypeError):
+        return False
+
+
+def _prune_prompt_indexes(keep: str) -> None:
+    """Delete index files whose source file was edited, moved or deleted since they were built."""
+    try:
+        names = os.listdir(_INDEX_DIR)
+    except OSError:
+        return
+    for name in names:
+        index_path = os.path.join(_INDEX_DIR, name)
+        if index_path == keep or not name.endswith(".idx") or _index_is_current(index_path):
+            continue
+        try:
+            os.remove(index_path)
+        except OSError:
+            pass
+
+
+def _scan_prompt_blocks(
+    file_path: str,
+    encoding: str,
+    separator: str,
+    positive_marker: str,
+    negative_marker: str,
+) -> dict[str, Any]:
+    """
+    Stream the file once, recording byte offsets of every block that yields a
+    prompt pair. Only the block being scanned is held in memory; the raw bytes
+    are hashed as they are read. Raises UnicodeDecodeError if a block is not
+    valid in ``encoding``.
+    """
+    offsets = array("q")
+    hasher = hashlib.sha256()
+    # Text-mode reads translated every line ending to "\n"; a newline in the
+    # separator therefore matches \r\n, \r or \n in the raw bytes.
+    try:
+        parts = [re.escape(part.encode(encoding)) for part in separator.split("\n")]
+        sep_pattern: re.Pattern[bytes] | None = re.compile(rb"(?:\r\n|\r(?!\n)|\n)".join(parts))
+    except UnicodeEncodeError:
+        sep_pattern = None  # cannot occur in a file of this encoding
+    overlap = len(separator.encode(encoding, errors="replace")) + separator.count("\n")
+
+    def keep_block(block: bytes, start: int) -> None:
+        text = block.decode(encoding).replace("\r\n", "\n").replace("\r", "\n")
+        positive, negative = _parse_block(text, positive_marker, negative_marker)
+        if positive or negative:
+            offsets.extend((start, start + len(block)))
+
+    with open(file_path, "rb") as file_handle:
+        buffer = b""
+        buffer_offset = 0  # file offset of buffer[0], always the start of the open block
+        search_from = 0
+        while True:
+            chunk = file_handle.read(_INDEX_CHUNK_SIZE)
+            hasher.update(chunk)
+            at_eof = not chunk
+            buffer += chunk
+            block_start = 0
+
+            if sep_pattern is not None:
+                for match in sep_pattern.finditer(buffer, search_from):
+                    if match.start() < block_start:
+                        continue
+                    if not at_eof and match.end() >= len(buffer):
+                        # A trailing \r may still extend to \r\n in the next chunk
+                        break
+                    keep_block(buffer[block_start:match.start()], buffer_offset + block_start)
+                    block_start = match.end()
+
+            if at_eof:
+                keep_block(buffer[block_start:], buffer_offset + block_start)
+                break
+
+            buffer = buffer[block_start:]
+            buffer_offset += block_start
+            search_from = max(0, len(buffer) - overlap)
+
+    return {"encoding": encoding, "file_hash": hasher.hexdigest(), "offsets": offsets}
+
+
+def _build_prompt_index(
+    file_path: str,
+    signature: tuple[str, int, int],
+    separator: str,
+    positive_marker: str,
+    negative_marker: str,
+) -> dict[str, Any]:
+    """Return the block index for the file, reusing the persisted one when still valid."""
+    index_path = _index_file_path(file_path, separator, positive_marker, negative_marker)
+    index = _load_prompt_index(index_path, signature)
+    if index is not None:
+        return index
+
     try:
-        with open(path, "r", encoding="utf-8") as file_handle:
-            return file_handle.read()
+        index = _scan_prompt_blocks(file_path, "utf-8", separator, positive_marker, negative_marker)
     except UnicodeDecodeError:
-        with open(path, "r", encoding="latin-1") as file_handle:
-            return file_handle.read()
+        index = _scan_prompt_blocks(file_path, "latin-1", separator, positive_marker, negative_marker)
+    _save_prompt_index(index_path, signature, index)
+    return index
+
+
+def _read_prompt_pairs(state: dict[str, Any], start: int, stop: int) -> list[tuple[str, str]]:
+    """Read and parse pairs ``start``..``stop`` by seeking to their indexed blocks."""
+    offsets: array = state["offsets"]
+    encoding = state["encoding"]
+    pairs: list[tuple[str, str]] = []
+    with open(state["file_path"], "rb") as file_handle:
+        for pair_index in range(start, stop):
+            block_start, block_end = offsets[2 * pair_index], offsets[2 * pair_index + 1]
+            file_handle.seek(block_start)
+            block = file_handle.read(block_end - block_start).decode(encoding)
+            block = block.replace("\r\n", "\n").replace("\r", "\n")
+            pairs.append(_parse_block(block, state["positive_marker"], state["negative_marker"]))
+    return pairs
 
 
 def _validate_markers(separator: str, positive_marker: str, negative_marker: str) -> None:
@@ -129,13 +318,6 @@ def _validate_markers(separator: str, positive_marker: str, negative_marker: str
         raise ValueError("positive_marker and negative_marker must be different.")
 
 
-def _split_blocks(document: str, separator: str) -> list[str]:
-    pattern = re.escape(separator)
-    chunks = re.split(pattern, document)
-    blocks = [_sanitize_text(chunk) for chunk in chunks if _sanitize_text(chunk)]
-    return blocks
-
-
 def _parse_block(block: str, positive_marker: str, negative_marker: str) -> tuple[str, str]:
     working = block
     pos_index = working.find(positive_marker)
@@ -167,18 +349,6 @@ def _parse_block(block: str, positive_marker: str, negative_marker: str) -> tupl
     return (_sanitize_text(positive), _sanitize_text(negative))
 
 
-def _parse_prompt_pairs(document: str, separator: str, positive_marker: str, negative_marker: str) -> list[tuple[str, str]]:
-    blocks = _split_blocks(document, separator)
-    pairs: list[tuple[str, str]] = []
-
-    for block in blocks:
-        positive, negative = _parse_block(block, positive_marker, negative_marker)
-        if positive or negative:
-            pairs.append((positive, negative))
-
-    return pairs
-
-
 def _parse_json_dict(raw: Any) -> dict[str, Any] | None:
     if isinstance(raw, dict):
         return raw
@@ -199,24 +369,128 @@ def _parse_json_dict(raw: Any) -> dict[str, Any] | None:
     return None
 
 
-def _inject_queue_runtime_inputs(prompt_payload: dict[str, Any], queue_nonce: str, queue_client_id: str) -> int:
+def _inject_queue_runtime_inputs(prompt_payload: dict[str, Any], queue_nonce: str, queue_client_id: str) -> tuple[dict[str, Any], int]:
+    """
+    Return a structural copy of ``prompt_payload`` with runtime inputs set on
+    every Duffy_PromptLoader node. Only the touched nodes (and their inputs) are
+    copied; all other node entries are shared with the original prompt.
+    """
+    prompt_copy = dict(prompt_payload)
     touched = 0
-    for node_data in prompt_payload.values():
+    for node_id, node_data in prompt_payload.items():
         if not isinstance(node_data, dict):
             continue
         if node_data.get("class_type") != "Duffy_PromptLoader":
             continue
 
         inputs = node_data.get("inputs")
-        if not isinstance(inputs, dict):
-            inputs = {}
-            node_data["inputs"] = inputs
-
+        inputs = dict(inputs) if isinstance(inputs, dict) else {}
         inputs["queue_nonce"] = queue_nonce
         inputs["queue_client_id"] = queue_client_id
+
+        node_copy = dict(node_data)
+        node_copy["inputs"] = inputs
+        prompt_copy[node_id] = node_copy
         touched += 1
 
-    return touched
+    return prompt_copy, touched
+
+
+async def _submit_prompt_in_process(server: Any, request_body: dict[str, Any]) -> tuple[bool, str]:
+    """Mirror ComfyUI's POST /prompt handler without the HTTP round trip."""
+    execution = importlib.import_module("execution")
+
+    if hasattr(server, "trigger_on_prompt"):
+        request_body = server.trigger_on_prompt(request_body)
+    prompt = request_body["prompt"]
+    prompt_id = request_body["prompt_id"]
+
+    if len(inspect.signature(execution.validate_prompt).parameters) >= 3:
+        valid = execution.validate_prompt(prompt_id, prompt, None)
+    else:
+        valid = execution.validate_prompt(prompt)
+    if inspect.isawaitable(valid):
+        valid = await valid
+    if not valid[0]:
+        error = valid[1] if isinstance(valid[1], dict) else {"message": str(valid[1])}
+        return (False, f"Queue request rejected: {error.get('message', error)}"[:200])
+
+    extra_data = dict(request_body.get("extra_data") or {})
+    extra_data["client_id"] = request_body["client_id"]
+    number = server.number
+    server.number += 1
+
+    sensitive_keys = getattr(execution, "SENSITIVE_EXTRA_DATA_KEYS", None)
+    if sensitive_keys is not None:
+        sensitive = {key: extra_data.pop(key) for key in sensitive_keys if key in extra_data}
+        extra_data["create_time"] = int(time.time() * 1000)  # milliseconds, as the HTTP route sets it
+        server.prompt_queue.put((number, prompt_id, prompt, extra_data, valid[2], sensitive))
+    else:
+        server.prompt_queue.put((number, prompt_id, prompt, extra_data, valid[2]))
+    return (True, "")
+
+
+def _queue_in_process(request_body: dict[str, Any]) -> tuple[bool, str] | None:
+    """Submit to the server's prompt queue; None if no server loop is available."""
+    server = getattr(PromptServer, "instance", None) if PromptServer is not None else None
+    loop = getattr(server, "loop", None)
+    if server is None or loop is None or not hasattr(server, "prompt_queue"):
+        return None
+
+    coroutine = _submit_prompt_in_process(server, request_body)
+    try:
+        running_loop = asyncio.get_running_loop()
+    except RuntimeError:
+        running_loop = None
+    if running_loop is loop:
+        # Executing on the server loop itself: waiting here would deadlock
+        loop.create_task(coroutine)
+        return (True, "")
+    return asyncio.run_coroutine_threadsafe(coroutine, loop).result(timeout=30)
+
+
+def _queue_over_http(request_body: dict[str, Any]) -> tuple[bool, str]:
+    """Fallback: POST to the server's own /prompt endpoint."""
+    port = 8188
+    host = "127.0.0.1"
+    scheme = "http"
+    ssl_context = None
+    if comfy_args is not None:
+        if getattr(comfy_args, "port", None):
+            try:
+                port = int(comfy_args.port)
+            except Exception:
+                port = 8188
+        listen = str(getattr(comfy_args, "listen", "") or "").split(",")[0].strip()
+        if listen == "::":
+            host = "[::1]"
+        elif listen and listen != "0.0.0.0":
+            host = f"[{listen}]" if ":" in listen else listen
+        if getattr(comfy_args, "tls_keyfile", None) and getattr(comfy_args, "tls_certfile", None):
+            scheme = "https"
+            # Loopback call to our own server, usually with a self-signed cert
+            ssl_context = ssl.create_default_context()
+            ssl_context.check_hostname = False
+            ssl_context.verify_mode = ssl.CERT_NONE
+
+    request = urllib.request.Request(
+        f"{scheme}://{host}:{port}/prompt",
+        data=json.dumps(request_body).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+
+    try:
+        with urllib.request.urlopen(request, timeout=8, context=ssl_context) as response:
+            response_payload = response.read().decode("utf-8", errors="ignore")
+            if 200 <= response.status < 300:
+                return (True, "")
+            return (False, f"Queue request failed ({response.status}): {response_payload[:160]}")
+    except urllib.error.HTTPError as exc:
+        details = exc.read().decode("utf-8", errors="ignore")
+        return (False, f"Queue request failed ({exc.code}): {details[:200]}")
+    except Exception as exc:  # pragma: no cover - network-dependent branch
+        return (False, f"Queue request error: {exc}")
 
 
 def _queue_next_prompt(prompt_payload: Any, workflow_payload: Any, unique_id: Any, queue_client_id: str) -> tuple[bool, str]:
@@ -228,55 +502,41 @@ def _queue_next_prompt(prompt_payload: Any, workflow_payload: Any, unique_id: An
     if not normalized_client_id:
         normalized_client_id = f"duffy_prompt_loader_{_normalize_hidden_value(unique_id) or 'unknown'}"
 
-    try:
-        prompt_to_queue = json.loads(json.dumps(prompt_payload))
-    except Exception:
-        prompt_to_queue = dict(prompt_payload)
-    touched_nodes = _inject_queue_runtime_inputs(prompt_to_queue, queue_nonce, normalized_client_id)
-
-    port = 8188
-    if comfy_args is not None and getattr(comfy_args, "port", None):
-        try:
-            port = int(comfy_args.port)
-        except Exception:
-            port = 8188
+    prompt_to_queue, touched_nodes = _inject_queue_runtime_inputs(prompt_payload, queue_nonce, normalized_client_id)
 
-    request_body = {
+    request_body: dict[str, Any] = {
         "prompt": prompt_to_queue,
         "client_id": normalized_client_id,
         "prompt_id": str(uuid.uuid4()),
     }
 
-    if isinstance(workflow_payload, dict) and workflow_payload:
+    has_workflow = isinstance(workflow_payload, dict) and bool(workflow_payload)
+    if has_workflow:
         request_body["extra_data"] = {
             "extra_pnginfo": {
                 "workflow": workflow_payload,
             }
         }
 
-    request_data = json.dumps(request_body).encode("utf-8")
-    request = urllib.request.Request(
-        f"http://127.0.0.1:{port}/prompt",
-        data=request_data,
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
-
     try:
-        with urllib.request.urlopen(request, timeout=8) as response:
-            response_payload = response.read().decode("utf-8", errors="ignore")
-            if 200 <= response.status < 300:
-                node_count = len(prompt_to_queue)
-                has_workflow = isinstance(workflow_payload, dict) and bool(workflow_payload)
-                workflow_suffix = " with workflow metadata" if has_workflow else ""
-                nonce_suffix = f"; nonce targets: {touched_nodes}" if touched_nodes > 0 else "; nonce targets: none"
-                return (True, f"Queued next prompt run ({node_count} nodes{workflow_suffix}{nonce_suffix}).")
-            return (False, f"Queue request failed ({response.status}): {response_payload[:160]}")
-    except urllib.error.HTTPError as exc:
-        details = exc.read().decode("utf-8", errors="ignore")
-        return (False, f"Queue request failed ({exc.code}): {details[:200]}")
-    except Exception as exc:  # pragma: no cover - network-dependent branch
-        return (False, f"Queue request error: {exc}")
+        outcome = _queue_in_process(request_body)
+    except concurrent.futures.TimeoutError:
+        # The submission may still land; falling back could queue it twice
+        return (False, "Queue request timed out.")
+    except Exception as exc:
+        LOGGER.warning("[DuffyPromptLoader] In-process queueing failed, falling back to HTTP: %s", exc)
+        outcome = None
+    if outcome is None:
+        outcome = _queue_over_http(request_body)
+
+    queued, error = outcome
+    if not queued:
+        return (False, error)
+
+    node_count = len(prompt_to_queue)
+    workflow_suffix = " with workflow metadata" if has_workflow else ""
+    nonce_suffix = f"; nonce targets: {touched_nodes}" if touched_nodes > 0 else "; nonce targets: none"
+    return (True, f"Queued next prompt run ({node_count} nodes{workflow_suffix}{nonce_suffix}).")
 
 
 def _build_runtime_state(
@@ -289,21 +549,22 @@ def _build_runtime_state(
     negative_marker: str,
     reset_counter: int,
 ) -> dict[str, Any]:
-    document = _read_text_file(file_path)
-    pairs = _parse_prompt_pairs(document, separator, positive_marker, negative_marker)
-    if not pairs:
+    index = _build_prompt_index(file_path, signature, separator, positive_marker, negative_marker)
+    total = len(index["offsets"]) // 2
+    if not total:
         raise ValueError("No prompt pairs were found in the selected file.")
 
     return {
         "state_key": state_key,
         "file_path": file_path,
         "file_signature": signature,
-        "file_hash": hashlib.sha256(document.encode("utf-8", errors="ignore")).hexdigest(),
+        "file_hash": index["file_hash"],
+        "encoding": index["encoding"],
         "separator": separator,
         "positive_marker": positive_marker,
         "negative_marker": negative_marker,
-        "pairs": pairs,
-        "total_prompts": len(pairs),
+        "offsets": index["offsets"],
+        "total_prompts": total,
         "current_index": 0,
         "reset_counter": reset_counter,
         "last_queued_index": -1,
@@ -322,6 +583,7 @@ def _run_prompt_loader(
     queue_client_id: str,
     prompt_payload: Any,
     workflow_payload: Any,
+    batch_size: int = 1,
 ) -> dict[str, Any]:
     _validate_markers(separator, positive_marker, negative_marker)
     normalized_path = _normalize_path(file_path)
@@ -356,25 +618,30 @@ def _run_prompt_loader(
         if state is None:
             raise RuntimeError("Prompt loader state initialization failed.")
 
-        pairs: list[tuple[str, str]] = state["pairs"]
         total = int(state["total_prompts"])
         current_index = int(state["current_index"])
 
         exhausted = current_index >= total
         if exhausted:
-            positive_out = ""
-            negative_out = ""
+            positive_out = [""]
+            negative_out = [""]
             status = f"Complete ({total}/{total})"
             queued = False
             queue_message = "No remaining prompts."
             next_index = current_index
         else:
-            positive_out, negative_out = pairs[current_index]
-            next_index = current_index + 1
+            # batch_size <= 0 emits every remaining pair
+            next_index = total if batch_size <= 0 else min(current_index + batch_size, total)
+            emitted = _read_prompt_pairs(state, current_index, next_index)
+            positive_out = [positive for positive, _ in emitted]
+            negative_out = [negative for _, negative in emitted]
             state["current_index"] = next_index
 
             has_next = next_index < total
-            status = f"Processing prompt {next_index} of {total}"
+            if len(emitted) == 1:
+                status = f"Processing prompt {next_index} of {total}"
+            else:
+                status = f"Processing prompts {current_index + 1}-{next_index} of {total}"
             queued = False
             queue_message = ""
             if auto_queue and has_next:
@@ -521,8 +788,8 @@ if _HAS_V3 and io is not None:
                 display_name="Prompt Loader",
                 category="Duffy/Text",
                 description=(
-                    "Loads prompt pairs from a text file and emits one positive/negative pair per run. "
-                    "Supports custom markers and optional automatic queueing."
+                    "Loads prompt pairs from a text file and emits one positive/negative pair per run, "
+                    "or a list of pairs in Batch mode. Supports custom markers and optional automatic queueing."
                 ),
                 is_output_node=True,
                 # Internal prompt index advances every execution, so caching must
@@ -539,10 +806,23 @@ if _HAS_V3 and io is not None:
                     io.String.Input("negative_marker", default=_DEFAULT_NEGATIVE_MARKER, multiline=False, socketless=True),
                     io.Boolean.Input("auto_queue", default=False, socketless=True),
                     io.Int.Input("reset_counter", default=0, min=0, max=2147483647, socketless=True),
+                    io.Combo.Input(
+                        "emit_mode",
+                        options=_EMIT_MODES,
+                        default="Single",
+                        tooltip="Single emits one pair per run. Batch emits batch_size pairs as a list, processed in one run.",
+                    ),
+                    io.Int.Input(
+                        "batch_size",
+                        default=16,
+                        min=0,
+                        max=2147483647,
+                        tooltip="Pairs per run in Batch mode. 0 emits all remaining pairs.",
+                    ),
                 ],
                 outputs=[
-                    io.String.Output("positive_prompt"),
-                    io.String.Output("negative_prompt"),
+                    io.String.Output("positive_prompt", is_output_list=True),
+                    io.String.Output("negative_prompt", is_output_list=True),
                 ],
                 hidden=[
                     io.Hidden.unique_id,
@@ -608,6 +888,8 @@ if _HAS_V3 and io is not None:
             negative_marker: str,
             auto_queue: bool,
             reset_counter: int,
+            emit_mode: str = "Single",
+            batch_size: int = 16,
             **kwargs,
         ):
             unique_id = _normalize_hidden_value(cls.hidden.unique_id)
@@ -628,6 +910,7 @@ if _HAS_V3 and io is not None:
                     queue_client_id=queue_client_id,
                     prompt_payload=prompt_payload,
                     workflow_payload=workflow_payload,
+                    batch_size=int(batch_size) if emit_mode == "Batch" else 1,
                 )
                 ui_payload = {
                     "status": [result["status"]],
@@ -650,7 +933,7 @@ if _HAS_V3 and io is not None:
                     "error": [str(exc)],
                     "exhausted": [True],
                 }
-                return io.NodeOutput("", "", ui=ui_payload)
+                return io.NodeOutput([""], [""], ui=ui_payload)
 
 
 class DuffyPromptLoaderLegacy:
@@ -673,6 +956,10 @@ class DuffyPromptLoaderLegacy:
                 "auto_queue": ("BOOLEAN", {"default": False}),
                 "reset_counter": ("INT", {"default": 0, "min": 0, "max": 2147483647}),
             },
+            "optional": {
+                "emit_mode": (_EMIT_MODES, {"default": "Single"}),
+                "batch_size": ("INT", {"default": 16, "min": 0, "max": 2147483647}),
+            },
             "hidden": {
                 "unique_id": "UNIQUE_ID",
                 "prompt": "PROMPT",
@@ -681,6 +968,7 @@ class DuffyPromptLoaderLegacy:
 
     RETURN_TYPES = ("STRING", "STRING")
     RETURN_NAMES = ("positive_prompt", "negative_prompt")
+    OUTPUT_IS_LIST = (True, True)
     FUNCTION = "execute"
     CATEGORY = "Duffy/Text"
     OUTPUT_NODE = True
@@ -701,6 +989,8 @@ class DuffyPromptLoaderLegacy:
         negative_marker,
         auto_queue,
         reset_counter,
+        emit_mode="Single",
+        batch_size=16,
         unique_id=None,
         prompt=None,
     ):
@@ -721,11 +1011,12 @@ class DuffyPromptLoaderLegacy:
                 queue_client_id=queue_client_id,
                 prompt_payload=prompt_payload,
                 workflow_payload=workflow_payload,
+                batch_size=int(batch_size) if emit_mode == "Batch" else 1,
             )
             return (result["positive"], result["negative"])
         except Exception as exc:
             LOGGER.exception("[DuffyPromptLoaderLegacy] Execution failed: %s", exc)
-            return ("", "")
+            return ([""], [""])
 
 
 NODE_CLASS_MAPPINGS = {
@@ -6,12 +6,13 @@ from typing import Any, Optional
 import folder_paths  # type: ignore  — provided by ComfyUI runtime
 import torch
 from comfy_api.latest import io
-from llama_cpp import Llama  # type: ignore
-from llama_cpp.llama_chat_format import Qwen3VLChatHandler  # type: ignore
-from llama_cpp.llama_chat_format import Llava16ChatHandler
 
-from ..utils.media import image_tensor_to_data_uri, video_tensor_to_frame_list
-from ..utils.memory import unload_llm
+from ..utils.llama import chat_handler_class, llama_class
+from ..utils.media import (VIDEO_SAMPLING_MODES, image_tensor_to_data_uri,
+                           video_tensor_to_frame_list)
+from ..utils.llm_scheduler import LlmScheduler
+from ..utils.memory import plan_gpu_layers, register_llm, unload_llm, unregister_llm
+from ..utils.structured import json_response_format, parse_output_schema, structured_output
 
 logger = logging.getLogger(__name__)
 
@@ -128,7 +129,8 @@ class _ModelCache:
     """
 
     def __init__(self):
-        self.model_instance: Optional[Llama] = None
+        self.model_instance: Optional[Any] = None  # llama_cpp.Llama
+        self.scheduler = LlmScheduler(self)
         self.current_model_path: Optional[str] = None
         self.current_mmproj_path: Optional[str] = None
         self.current_n_gpu_layers: Optional[int] = None
@@ -171,8 +173,17 @@ class _ModelCache:
     ) -> None:
         if self.model_instance is not None:
             logger.info("Unloading previous model before reload")
-            unload_llm(self.model_instance)
-            self.model_instance = None
+            unregister_llm(self)
+            with self.scheduler.exclusive():
+                unload_llm(self.model_instance)
+                self.model_instance = None
+
+        requested_gpu_layers = n_gpu_layers
+        n_gpu_layers, vram_bytes = plan_gpu_layers(model_path, mmproj_path, n_gpu_layers, n_ctx)
+
+        Llama = llama_class()
+        Qwen3VLChatHandler = chat_handler_class("Qwen3VLChatHandler")
+        Llava16ChatHandler = chat_handler_class("Llava16ChatHandler")
 
         logger.info("Loading model: %s", model_path)
 
@@ -243,17 +254,20 @@ class _ModelCache:
 
         self.current_model_path = model_path
         self.current_mmproj_path = mmproj_path
-        self.current_n_gpu_layers = n_gpu_layers
+        self.current_n_gpu_layers = requested_gpu_layers
         self.current_n_ctx = n_ctx
         self.current_force_reasoning = force_reasoning
         self.current_image_min_tokens = image_min_tokens
         self.current_image_max_tokens = image_max_tokens
         logger.info("Model loaded successfully (n_gpu_layers=%d, n_ctx=%d)", n_gpu_layers, n_ctx)
+        register_llm(self, os.path.basename(model_path), vram_bytes)
 
     def unload(self) -> None:
-        if self.model_instance is not None:
-            unload_llm(self.model_instance)
-        self.model_instance = None
+        unregister_llm(self)
+        with self.scheduler.exclusive():
+            if self.model_instance is not None:
+                unload_llm(self.model_instance)
+            self.model_instance = None
         self.current_model_path = None
         self.current_mmproj_path = None
         self.current_n_gpu_layers = None
@@ -371,7 +385,7 @@ class DuffyQwen3VLGGUFAnalyzer(io.ComfyNode):
                 io.Int.Input("seed", default=-1, min=-1, max=0x7FFFFFFFFFFFFFFF),
                 io.Int.Input(
                     "n_gpu_layers", default=-1, min=-1, max=200, step=1,
-                    tooltip="-1 = offload all layers to GPU",
+                    tooltip="-1 = auto: all layers if they fit in free VRAM, otherwise as many as fit",
                 ),
                 io.Int.Input(
                     "n_ctx", default=16384, min=512, max=262144, step=512,
@@ -395,6 +409,14 @@ class DuffyQwen3VLGGUFAnalyzer(io.ComfyNode):
                     "video_fps", default=1.0, min=0.1, max=5.0, step=0.1,
                     tooltip="Temporal sampling rate for video input (frames per second).",
                 ),
+                io.Combo.Input("video_sampling", options=VIDEO_SAMPLING_MODES, default="Adaptive", advanced=True, tooltip="Adaptive keeps frames at scene changes and high motion within the same frame budget; Uniform spaces them evenly"),
+                io.String.Input(
+                    "output_schema", multiline=True, default="", advanced=True,
+                    tooltip=(
+                        "JSON output mode: a JSON Schema (or {} for any object) compiled to a decoding grammar. "
+                        "The reply is always valid JSON and ends when the object closes. Empty = free text."
+                    ),
+                ),
                 # --- Optional media inputs ---
                 io.Image.Input("image", optional=True),
                 io.Image.Input(
@@ -440,6 +462,8 @@ class DuffyQwen3VLGGUFAnalyzer(io.ComfyNode):
         image_min_tokens: int,
         image_max_tokens: int,
         video_fps: float,
+        video_sampling: str = "Adaptive",
+        output_schema: str = "",
         image: Optional[torch.Tensor] = None,
         reference_image: Optional[torch.Tensor] = None,
         video: Optional[torch.Tensor] = None,
@@ -472,6 +496,8 @@ class DuffyQwen3VLGGUFAnalyzer(io.ComfyNode):
                 image_min_tokens=image_min_tokens,
                 image_max_tokens=image_max_tokens,
                 video_fps=video_fps,
+                video_sampling=video_sampling,
+                output_schema=output_schema,
                 image=image,
                 reference_image=reference_image,
                 video=video,
@@ -525,10 +551,14 @@ def _run_inference(
     image_min_tokens: int,
     image_max_tokens: int,
     video_fps: float,
+    video_sampling: str = "Adaptive",
+    output_schema: str = "",
     image: Optional[torch.Tensor] = None,
     reference_image: Optional[torch.Tensor] = None,
     video: Optional[torch.Tensor] = None,
 ) -> str:
+    response_schema = parse_output_schema(output_schema)
+
     # ----- Derive force_reasoning from operational mode ----- #
     force_reasoning = operational_mode == "Thinking"
 
@@ -597,7 +627,7 @@ def _run_inference(
     if video is not None:
         user_content.extend(
             video_tensor_to_frame_list(
-                video, target_fps=video_fps, n_ctx=n_ctx,
+                video, target_fps=video_fps, n_ctx=n_ctx, sampling=video_sampling,
             )
         )
 
@@ -613,7 +643,7 @@ def _run_inference(
             logger.info("Instruct mode: temperature auto-adjusted to 0.7")
 
     # ----- Run inference ----- #
-    completion = _model_cache.model_instance.create_chat_completion(
+    completion = _model_cache.scheduler.chat_completion(
         messages=messages,
         max_tokens=max_tokens,
         temperature=temperature,
@@ -627,9 +657,13 @@ def _run_inference(
         mirostat_tau=mirostat_tau,
         mirostat_eta=mirostat_eta,
         seed=seed if seed >= 0 else None,
+        response_format=json_response_format(response_schema) if response_schema is not None else None,
     )
 
     response_text: str = completion["choices"][0]["message"]["content"] or ""
+    if response_schema is not None:
+        # Grammar-constrained JSON has no thinking block to strip
+        return structured_output(response_text)
 
     # ----- Strip thinking tags if requested ----- #
     if strip_thinking_tags:
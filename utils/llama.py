@@ -0,0 +1,110 @@
+"""Deferred llama-cpp-python imports for the GGUF analyzer nodes.
+
+Importing llama_cpp loads the native backend and probes the GPU, which is a
+noticeable share of extension startup. The analyzers only need it when a
+model is actually loaded, so node registration stays cheap and a missing or
+incompatible wheel surfaces as an error on the analyzer node instead of
+breaking the whole extension at import time.
+
+``DUFFY_LLM_BACKEND=worker`` runs each model in a separate process instead
+(see ``utils/llama_worker.py``); both helpers below then return stand-ins
+with the same call signatures.
+"""
+import functools
+import importlib
+import logging
+import os
+import struct
+
+logger = logging.getLogger(__name__)
+
+# "inprocess" (default) loads llama.cpp into ComfyUI; "worker" uses a child process
+LLM_BACKEND = os.environ.get("DUFFY_LLM_BACKEND", "inprocess").strip().lower()
+
+_MISSING_MSG = (
+    "llama-cpp-python is required for the GGUF analyzer nodes. "
+    "Install a build matching your CUDA/Python version (see docs/llm_node_setup.md)."
+)
+
+
+def llama_class(error_msg: str = _MISSING_MSG) -> type:
+    """Return ``llama_cpp.Llama``, importing llama_cpp on first use."""
+    if LLM_BACKEND == "worker":
+        from .llama_worker import WorkerLlama
+        return functools.partial(WorkerLlama, import_error_msg=error_msg)
+    try:
+        from llama_cpp import Llama  # type: ignore
+    except ImportError as e:
+        raise ImportError(error_msg) from e
+    return Llama
+
+
+def chat_handler_class(name: str) -> type | None:
+    """Return a chat handler class from ``llama_cpp.llama_chat_format``, or None."""
+    if LLM_BACKEND == "worker":
+        # Built inside the worker; a missing handler fails the load there
+        from .llama_worker import handler_spec
+        return functools.partial(handler_spec, name)
+    try:
+        module = importlib.import_module("llama_cpp.llama_chat_format")
+    except ImportError:
+        return None
+    handler = getattr(module, name, None)
+    if handler is None:
+        logger.debug("llama_cpp.llama_chat_format has no %s", name)
+    return handler
+
+
+# GGUF value types (gguf spec): scalar struct formats, 8 = string, 9 = array
+_GGUF_SCALARS = {0: "<B", 1: "<b", 2: "<H", 3: "<h", 4: "<I", 5: "<i", 6: "<f", 7: "<?", 10: "<Q", 11: "<q", 12: "<d"}
+
+
+def _read_gguf_value(f, value_type: int):
+    if value_type in _GGUF_SCALARS:
+        fmt = _GGUF_SCALARS[value_type]
+        return struct.unpack(fmt, f.read(struct.calcsize(fmt)))[0]
+    if value_type == 8:
+        (length,) = struct.unpack("<Q", f.read(8))
+        return f.read(length).decode("utf-8", errors="replace")
+    if value_type == 9:
+        item_type, count = struct.unpack("<IQ", f.read(12))
+        if item_type in _GGUF_SCALARS:
+            size = struct.calcsize(_GGUF_SCALARS[item_type])
+            if count > 64:
+                f.seek(size * count, 1)  # skip large arrays (token scores, types)
+                return None
+            return [_read_gguf_value(f, item_type) for _ in range(count)]
+        for _ in range(count):
+            _read_gguf_value(f, item_type)
+        return None
+    raise ValueError(f"Unknown GGUF value type {value_type}")
+
+
+@functools.lru_cache(maxsize=16)
+def _gguf_metadata_cached(path: str, mtime_ns: int, size: int) -> dict:
+    metadata: dict = {}
+    with open(path, "rb") as f:
+        if f.read(4) != b"GGUF":
+            raise ValueError(f"Not a GGUF file: {path}")
+        version, _tensor_count, kv_count = struct.unpack("<IQQ", f.read(20))
+        if version < 2:
+            raise ValueError(f"Unsupported GGUF version {version}: {path}")
+        for _ in range(kv_count):
+            (key_length,) = struct.unpack("<Q", f.read(8))
+            key = f.read(key_length).decode("utf-8", errors="replace")
+            (value_type,) = struct.unpack("<I", f.read(4))
+            # Tokenizer vocabularies come last and are large; nothing after them is needed
+            if key.startswith("tokenizer."):
+                break
+            metadata[key] = _read_gguf_value(f, value_type)
+    return metadata
+
+
+def read_gguf_metadata(path: str) -> dict:
+    """Read the key/value header of a GGUF file (tensor data is never read).
+
+    Large arrays and the tokenizer section are skipped; results are cached per
+    file signature.
+    """
+    st = os.stat(path)
+    return _gguf_metadata_cached(os.path.realpath(path), st.st_mtime_ns, st.st_size)
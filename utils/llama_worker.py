@@ -0,0 +1,344 @@
+"""Out-of-process llama.cpp backend for the GGUF analyzer nodes.
+
+With ``DUFFY_LLM_BACKEND=worker`` each loaded model lives in its own child
+Python process instead of inside ComfyUI. The analyzers keep calling the
+same ``Llama`` API; ``WorkerLlama`` forwards it over a local socket
+(AF_UNIX where available, loopback TCP otherwise). Closing the model kills
+the process, so every byte of RAM/VRAM llama.cpp held is returned to the
+OS, and a crash in the native backend takes down only the worker, which is
+restarted and reloaded on the next request.
+
+This file is also the worker entry point and therefore imports only the
+standard library. ``DUFFY_LLM_WORKER_FACTORY`` ("module:attr", default
+``llama_cpp:Llama``) selects the model class the worker instantiates;
+``llama_worker:EchoLlama`` is a stand-in that exercises the protocol without
+llama-cpp-python or a GGUF file.
+"""
+import hmac
+import importlib
+import logging
+import os
+import pickle
+import shutil
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import traceback
+import weakref
+
+logger = logging.getLogger(__name__)
+
+WORKER_FACTORY = os.environ.get("DUFFY_LLM_WORKER_FACTORY", "llama_cpp:Llama")
+# Recycle the worker (restart + reload) after this many requests; 0 = never
+WORKER_MAX_REQUESTS = int(os.environ.get("DUFFY_LLM_WORKER_MAX_REQUESTS", "0") or 0)
+
+_AUTHKEY_ENV = "DUFFY_LLM_WORKER_AUTHKEY"
+_CONNECT_TIMEOUT = 60.0
+_CALLABLE_METHODS = {"create_chat_completion", "create_completion"}
+
+
+class LlamaWorkerError(RuntimeError):
+    """An error raised inside the worker process, or the worker died."""
+
+
+# ---------------------------------------------------------------------------
+# Framing: 8-byte little-endian length + pickle payload
+# ---------------------------------------------------------------------------
+
+def _send(sock: socket.socket, obj) -> None:
+    data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    sock.sendall(struct.pack("<Q", len(data)))
+    sock.sendall(data)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytearray:
+    buf = bytearray(size)
+    view = memoryview(buf)
+    pos = 0
+    while pos < size:
+        received = sock.recv_into(view[pos:])
+        if not received:
+            raise EOFError("LLM worker connection closed")
+        pos += received
+    return buf
+
+
+def _recv(sock: socket.socket):
+    (size,) = struct.unpack("<Q", _recv_exact(sock, 8))
+    return pickle.loads(_recv_exact(sock, size))
+
+
+# ---------------------------------------------------------------------------
+# Parent side
+# ---------------------------------------------------------------------------
+
+def _kill(process: subprocess.Popen) -> None:
+    if process.poll() is None:
+        process.kill()
+        process.wait()
+
+
+class WorkerLlama:
+    """``llama_cpp.Llama`` look-alike whose model runs in a child process.
+
+    Constructor arguments are those of ``Llama``; ``chat_handler`` must be a
+    ``(handler_name, kwargs)`` spec (see ``handler_spec``), since handler
+    objects cannot cross the process boundary.
+    """
+
+    def __init__(self, chat_handler=None, factory: str | None = None, import_error_msg: str | None = None, **kwargs):
+        self._load_args = {"factory": factory or WORKER_FACTORY, "chat_handler": chat_handler, "kwargs": kwargs}
+        self._import_error_msg = import_error_msg
+        self._lock = threading.Lock()
+        self._process: subprocess.Popen | None = None
+        self._sock: socket.socket | None = None
+        self._finalizer = None
+        self._requests = 0
+        self._closed = False
+        try:
+            self._start()
+        except BaseException:
+            self.close()
+            raise
+
+    def _spawn(self) -> None:
+        authkey = os.urandom(16)
+        tmpdir = None
+        if hasattr(socket, "AF_UNIX"):
+            tmpdir = tempfile.mkdtemp(prefix="duffy-llm-")
+            address = os.path.join(tmpdir, "worker.sock")
+            server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            server.bind(address)
+        else:
+            server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server.bind(("127.0.0.1", 0))
+            address = "%s:%d" % server.getsockname()
+        try:
+            server.listen(1)
+            server.settimeout(0.5)
+            env = dict(os.environ, **{_AUTHKEY_ENV: authkey.hex()})
+            self._process = subprocess.Popen([sys.executable, "-u", os.path.abspath(__file__), address], env=env)
+            self._finalizer = weakref.finalize(self, _kill, self._process)
+
+            waited = 0.0
+            while True:
+                try:
+                    sock, _ = server.accept()
+                    break
+                except socket.timeout:
+                    waited += 0.5
+                    if self._process.poll() is not None:
+                        raise LlamaWorkerError(f"LLM worker exited during startup (code {self._process.returncode})")
+                    if waited >= _CONNECT_TIMEOUT:
+                        raise LlamaWorkerError("LLM worker did not connect in time")
+            sock.settimeout(_CONNECT_TIMEOUT)
+            if not hmac.compare_digest(bytes(_recv_exact(sock, len(authkey))), authkey):
+                sock.close()
+                raise LlamaWorkerError("LLM worker failed authentication")
+            sock.settimeout(None)
+            self._sock = sock
+        finally:
+            server.close()
+            if tmpdir is not None:
+                shutil.rmtree(tmpdir, ignore_errors=True)
+
+    def _start(self) -> None:
+        self._spawn()
+        logger.info("LLM worker started (pid %d), loading %s", self._process.pid,
+                    os.path.basename(str(self._load_args["kwargs"].get("model_path", ""))))
+        self._exchange("load", self._load_args)
+        self._requests = 0
+
+    def _exchange(self, op: str, payload):
+        _send(self._sock, (op, payload))
+        status, result = _recv(self._sock)
+        if status == "ok":
+            return result
+        type_name, message, remote_traceback = result
+        logger.debug("LLM worker traceback:\n%s", remote_traceback)
+        if type_name in ("ImportError", "ModuleNotFoundError") and self._import_error_msg:
+            raise ImportError(self._import_error_msg)
+        raise LlamaWorkerError(f"{type_name}: {message}")
+
+    def _stop(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+        if self._finalizer is not None:
+            self._finalizer()  # kills and reaps the process
+            self._finalizer = None
+        self._process = None
+
+    def _restart(self, reason: str) -> None:
+        logger.warning("Restarting LLM worker: %s", reason)
+        self._stop()
+        self._start()
+
+    def _call(self, method: str, kwargs: dict):
+        with self._lock:
+            if self._closed:
+                raise LlamaWorkerError("LLM worker is closed")
+            if self._sock is None:
+                self._start()  # the previous request killed the worker twice
+            elif WORKER_MAX_REQUESTS and self._requests >= WORKER_MAX_REQUESTS:
+                self._restart(f"recycling after {self._requests} requests")
+            self._requests += 1
+            try:
+                return self._exchange("call", (method, kwargs))
+            except (EOFError, OSError) as e:
+                # Worker crashed mid-request: bring it back and retry once
+                self._restart(f"worker died ({e})")
+                try:
+                    return self._exchange("call", (method, kwargs))
+                except (EOFError, OSError) as e2:
+                    self._stop()  # restarted lazily by the next request
+                    raise LlamaWorkerError(f"LLM worker died again while retrying: {e2}") from e2
+
+    def create_chat_completion(self, **kwargs):
+        return self._call("create_chat_completion", kwargs)
+
+    def create_completion(self, **kwargs):
+        return self._call("create_completion", kwargs)
+
+    def close(self) -> None:
+        """Stop the worker; the OS reclaims all of its memory."""
+        with self._lock:
+            self._closed = True
+            if self._sock is not None:
+                try:
+                    _send(self._sock, ("close", None))
+                except OSError:
+                    pass
+            self._stop()
+
+
+def handler_spec(name: str, **kwargs) -> tuple[str, dict]:
+    """Describe a ``llama_cpp.llama_chat_format`` handler for the worker to build."""
+    return name, kwargs
+
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+
+class EchoLlama:
+    """Standard-library stand-in for ``llama_cpp.Llama`` inside the worker.
+
+    Replies echo the last user text with the worker's pid and request count,
+    so loading, calls, restarts and recycling can be observed from the parent.
+    A user text of ``__crash__`` ends the process abruptly, like a native crash.
+    """
+
+    def __init__(self, model_path: str = "", chat_handler=None, **kwargs):
+        self.model_path = model_path
+        self.chat_handler = chat_handler  # the (name, kwargs) spec, unbuilt
+        self.kwargs = kwargs
+        self.requests = 0
+
+    def _reply(self, text: str) -> tuple[str, dict]:
+        if text == "__crash__":
+            os._exit(1)
+        self.requests += 1
+        reply = f"echo[{os.getpid()}#{self.requests}]: {text}"
+        usage = {"prompt_tokens": len(text.split()), "completion_tokens": len(reply.split())}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        return reply, usage
+
+    def create_chat_completion(self, messages=(), **kwargs) -> dict:
+        content = next((m.get("content") for m in reversed(messages) if m.get("role") == "user"), "")
+        if isinstance(content, list):
+            content = " ".join(part.get("text", "") for part in content if part.get("type") == "text")
+        reply, usage = self._reply(content or "")
+        return {
+            "id": f"chatcmpl-echo-{self.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": self.model_path,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}],
+            "usage": usage,
+        }
+
+    def create_completion(self, prompt="", **kwargs) -> dict:
+        reply, usage = self._reply(prompt if isinstance(prompt, str) else f"<{len(prompt)} tokens>")
+        return {
+            "id": f"cmpl-echo-{self.requests}",
+            "object": "text_completion",
+            "created": int(time.time()),
+            "model": self.model_path,
+            "choices": [{"index": 0, "text": reply, "finish_reason": "stop"}],
+            "usage": usage,
+        }
+
+    def close(self) -> None:
+        pass
+
+
+def _resolve(spec: str):
+    module_name, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def _load(args: dict):
+    kwargs = dict(args["kwargs"])
+    if args["chat_handler"] is not None and not args["factory"].startswith("llama_cpp"):
+        # Other factories receive the (name, kwargs) spec and build what they need
+        kwargs["chat_handler"] = args["chat_handler"]
+    elif args["chat_handler"] is not None:
+        name, handler_kwargs = args["chat_handler"]
+        handler = getattr(importlib.import_module("llama_cpp.llama_chat_format"), name, None)
+        if handler is None:
+            raise AttributeError(f"llama_cpp.llama_chat_format has no {name}")
+        kwargs["chat_handler"] = handler(**handler_kwargs)
+    return _resolve(args["factory"])(**kwargs)
+
+
+def _serve(address: str) -> None:
+    authkey = bytes.fromhex(os.environ.pop(_AUTHKEY_ENV))
+    if hasattr(socket, "AF_UNIX") and os.path.sep in address:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(address)
+    else:
+        host, _, port = address.rpartition(":")
+        sock = socket.create_connection((host, int(port)))
+    sock.sendall(authkey)
+
+    model = None
+    try:
+        while True:
+            try:
+                op, payload = _recv(sock)
+            except EOFError:
+                break  # parent went away
+            if op == "close":
+                break
+            try:
+                if op == "load":
+                    model = _load(payload)
+                    result = None
+                elif op == "call":
+                    method, kwargs = payload
+                    if model is None or method not in _CALLABLE_METHODS:
+                        raise ValueError(f"Unsupported worker call: {method}")
+                    result = getattr(model, method)(**kwargs)
+                else:
+                    raise ValueError(f"Unknown worker op: {op}")
+                reply = ("ok", result)
+            except Exception as e:
+                reply = ("error", (type(e).__name__, str(e), traceback.format_exc()))
+            _send(sock, reply)
+    finally:
+        sock.close()
+        close = getattr(model, "close", None)
+        if callable(close):
+            close()
+
+
+if __name__ == "__main__":
+    _serve(sys.argv[1])
@@ -0,0 +1,127 @@
+"""Request scheduling for the shared GGUF analyzer models.
+
+A llama.cpp context evaluates one sequence at a time and is not thread safe,
+yet the same cached model is reached from several nodes (the analyzers and
+GISA share ``_model_cache_12b``) and, with in-process auto-queueing or API
+callers, from more than one thread. ``LlmScheduler`` sits in front of each
+model cache and:
+
+- runs requests one at a time and keeps load/unload from racing a decode;
+- coalesces identical concurrent requests with a fixed seed into a single
+  decode whose result every caller receives;
+- attaches per-request timing and token statistics to each completion.
+
+It does not batch decoding: distinct requests are still decoded one after
+another, so throughput is that of a single sequence. Multi-sequence decoding
+would need llama.cpp's low-level batch API, which the multimodal chat
+handlers used by these nodes do not go through.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+def _request_key(kwargs: dict) -> str | None:
+    """Digest of a deterministic request; None when the result may differ per call."""
+    if kwargs.get("seed") is None:
+        return None
+    try:
+        payload = json.dumps(kwargs, sort_keys=True, ensure_ascii=False)
+    except (TypeError, ValueError):
+        return None
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _with_stats(completion: dict, queue_s: float, run_s: float, coalesced: bool) -> dict:
+    usage = completion.get("usage") or {}
+    completion_tokens = usage.get("completion_tokens", 0)
+    stats = {
+        "queue_ms": round(queue_s * 1000, 1),
+        "run_ms": round(run_s * 1000, 1),
+        "prompt_tokens": usage.get("prompt_tokens", 0),
+        "completion_tokens": completion_tokens,
+        "tokens_per_s": round(completion_tokens / run_s, 2) if run_s > 0 else 0.0,
+        "coalesced": coalesced,
+    }
+    return dict(completion, duffy_stats=stats)
+
+
+class LlmScheduler:
+    """Serializes and de-duplicates requests to ``owner.model_instance``."""
+
+    def __init__(self, owner):
+        self._owner = owner
+        self._model_lock = threading.RLock()
+        self._inflight: dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+
+    @contextmanager
+    def exclusive(self):
+        """Hold the model for loading/unloading; waits for the running request."""
+        with self._model_lock:
+            yield
+
+    def run(self, fn, *args, **kwargs):
+        """Call ``fn(model, *args, **kwargs)`` with exclusive use of the owner's current model."""
+        with self._model_lock:
+            model = self._owner.model_instance
+            if model is None:
+                raise RuntimeError("No LLM is loaded")
+            return fn(model, *args, **kwargs)
+
+    def chat_completion(self, on_complete=None, **kwargs) -> dict:
+        """``create_chat_completion`` on the owner's current model, with ``duffy_stats``.
+
+        ``on_complete(model, completion)`` is called under the model lock right
+        after the decode, while the context still holds this request (e.g. to
+        capture a ``ChatSession``). Coalesced callers do not run it.
+        """
+        submitted = time.perf_counter()
+        key = _request_key(kwargs)
+        with self._inflight_lock:
+            pending = self._inflight.get(key) if key else None
+            if pending is None:
+                future: Future = Future()
+                if key:
+                    self._inflight[key] = future
+
+        if pending is not None:
+            completion = pending.result()
+            stats = completion["duffy_stats"]
+            waited = time.perf_counter() - submitted
+            logger.info("LLM request coalesced with an identical in-flight request (%.0f ms)", waited * 1000)
+            return dict(completion, duffy_stats=dict(stats, queue_ms=round(waited * 1000, 1), coalesced=True))
+
+        try:
+            with self._model_lock:
+                started = time.perf_counter()
+                model = self._owner.model_instance
+                if model is None:
+                    raise RuntimeError("No LLM is loaded")
+                completion = model.create_chat_completion(**kwargs)
+                finished = time.perf_counter()
+                if on_complete is not None:
+                    on_complete(model, completion)
+            completion = _with_stats(completion, started - submitted, finished - started, coalesced=False)
+            future.set_result(completion)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            if key:
+                with self._inflight_lock:
+                    self._inflight.pop(key, None)
+
+        stats = completion["duffy_stats"]
+        logger.info(
+            "LLM request: %d prompt + %d completion tokens in %.0f ms (%.1f tok/s, queued %.0f ms)",
+            stats["prompt_tokens"], stats["completion_tokens"], stats["run_ms"],
+            stats["tokens_per_s"], stats["queue_ms"],
+        )
+        return completion
@@ -0,0 +1,102 @@
+"""KV-resident multi-turn sessions on an in-process llama.cpp model.
+
+``Llama.generate`` reuses the longest prefix shared between a new prompt and
+the tokens already in the context. A ``ChatSession`` records the exact token
+sequence left by the previous turn (prompt, image embeddings and the reply)
+and sends the next user turn as that sequence plus only the new turn's
+tokens, so llama.cpp evaluates just the new turn instead of re-prefilling
+the conversation and re-encoding its images.
+
+The new turn is formatted with the model's own chat template. Whenever the
+fast path cannot be used (worker backend, another request has replaced the
+context, no template, context full) ``send`` returns None and the caller
+runs a normal chat completion.
+"""
+import logging
+import weakref
+
+logger = logging.getLogger(__name__)
+
+
+def _raise_exception(message: str):
+    raise ValueError(message)
+
+
+class ChatSession:
+    """A conversation whose KV state is still resident in ``model``.
+
+    ``key`` is a caller-defined identity of the conversation (e.g. the node and
+    its input digests) that callers compare before continuing it.
+    """
+
+    def __init__(self, model, transcript: list[dict], tokens: list[int], template: str, key=None):
+        self._model = weakref.ref(model)
+        self.transcript = transcript
+        self.tokens = tokens
+        self._template = template
+        self.key = key
+
+    @classmethod
+    def capture(cls, model, transcript: list[dict], response: str, key=None) -> "ChatSession | None":
+        """Record ``model``'s context right after it answered ``transcript`` with ``response``.
+
+        ``transcript`` holds text-only messages; it is used to format follow-up
+        turns, while the real prompt (with images) lives on in the KV cache.
+        """
+        input_ids = getattr(model, "input_ids", None)
+        n_tokens = getattr(model, "n_tokens", 0)
+        template = (getattr(model, "metadata", None) or {}).get("tokenizer.chat_template")
+        if input_ids is None or not n_tokens or not template or not response:
+            return None
+        transcript = list(transcript) + [{"role": "assistant", "content": response}]
+        return cls(model, transcript, input_ids[:n_tokens].tolist(), template, key=key)
+
+    def _render(self, messages: list[dict], add_generation_prompt: bool) -> str:
+        from jinja2.sandbox import ImmutableSandboxedEnvironment
+
+        environment = ImmutableSandboxedEnvironment(trim_blocks=True, lstrip_blocks=True)
+        return environment.from_string(self._template).render(
+            messages=messages,
+            add_generation_prompt=add_generation_prompt,
+            bos_token="",
+            eos_token="",
+            raise_exception=_raise_exception,
+        )
+
+    def _turn_text(self, user_text: str) -> str | None:
+        """Template text that follows the last reply: its end-of-turn, the new user turn and the reply header."""
+        try:
+            base = self._render(self.transcript, add_generation_prompt=False)
+            full = self._render(self.transcript + [{"role": "user", "content": user_text}], add_generation_prompt=True)
+        except Exception as e:
+            logger.debug("Chat template render failed: %s", e)
+            return None
+        reply = self.transcript[-1]["content"]
+        end = base.rfind(reply) + len(reply)
+        if end < len(reply) or full[:end] != base[:end]:
+            return None
+        return full[end:]
+
+    def send(self, model, user_text: str, max_tokens: int, **completion_kwargs) -> str | None:
+        """Answer ``user_text`` evaluating only the new turn; None if the fast path is unavailable."""
+        if self._model() is not model:
+            return None
+        n_prefix = len(self.tokens)
+        if model.n_tokens < n_prefix or model.input_ids[:n_prefix].tolist() != self.tokens:
+            return None  # another request has replaced the context since the last turn
+        turn_text = self._turn_text(user_text)
+        if turn_text is None:
+            return None
+        prompt = self.tokens + model.tokenize(turn_text.encode("utf-8"), add_bos=False, special=True)
+        if len(prompt) + max_tokens > model.n_ctx():
+            return None
+
+        logger.info("Session turn: reusing %d cached tokens, evaluating %d new", n_prefix, len(prompt) - n_prefix)
+        completion = model.create_completion(prompt=prompt, max_tokens=max_tokens, **completion_kwargs)
+        response = (completion["choices"][0]["text"] or "").strip()
+        self.transcript = self.transcript + [
+            {"role": "user", "content": user_text},
+            {"role": "assistant", "content": response},
+        ]
+        self.tokens = model.input_ids[:model.n_tokens].tolist()
+        return response
@@ -1,5 +1,7 @@
 import base64
+import functools
 import logging
+import struct
 from io import BytesIO
 from typing import Any
 
@@ -12,6 +14,8 @@ logger = logging.getLogger(__name__)
 ESTIMATED_TOKENS_PER_IMAGE = 258  # Approximate token cost per image in Gemma-4
 MAX_VIDEO_FRAMES = 30
 MAX_AUDIO_DURATION_SECONDS = 60
+VIDEO_SAMPLING_MODES = ["Adaptive", "Uniform"]
+_MOTION_GRID = 64  # longest side of the downsampled frames used for scoring
 
 
 def image_tensor_to_data_uri(image: torch.Tensor) -> dict[str, Any]:
@@ -39,11 +43,54 @@ def image_tensor_to_data_uri(image: torch.Tensor) -> dict[str, Any]:
     }
 
 
+def _adaptive_frame_indices(video: torch.Tensor, frame_count: int) -> np.ndarray:
+    """Pick ``frame_count`` frames weighted towards scene changes and motion.
+
+    Frames are scored in one vectorized pass: a strided grayscale thumbnail of
+    every frame is differenced against its predecessor. Frames after the
+    largest spikes (cuts) are always kept; the remaining budget is spread at
+    equal quantiles of a weight that mixes uniform coverage with motion, so
+    static stretches get few frames and busy ones get more.
+    """
+    total_frames = video.shape[0]
+    if frame_count >= total_frames:
+        return np.arange(total_frames)
+
+    stride = max(1, max(video.shape[1], video.shape[2]) // _MOTION_GRID)
+    thumbs = video[:, ::stride, ::stride, :].float().mean(dim=-1)
+    change = torch.zeros(total_frames, device=thumbs.device)
+    change[1:] = (thumbs[1:] - thumbs[:-1]).abs().mean(dim=(1, 2))
+    change = change.cpu()
+
+    selected = [0]
+    cut_threshold = change.mean() + 3 * change.std()
+    cuts = torch.nonzero(change > cut_threshold).flatten()
+    cuts = cuts[change[cuts].argsort(descending=True)][: frame_count // 2]
+    selected.extend(cuts.tolist())
+
+    total_change = change.sum()
+    weight = torch.full((total_frames,), 0.5 / total_frames, dtype=torch.float64)
+    if total_change > 0:
+        weight += 0.5 * change.double() / total_change.double()
+    cumulative = weight.cumsum(0)
+    targets = (torch.arange(frame_count, dtype=torch.float64) + 0.5) / frame_count * cumulative[-1]
+    quantile_picks = torch.searchsorted(cumulative, targets).clamp(max=total_frames - 1).tolist()
+    uniform_picks = np.linspace(0, total_frames - 1, frame_count, dtype=int).tolist()
+
+    chosen = set(selected)
+    for index in quantile_picks + uniform_picks:
+        if len(chosen) >= frame_count:
+            break
+        chosen.add(int(index))
+    return np.array(sorted(chosen)[:frame_count])
+
+
 def video_tensor_to_frame_list(
     video: torch.Tensor,
     target_fps: float = 1.0,
     source_fps: float = 30.0,
     n_ctx: int = 8192,
+    sampling: str = "Adaptive",
 ) -> list[dict[str, Any]]:
     """Extract temporally sub-sampled frames from a video tensor.
 
@@ -52,6 +99,8 @@ def video_tensor_to_frame_list(
         target_fps: Desired sampling rate in frames per second.
         source_fps: Original video frame rate (assumed 30 FPS if unknown).
         n_ctx: Current context window size, used to warn about token budget.
+        sampling: "Adaptive" favours scene changes and motion; "Uniform"
+            spaces frames evenly.
 
     Returns:
         List of image_url dicts, one per sampled frame.
@@ -74,10 +123,13 @@ def video_tensor_to_frame_list(
             old_count, frame_count, n_ctx,
         )
 
-    indices = np.linspace(0, total_frames - 1, frame_count, dtype=int)
+    if sampling == "Adaptive":
+        indices = _adaptive_frame_indices(video, frame_count)
+    else:
+        indices = np.linspace(0, total_frames - 1, frame_count, dtype=int)
     logger.info(
-        "Video: %.1fs duration, %d total frames, sampling %d frames (%.1f FPS)",
-        duration_seconds, total_frames, frame_count, target_fps,
+        "Video: %.1fs duration, %d total frames, sampling %d frames (%.1f FPS, %s)",
+        duration_seconds, total_frames, frame_count, target_fps, sampling.lower(),
     )
 
     frames = []
@@ -86,23 +138,36 @@ def video_tensor_to_frame_list(
     return frames
 
 
-def _process_audio_to_wav(audio: dict) -> bytes:
+@functools.lru_cache(maxsize=8)
+def _resampler(src_rate: int, dst_rate: int, device: str):
+    """Resample transform with its sinc kernel built once per (rates, device)."""
+    import torchaudio
+
+    return torchaudio.transforms.Resample(src_rate, dst_rate).to(device)
+
+
+def _process_audio_to_wav(audio: dict) -> bytearray:
     """Shared audio processing: resample to 16 kHz mono, encode as WAV bytes.
 
     Args:
         audio: {"waveform": torch.Tensor, "sample_rate": int}
 
     Returns:
-        Raw WAV file bytes.
+        Raw WAV file bytes (16-bit PCM).
 
     Raises:
         ValueError: If audio exceeds MAX_AUDIO_DURATION_SECONDS.
     """
-    import soundfile as sf
-    import torchaudio
-
     waveform = audio["waveform"]
-    sample_rate = audio["sample_rate"]
+    sample_rate = int(audio["sample_rate"])
+
+    # Validate duration before any mixdown or resampling work
+    duration = waveform.shape[-1] / sample_rate
+    if duration > MAX_AUDIO_DURATION_SECONDS:
+        raise ValueError(
+            f"Audio duration ({duration:.1f}s) exceeds the maximum of "
+            f"{MAX_AUDIO_DURATION_SECONDS}s. Please trim the audio input."
+        )
 
     # Squeeze batch dimension if present: [B, C, T] -> [C, T]
     if waveform.ndim == 3:
@@ -114,24 +179,22 @@ def _process_audio_to_wav(audio: dict) -> bytes:
 
     # Resample to 16 kHz
     if sample_rate != 16000:
-        resampler = torchaudio.transforms.Resample(sample_rate, 16000)
-        waveform = resampler(waveform)
-
-    # Validate duration
-    duration = waveform.shape[-1] / 16000
-    if duration > MAX_AUDIO_DURATION_SECONDS:
-        raise ValueError(
-            f"Audio duration ({duration:.1f}s) exceeds the maximum of "
-            f"{MAX_AUDIO_DURATION_SECONDS}s. Please trim the audio input."
-        )
+        waveform = _resampler(sample_rate, 16000, str(waveform.device))(waveform.float())
 
     logger.info("Audio: %.1fs duration, resampled to 16 kHz mono", duration)
 
-    # Encode to WAV in memory
-    audio_np = waveform.squeeze(0).cpu().numpy()
-    buffer = BytesIO()
-    sf.write(buffer, audio_np, 16000, format="WAV")
-    return buffer.getvalue()
+    # Encode as 16-bit PCM WAV, writing samples straight into the file buffer
+    samples = (waveform.squeeze(0).clamp(-1.0, 1.0) * 32767.0).round().to(torch.int16).cpu().numpy()
+    data_size = samples.size * 2
+    wav = bytearray(44 + data_size)
+    struct.pack_into(
+        "<4sI4s4sIHHIIHH4sI", wav, 0,
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, 1, 1, 16000, 16000 * 2, 2, 16,
+        b"data", data_size,
+    )
+    np.frombuffer(wav, dtype="<i2", offset=44)[:] = samples
+    return wav
 
 
 def audio_to_data_uri(audio: dict) -> dict[str, Any]:
@@ -1,25 +1,72 @@
 import gc
 import logging
+import os
+import struct
 
 import torch
 
 logger = logging.getLogger(__name__)
 
+# "targeted" (default) frees only the LLM; "full" also unloads every ComfyUI model
+UNLOAD_MODE = os.environ.get("DUFFY_LLM_UNLOAD_MODE", "targeted").strip().lower()
 
-def unload_llm(model_instance):
-    """Aggressively free an llama-cpp-python model from VRAM/RAM.
+
+def _vram_snapshot() -> dict[str, int] | None:
+    """Device-level free/total plus torch allocator usage, or None without CUDA."""
+    if not torch.cuda.is_available():
+        return None
+    free, total = torch.cuda.mem_get_info()
+    return {
+        "free": free,
+        "total": total,
+        "allocated": torch.cuda.memory_allocated(),
+        "reserved": torch.cuda.memory_reserved(),
+    }
+
+
+def _log_vram_change(before: dict[str, int] | None, after: dict[str, int] | None) -> None:
+    if before is None or after is None:
+        return
+    mib = 2**20
+    logger.info(
+        "VRAM free %.0f -> %.0f MiB (+%.0f MiB of %.0f MiB); torch allocated %.0f -> %.0f MiB, reserved %.0f -> %.0f MiB",
+        before["free"] / mib, after["free"] / mib, (after["free"] - before["free"]) / mib, after["total"] / mib,
+        before["allocated"] / mib, after["allocated"] / mib,
+        before["reserved"] / mib, after["reserved"] / mib,
+    )
+
+
+def unload_llm(model_instance, mode: str | None = None):
+    """Free an llama-cpp-python model from VRAM/RAM.
 
     Executes the cleanup pipeline in strict order:
-      1. Delete the C++ backed Llama object (triggers C destructors).
+      1. Close the C++ backed Llama object (frees its llama.cpp buffers now,
+         not whenever the last Python reference goes away).
       2. Run Python garbage collection.
-      3. Call ComfyUI's native model/cache cleanup.
+      3. ComfyUI cleanup. "targeted" leaves ComfyUI's loaded models in place;
+         "full" unloads every ComfyUI model.
       4. Flush the CUDA memory cache.
 
+    Free VRAM before and after is logged.
+
     Args:
         model_instance: The llama_cpp.Llama object to release. May be None.
+        mode: "targeted" or "full"; defaults to DUFFY_LLM_UNLOAD_MODE.
     """
+    mode = (mode or UNLOAD_MODE).lower()
+    if _evicting:
+        # Called from inside ComfyUI's free_memory(); never re-enter it
+        mode = "targeted"
+    before = _vram_snapshot()
+
     # 1. Destroy C++ instance
     if model_instance is not None:
+        close = getattr(model_instance, "close", None)
+        if callable(close):
+            try:
+                close()
+            except Exception as e:
+                logger.warning("Llama.close() failed: %s", e)
         del model_instance
     gc.collect()
     logger.info("LLM instance deleted, garbage collected")
@@ -27,7 +74,9 @@ def unload_llm(model_instance):
     # 2. ComfyUI native cleanup
     try:
         import comfy.model_management  # type: ignore
-        comfy.model_management.unload_all_models()
+        if mode == "full":
+            comfy.model_management.unload_all_models()
+            logger.info("ComfyUI models unloaded (full unload)")
         comfy.model_management.soft_empty_cache()
         logger.info("ComfyUI model management caches cleared")
     except ImportError:
@@ -39,3 +88,250 @@ def unload_llm(model_instance):
     if torch.cuda.is_available():
         torch.cuda.empty_cache()
         logger.info("CUDA cache emptied")
+
+    _log_vram_change(before, _vram_snapshot())
+
+
+# ---------------------------------------------------------------------------
+# VRAM coordination with ComfyUI model management
+# ---------------------------------------------------------------------------
+
+_LLM_RESERVE_BYTES = 512 * 2**20  # compute buffers and allocator slack
+_registered_llms: dict[int, "_LlmLoadedModel"] = {}
+_evicting = False  # True while ComfyUI's free_memory() is evicting an LLM
+_mm_warned = False
+
+# LoadedModel members ComfyUI calls on entries of current_loaded_models
+_LOADED_MODEL_API = (
+    "model_memory",
+    "model_loaded_memory",
+    "model_offloaded_memory",
+    "model_memory_required",
+    "model_use_more_vram",
+    "model_unload",
+    "is_dead",
+)
+
+
+def _model_management():
+    """Return ``comfy.model_management`` if it has the interface the LLM entries rely on.
+
+    Returns None when ComfyUI is unavailable or its internals differ (a newer
+    or older LoadedModel API); LLMs are then not registered and are only
+    released through their own unload.
+    """
+    global _mm_warned
+    try:
+        import comfy.model_management as mm  # type: ignore
+    except ImportError:
+        return None
+    loaded_model = getattr(mm, "LoadedModel", None)
+    missing = [
+        name for name in ("free_memory", "get_free_memory", "get_torch_device")
+        if not callable(getattr(mm, name, None))
+    ]
+    if not isinstance(getattr(mm, "current_loaded_models", None), list):
+        missing.append("current_loaded_models")
+    if loaded_model is None:
+        missing.append("LoadedModel")
+    else:
+        missing.extend(f"LoadedModel.{name}" for name in _LOADED_MODEL_API if not hasattr(loaded_model, name))
+    if missing:
+        if not _mm_warned:
+            _mm_warned = True
+            logger.warning("ComfyUI model management lacks %s; LLMs are not registered with it", ", ".join(missing))
+        return None
+    return mm
+
+
+class _LlamaCppModel:
+    """Minimal ModelPatcher stand-in for a llama.cpp model in ComfyUI's loaded list."""
+
+    parent = None
+
+    def __init__(self, name: str, size_bytes: int, device):
+        self.model = self
+        self.name = name
+        self.size_bytes = size_bytes
+        self.load_device = device
+        self.offload_device = torch.device("cpu")
+
+    def model_size(self) -> int:
+        return self.size_bytes
+
+    def loaded_size(self) -> int:
+        return self.size_bytes
+
+    def current_loaded_device(self):
+        return self.load_device
+
+    def partially_unload(self, *args, **kwargs) -> int:
+        return 0
+
+    def detach(self, *args, **kwargs) -> None:
+        pass
+
+    def is_clone(self, other) -> bool:
+        return other is self
+
+    def __repr__(self) -> str:
+        return f"LlamaCppModel({self.name}, {self.size_bytes / 2**20:.0f} MiB)"
+
+
+class _LlmLoadedModel:
+    """Duck-typed ``comfy.model_management.LoadedModel`` for a llama.cpp model.
+
+    Listed in ``current_loaded_models`` so ComfyUI counts the LLM's VRAM and
+    can evict it through ``free_memory()`` like any other model.
+    """
+
+    def __init__(self, owner, name: str, size_bytes: int, device):
+        self.model = _LlamaCppModel(name, size_bytes, device)
+        self.device = device
+        self.currently_used = False
+        self.model_finalizer = None
+        self.evicting = False
+        self._owner = owner
+
+    def real_model(self):
+        return self.model
+
+    def is_dead(self) -> bool:
+        return False
+
+    def model_memory(self) -> int:
+        return self.model.size_bytes
+
+    def model_loaded_memory(self) -> int:
+        return self.model.size_bytes
+
+    def model_offloaded_memory(self) -> int:
+        return 0
+
+    def model_memory_required(self, device) -> int:
+        return 0 if device == self.device else self.model.size_bytes
+
+    def model_use_more_vram(self, *args, **kwargs) -> int:
+        return 0
+
+    def model_unload(self, memory_to_free=None, unpatch_weights=True) -> bool:
+        logger.info("ComfyUI requested VRAM; evicting %r", self.model)
+        global _evicting
+        self.evicting = True
+        _evicting = True
+        try:
+            self._owner.unload()
+        except Exception as e:
+            logger.warning("LLM eviction failed: %s", e)
+        finally:
+            _evicting = False
+        return True
+
+    def __eq__(self, other) -> bool:
+        return self.model is getattr(other, "model", None)
+
+    __hash__ = object.__hash__
+
+
+def register_llm(owner, name: str, size_bytes: int) -> None:
+    """List a loaded LLM in ComfyUI's model accounting; ``owner.unload()`` evicts it."""
+    mm = _model_management()
+    if mm is None:
+        return
+    unregister_llm(owner)
+    try:
+        entry = _LlmLoadedModel(owner, name, size_bytes, mm.get_torch_device())
+        mm.current_loaded_models.insert(0, entry)
+    except Exception as e:
+        logger.warning("Could not register %s with ComfyUI model management: %s", name, e)
+        return
+    _registered_llms[id(owner)] = entry
+    logger.info("Registered %r with ComfyUI model management", entry.model)
+
+
+def unregister_llm(owner) -> None:
+    """Remove ``owner``'s LLM from ComfyUI's model accounting."""
+    entry = _registered_llms.pop(id(owner), None)
+    if entry is None or entry.evicting:
+        # During eviction ComfyUI removes the entry from its list itself
+        return
+    mm = _model_management()
+    if mm is None:
+        return
+    try:
+        mm.current_loaded_models.remove(entry)
+    except ValueError:
+        pass
+
+
+def _kv_cache_bytes_per_layer(metadata: dict, arch: str, n_ctx: int) -> int:
+    """f16 K+V cache size of one layer for ``n_ctx`` tokens, from GGUF metadata."""
+    def _max(value, default):
+        if isinstance(value, list):
+            value = max(value) if value else None
+        return value or default
+
+    n_embd = _max(metadata.get(f"{arch}.embedding_length"), 4096)
+    n_head = _max(metadata.get(f"{arch}.attention.head_count"), 1)
+    n_head_kv = _max(metadata.get(f"{arch}.attention.head_count_kv"), n_head)
+    head_dim = _max(metadata.get(f"{arch}.attention.key_length"), n_embd // n_head)
+    return 2 * n_ctx * n_head_kv * head_dim * 2
+
+
+def plan_gpu_layers(model_path: str, mmproj_path: str | None, n_gpu_layers: int, n_ctx: int) -> tuple[int, int]:
+    """Pick the llama.cpp GPU layer count and estimate the resulting VRAM use.
+
+    An explicit ``n_gpu_layers`` (>= 0) is kept. For -1 (auto), the layer
+    count is chosen from the VRAM that is already free, so ComfyUI's resident
+    diffusion model, VAE and CLIP stay loaded; the remaining layers run on the
+    CPU. ComfyUI is only asked to evict models when even the non-repeating
+    part (embeddings, projector and compute reserve) does not fit.
+
+    Returns:
+        (n_gpu_layers to pass to llama.cpp, estimated VRAM bytes)
+    """
+    from .llama import read_gguf_metadata
+
+    model_bytes = os.path.getsize(model_path)
+    mmproj_bytes = os.path.getsize(mmproj_path) if mmproj_path else 0
+    try:
+        metadata = read_gguf_metadata(model_path)
+        arch = metadata.get("general.architecture", "")
+        block_count = int(metadata.get(f"{arch}.block_count") or 0)
+        kv_per_layer = _kv_cache_bytes_per_layer(metadata, arch, n_ctx)
+    except (OSError, ValueError, struct.error) as e:
+        logger.warning("Could not read GGUF header of %s: %s", model_path, e)
+        block_count, kv_per_layer = 0, 0
+
+    # Repeating blocks plus roughly one block's worth of embeddings/output head
+    weight_per_layer = model_bytes / (block_count + 1) if block_count else model_bytes
+    per_layer = weight_per_layer + kv_per_layer
+    fixed = mmproj_bytes + weight_per_layer + _LLM_RESERVE_BYTES
+
+    def estimate(layers: int) -> int:
+        layers = block_count if layers < 0 or layers > block_count else layers
+        return int(fixed + per_layer * layers) if block_count else model_bytes + mmproj_bytes
+
+    if n_gpu_layers >= 0 or not block_count or not torch.cuda.is_available():
+        return n_gpu_layers, estimate(n_gpu_layers)
+
+    full_size = estimate(-1)
+    mm = _model_management()
+    if mm is not None:
+        device = mm.get_torch_device()
+        free_bytes = mm.get_free_memory(device)
+        if free_bytes < fixed:
+            mm.free_memory(int(fixed), device)
+            free_bytes = mm.get_free_memory(device)
+    else:
+        free_bytes = torch.cuda.mem_get_info()[0]
+
+    if free_bytes >= full_size:
+        return -1, full_size
+
+    layers = max(0, min(block_count, int((free_bytes - fixed) // per_layer)))
+    logger.info(
+        "Auto GPU offload: %d/%d layers fit in %.0f MiB free VRAM (full model needs ~%.0f MiB)",
+        layers, block_count, free_bytes / 2**20, full_size / 2**20,
+    )
+    return layers, estimate(layers)
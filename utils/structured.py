@@ -0,0 +1,53 @@
+"""JSON-constrained decoding for the GGUF analyzer nodes.
+
+llama-cpp-python compiles a JSON schema into a GBNF grammar that masks every
+token which would break the JSON, so the model can only emit a parseable
+object and generation ends when the object closes. Chat completions take the
+schema as ``response_format``; raw ``create_completion`` calls need the
+compiled grammar.
+"""
+import functools
+import json
+
+
+def json_response_format(schema: dict | None = None) -> dict:
+    """``response_format`` for ``create_chat_completion``; any JSON object when ``schema`` is None."""
+    response_format: dict = {"type": "json_object"}
+    if schema:
+        response_format["schema"] = schema
+    return response_format
+
+
+@functools.lru_cache(maxsize=32)
+def _compiled_grammar(schema_json: str):
+    from llama_cpp.llama_grammar import JSON_GBNF, LlamaGrammar  # type: ignore
+
+    if schema_json == "null":
+        return LlamaGrammar.from_string(JSON_GBNF, verbose=False)
+    return LlamaGrammar.from_json_schema(schema_json, verbose=False)
+
+
+def json_grammar(schema: dict | None = None):
+    """Compiled ``LlamaGrammar`` for ``schema`` (cached; key order is preserved)."""
+    return _compiled_grammar(json.dumps(schema or None))
+
+
+def parse_output_schema(text: str) -> dict | None:
+    """Parse an analyzer ``output_schema`` input: empty = free text, ``{}`` = any JSON object."""
+    if not text or not text.strip():
+        return None
+    try:
+        schema = json.loads(text)
+    except ValueError as e:
+        raise ValueError(f"output_schema is not valid JSON: {e}") from e
+    if not isinstance(schema, dict):
+        raise ValueError("output_schema must be a JSON object: a JSON Schema, or {} for any object")
+    return schema
+
+
+def structured_output(text: str) -> str:
+    """Check a grammar-constrained reply and return it as normalized JSON text."""
+    try:
+        return json.dumps(json.loads(text), ensure_ascii=False)
+    except ValueError as e:
+        raise ValueError("Structured output ended before the JSON object closed; increase max_tokens") from e